@@ -1,16 +1,18 @@
 # backend/app.py
-import os, threading, time
+import asyncio, http.client, itertools, logging, os, threading, time, zlib
 from collections import defaultdict, deque
 from datetime import datetime
-from typing import Deque, Dict, List
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse, Response, StreamingResponse
 import math
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from fastapi import HTTPException
 from datetime import timedelta
 from collections import deque
@@ -18,30 +20,45 @@ from datetime import timedelta
 import io
 from collections import defaultdict
 
-
+from backend.ewma import ewma_matrix
+from backend.fastjson import FastJSONResponse, columns_of, loads, series
+from backend.ingest import Chunk, CsvTailIngester, dt_to_minute, minute_to_dt, read_tail, resolve_ts_col, summarize
+from backend.ingestlog import IngestLog
+from backend.archive import MinuteArchive, bucket_sum
+from backend.cache import ResponseCache, etag_matches
+from backend.columnar import ColumnarStore, summarize_typed
+from backend.forecast import SeasonalForecaster
+from backend.history import HistoryReplay
+from backend.leader import Coordinator
+from backend.live import LiveHub
+from backend.metrics import BYTE_BUCKETS, REGISTRY, ROW_BUCKETS, TimedLock
+from backend.parsepool import ChunkParser
+from backend.recent import RecentIndex
+from backend.snapshot import encode_snapshot, load_snapshot, save_snapshot
+from backend.store import FlowStore, rows_payload
+from backend.watch import FileWatcher
+
+log = logging.getLogger("paxflow")
+
+# --- metrikler (Prometheus, /metrics) ---
+TICK_SECONDS = REGISTRY.histogram("paxflow_tick_seconds", "updater tick süresi (yeni satır varken)")
+PARSE_SECONDS = REGISTRY.histogram("paxflow_parse_seconds", "CSV kuyruğunun okunup ayrıştırılması")
+EWMA_SECONDS = REGISTRY.histogram("paxflow_ewma_step_seconds", "kapanan dakikaların EWMA'ya işlenmesi")
+SNAPSHOT_SECONDS = REGISTRY.histogram("paxflow_snapshot_seconds", "durum snapshot'ının yazılması")
+INGEST_BYTES = REGISTRY.histogram("paxflow_ingest_bytes", "tick başına okunan CSV baytı", BYTE_BUCKETS)
+INGEST_ROWS = REGISTRY.histogram("paxflow_ingest_rows", "tick başına ingest edilen satır", ROW_BUCKETS)
+LOCK_WAIT = REGISTRY.histogram("paxflow_lock_wait_seconds", "kilit bekleme süresi")
+HTTP_SECONDS = REGISTRY.histogram("paxflow_http_request_seconds", "uç nokta gecikmesi")
+ERRORS = REGISTRY.counter("paxflow_errors_total", "yutulan (loglanan) hatalar")
+CACHE_RESULTS = REGISTRY.counter("paxflow_cache_requests_total", "yanıt önbelleği: hit / miss / not_modified")
+WATCH_WAKEUPS = REGISTRY.counter("paxflow_watch_wakeups_total", "updater uyanmaları: change / idle")
 
 TR_LEVEL = {"GREEN": "YEŞİL", "YELLOW": "SARI", "RED": "KIRMIZI"}
 EMOJI = {"GREEN": "🟢", "YELLOW": "🟡", "RED": "🔴"}
+RANK = {"GREEN": 0, "YELLOW": 1, "RED": 2}
 
 # --- CSV preview helpers ---
 
-def _find_ts_col(cols):
-    # CSV'deki muhtemel zaman damgası sütun adları
-    cands = ["CheckDate", "ts", "timestamp", "datetime", "created_at", "flightdate", "date"]
-    low = {c.lower(): c for c in cols}
-    for k in cands:
-        if k.lower() in low:
-            return low[k.lower()]
-    return None
-
-def _dedupe_by_minute(records):
-    """Aynı dakika+checkpoint için en son kaydı bırak."""
-    uniq = {}
-    for r in records:
-        key = (r["ts_minute"], r["checkpoint_id"])
-        uniq[key] = r
-    return sorted(uniq.values(), key=lambda r: (r["checkpoint_id"], r["ts_minute"]))
-
 def _summarize(rec):
     """Tek bir kaydı insan diliyle açıkla + öneri üret."""
     cp = rec["checkpoint_id"]
@@ -55,7 +72,7 @@ def _summarize(rec):
     # Kaç görevli var / kaç olmalı?
     current_officers = officers[cp]
     # Hedefi “yeşile” çekmek için gereken min görevli sayısı (rho < GREEN eşiği)
-    needed_for_green = math.ceil(lam / (GREEN * MU_PER_OFFICER)) if MU_PER_OFFICER > 0 else current_officers
+    needed_for_green = int(officers_needed(lam, GREEN)) if MU_PER_OFFICER > 0 else current_officers
     addl = max(0, needed_for_green - current_officers)
 
     headline = f"{ts} – {cp} – {EMOJI[level]} {TR_LEVEL[level]}"
@@ -71,7 +88,7 @@ def _summarize(rec):
     else:
         advice = "Öneri: Akış normal; izlemeye devam."
 
-    return {
+    out = {
         "checkpoint_id": cp,
         "time": ts,
         "level": TR_LEVEL[level],
@@ -82,15 +99,66 @@ def _summarize(rec):
         "advice": advice,
     }
 
+    # cp'nin en güncel kaydıysa önümüzdeki ADVICE_HORIZON dakikanın tahminine bak
+    fc = forecast_peak(cp, ADVICE_HORIZON) if forecaster.last_minute(cp) == dt_to_minute(rec["ts_minute"]) else None
+    if fc is not None:
+        f_lam, f_minute = fc
+        f_rho = f_lam / mu_for(cp)
+        f_level = calc_level(f_rho)
+        f_time = minute_to_dt(f_minute).strftime("%H:%M")
+        out["forecast"] = {"horizon_minutes": ADVICE_HORIZON, "peak_lambda": round(f_lam, 2),
+                           "peak_rho": round(f_rho, 2), "peak_time": f_time, "level": TR_LEVEL[f_level]}
+        if RANK[f_level] > RANK[level]:
+            if f_level == "RED":
+                need = int(officers_needed(f_lam, GREEN))
+                out["advice"] = (f"Öneri: ~{f_time} civarı {TR_LEVEL[f_level]} bekleniyor; "
+                                 f"şimdiden {need} görevli planlayın (≈ +{max(0, need - current_officers)}).")
+            else:
+                out["advice"] = f"Öneri: ~{f_time} civarı {TR_LEVEL[f_level]} bekleniyor; +1 görevliye hazır olun."
+    return out
+
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CSV_PATH = os.getenv("CSV_PATH", os.path.join(BASE_DIR, "data", "flight_data.csv"))
+STORE_BACKEND = os.getenv("STORE_BACKEND", "csv")     # csv | parquet | arrow
+STORE_DIR = os.getenv("STORE_DIR", os.path.join(os.path.dirname(CSV_PATH), "columnar"))
+# --workers N: tek lider süreç ingest eder, diğerleri bu soketten okur (boş = kapalı)
+STATE_SOCKET = os.getenv("STATE_SOCKET", "/tmp/paxflow-%08x.sock" % (zlib.crc32(os.path.abspath(CSV_PATH).encode()),))
+# dakika sayaçlarının memmap arşivi; boş bırakılırsa kapalı
+MINUTE_ARCHIVE = os.getenv("MINUTE_ARCHIVE", os.path.join(os.path.dirname(CSV_PATH), "minutes"))
 BUCKET = "1min"          # 1 dakika
 ALPHA = 0.25           # EWMA
 MU_PER_OFFICER = 3.0  # kişi/dk (örnek)
 GREEN, YELLOW = 0.7, 0.9
-
-app = FastAPI(title="EWMA Boarding Load")
+RING_SIZE = 1000       # /api/csv/latest için bellekte tutulan ham satır
+ADVICE_HORIZON = 30    # öneriler için bakılan tahmin ufku (dk)
+COMMIT_MAX_MINUTES = 7 * 1440   # tek commit'te EWMA'ya işlenen en fazla dakika (daha eskisi atlanır)
+# toplam dakika katmanının saklama süresi; daha eskisi yalnızca saat/gün katmanlarında.
+# Belleği sınırlamaz: CP başına dakika sayaçları (store.counts) tamamen tutulur
+MINUTE_RETENTION_DAYS = float(os.getenv("MINUTE_RETENTION_DAYS", "7"))
+# CSV izleme: auto (inotify, olmazsa yoklama) | inotify | poll; yazma patlamaları debounce içinde birleşir
+WATCH_MODE = os.getenv("WATCH_MODE", "auto")
+WATCH_DEBOUNCE_MS = int(os.getenv("WATCH_DEBOUNCE_MS", "20"))
+# değişiklik yokken de bu aralıkla tick (eski 1 sn'lik yoklamadan uzun değil); yazmalar ayrıca
+# 0.25 sn'lik stat karşılaştırmasıyla da görülür (olay gelmeyen bind mount'lar)
+WATCH_IDLE_SECONDS = float(os.getenv("WATCH_IDLE_SECONDS", "1"))
+# POST /api/ingest satırlarının kalıcı kopyası (CSV_PATH'ten ayrı; boş = yalnızca bellek)
+INGEST_LOG = os.getenv("INGEST_LOG", os.path.join(os.path.dirname(CSV_PATH), "ingested.csv"))
+# POST /api/ingest zaman penceresi (yerel saate göre dk): daha eski / daha ileri satırlar reddedilir
+INGEST_MAX_AGE_MINUTES = int(os.getenv("INGEST_MAX_AGE_MINUTES", "1440"))
+INGEST_MAX_AHEAD_MINUTES = int(os.getenv("INGEST_MAX_AHEAD_MINUTES", "5"))
+# EWMA/görevli/recent/store durumunun snapshot'ı (boş = kapalı); açılışta yüklenir,
+# CSV'nin yalnızca sonradan eklenen baytları okunur
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(os.path.dirname(CSV_PATH), "state.npz"))
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL", "60"))     # sn; 0 = yalnızca kapanışta
+# büyük CSV bloklarını parse eden ayrı süreç sayısı (0 = hepsi updater thread'inde)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "1"))
+# 0: updater thread'i / lider seçimi import'ta başlamaz (benchmark, araçlar update_tick'i kendisi çağırır)
+AUTOSTART = os.getenv("PAXFLOW_AUTOSTART", "1") != "0"
+
+# varsayılan yanıt sınıfı orjson (varsa); liste ağırlıklı uçlar FastJSONResponse'u doğrudan
+# döndürür ve jsonable_encoder'ı atlar (NumPy dizileri doğrudan yazılır)
+app = FastAPI(title="EWMA Boarding Load", default_response_class=FastJSONResponse)
 UI_DIR = os.path.join(BASE_DIR, "ui")
 app.mount("/ui", StaticFiles(directory=UI_DIR, html=True), name="ui")
 
@@ -110,8 +178,8 @@ class EWMA:
 
 ewmas: Dict[str, EWMA] = defaultdict(lambda: EWMA(ALPHA))
 officers: Dict[str, int] = defaultdict(lambda: 1)  # cp -> görevli sayısı
-recent: Deque[dict] = deque(maxlen=600)            # ~10 saat / 1 dk
-lock = threading.Lock()
+recent = RecentIndex(per_cp=600)                    # (cp, dakika) -> kayıt, ~10 saat / cp
+lock = TimedLock(threading.Lock(), LOCK_WAIT, "recent")
 
 def calc_level(rho: float) -> str:
     if rho < GREEN: return "GREEN"
@@ -121,12 +189,20 @@ def calc_level(rho: float) -> str:
 def mu_for(cp: str) -> float:
     return max(0.01, officers[cp] * MU_PER_OFFICER)
 
-def build_counts() -> pd.DataFrame:
-    # 1) Dosya kontrolü
-    if not os.path.exists(CSV_PATH) or os.path.getsize(CSV_PATH) == 0:
-        return pd.DataFrame(columns=["ts", "checkpoint_id", "n_t"])
+def officers_needed(lam, threshold: float):
+    """ρ = λ / (k·μ) < threshold için en küçük k (≥ 1); λ skaler ya da NumPy dizisi."""
+    k = np.floor(np.asarray(lam, dtype=float) / (threshold * MU_PER_OFFICER)) + 1
+    return np.maximum(k, 1).astype(np.int64)
 
-    df = pd.read_csv(CSV_PATH)
+def build_counts(start=None, end=None) -> pd.DataFrame:
+    # 1) Kaynak: kolon deposu seçiliyse yalnızca gereken kolonlar/bölümler okunur
+    if columnar is not None:
+        df = columnar.read(["CheckDate", "checkpoint_id"], start, end)
+        df["checkpoint_id"] = df["checkpoint_id"].fillna("CP1")
+    else:
+        if not os.path.exists(CSV_PATH) or os.path.getsize(CSV_PATH) == 0:
+            return pd.DataFrame(columns=["ts", "checkpoint_id", "n_t"])
+        df = pd.read_csv(CSV_PATH, usecols=lambda c: c in ("CheckDate", "ts", "checkpoint_id"))
 
     if df.empty:
         return pd.DataFrame(columns=["ts", "checkpoint_id", "n_t"])
@@ -148,6 +224,12 @@ def build_counts() -> pd.DataFrame:
     # 3) Zamanı dönüştür
     df["ts"] = pd.to_datetime(df["ts"], errors="coerce")
     df = df.dropna(subset=["ts"])
+    if start is not None:
+        df = df[df["ts"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["ts"] <= pd.Timestamp(end)]
+    if df.empty:
+        return pd.DataFrame(columns=["ts", "checkpoint_id", "n_t"])
 
     # 4) Dakikalık sayım (bucket = 1 dakika)
     grp = (
@@ -173,76 +255,522 @@ def build_counts() -> pd.DataFrame:
     return res
 
 
+ingester = CsvTailIngester(CSV_PATH)
+parser = ChunkParser(PARSE_WORKERS)
+# eski günlüklerde checkpoint_id kolonu yoktu: o satırlar CSV yolu gibi CP1 sayılır
+ingest_log = IngestLog(INGEST_LOG, defaults={"checkpoint_id": "CP1"}) if INGEST_LOG else None
+ingest_lock = threading.RLock()                     # updater tick'i ile POST /api/ingest sırayla işlenir
+tick_lock = threading.Lock()                        # update_tick / snapshot
+store = FlowStore(ring_size=RING_SIZE, minute_retention=int(MINUTE_RETENTION_DAYS * 1440))   # tüm okuma uçları buradan beslenir
+hub = LiveHub()                          # /api/stream aboneleri
+# ingest edilen satırların tipli, tarih bölümlü kopyası (STORE_BACKEND=parquet|arrow)
+columnar = ColumnarStore(STORE_DIR, STORE_BACKEND) if STORE_BACKEND != "csv" else None
+archive = MinuteArchive(MINUTE_ARCHIVE) if MINUTE_ARCHIVE else None   # uzun geçmiş sorguları
+store.lock = TimedLock(store.lock, LOCK_WAIT, "store")
+
+REGISTRY.gauge("paxflow_rows_total", "bellekteki toplam satır", lambda: store.total_rows)
+REGISTRY.gauge("paxflow_store_version", "store sürümü (her ingest'te artar)", lambda: store.version)
+REGISTRY.gauge("paxflow_sse_subscribers", "bağlı SSE istemcisi", lambda: hub.subscribers)
+REGISTRY.gauge("paxflow_ingest_offset_bytes", "CSV'de okunan bayt", lambda: ingester.offset)
+
+forecaster = SeasonalForecaster()                # cp başına Holt-Winters (günlük mevsim)
+history_replay = HistoryReplay(ALPHA, GREEN, YELLOW)   # tüm geçmişin λ̂/ρ/seviye matrisleri
+responses = ResponseCache()                      # ağır GET uçlarının hazır JSON baytları
+committed: Dict[str, int] = {}                   # cp -> EWMA'ya işlenmiş son dakika
+pending: Dict[str, set] = defaultdict(set)       # cp -> henüz işlenmemiş dolu dakikalar
+commit_due = False                               # commit'siz işlenmiş blok var: sonraki tick commit eder
+
+def commit_closed_minutes() -> List[dict]:
+    """
+    Tamamlanmış tüm dakikaları (0'lar dahil) tüm checkpoint'ler için tek
+    NumPy adımında EWMA'ya işler. Verideki en yeni dakika henüz açık sayılır.
+    Matris en fazla COMMIT_MAX_MINUTES sütunludur: uzun bir boşluk ya da
+    uzak bir zaman damgası sonrası yalnızca son pencere işlenir (α=0.25
+    ile öncesi zaten unutulmuştur).
+    """
+    counts = store.counts
+    with store.lock:
+        if not counts.last_minute:
+            return []
+        cutoff = max(counts.last_minute.values())
+        cps = sorted(counts.last_minute)
+        # her cp kendi ilk dakikasından ya da son işlenen dakikadan devam eder
+        starts = np.array([committed.get(cp, counts.first_minute[cp] - 1) + 1 for cp in cps])
+        lo = int(starts.min())
+        if cutoff - lo > COMMIT_MAX_MINUTES:
+            lo = cutoff - COMMIT_MAX_MINUTES
+            starts = np.maximum(starts, lo)
+        M = cutoff - lo
+        if M <= 0:
+            return []
+        X = np.zeros((len(cps), M))
+        for i, cp in enumerate(cps):
+            ms = [m for m in pending.get(cp, ()) if m < cutoff]
+            if not ms:
+                continue
+            bucket = counts.by_cp[cp]
+            pending[cp].difference_update(ms)
+            ms = [m for m in ms if m >= starts[i]]   # geç gelen / pencere dışı satırlar EWMA'ya girmez
+            X[i, np.array(ms, dtype=np.int64) - lo] = [bucket[m] for m in ms]
+
+    forecaster.update(cps, lo, X, starts)
+    v0 = np.array([np.nan if ewmas[cp].v is None else ewmas[cp].v for cp in cps])
+    # farklı başlangıçlı cp'ler (yeni açılan hatlar) ayrı gruplarda işlenir
+    lam = np.full(X.shape, np.nan)
+    for s0 in np.unique(starts):
+        rows = np.flatnonzero(starts == s0)
+        off = int(s0) - lo
+        if off < M:
+            lam[rows, off:] = ewma_matrix(X[rows, off:], v0[rows], ALPHA)
+    mu = np.array([mu_for(cp) for cp in cps])
+    rho = lam / mu[:, None]
+
+    for i, cp in enumerate(cps):
+        if starts[i] < cutoff:
+            ewmas[cp].v = float(lam[i, -1])
+        committed[cp] = cutoff - 1
+
+    # recent'e yalnızca sığacak kadar kayıt üret (cp başına per_cp dakika)
+    keep = recent.per_cp
+    recs = []
+    for t in range(max(0, M - keep), M):
+        ts = minute_to_dt(lo + t).isoformat()
+        for i, cp in enumerate(cps):
+            if np.isnan(lam[i, t]):
+                continue
+            n_t = int(X[i, t])
+            recs.append({
+                "ts_minute": ts,
+                "checkpoint_id": cp,
+                "n_t": n_t,
+                "x_t": float(n_t),
+                "lambda_hat": round(float(lam[i, t]), 4),
+                "mu": round(float(mu[i]), 4),
+                "rho": round(float(rho[i, t]), 4),
+                "level": calc_level(rho[i, t]),
+            })
+    with lock:
+        recent.extend(recs)
+    return recs
+
+def _rho_view(rec: dict) -> dict:
+    return {
+        "rho": round(rec.get("rho", 0.0), 3),
+        "lambda_hat": round(rec.get("lambda_hat", 0.0), 3),
+        "mu": round(rec.get("mu", 0.0), 3)
+    }
+
+def data_changed():
+    """Önbellekteki GET yanıtlarını geçersizle; takipçi worker'lara da 'version' olayıyla duyur."""
+    responses.bump()
+    hub.publish("version", {"version": responses.version})
+
+def publish_tick(chunk: Chunk, recs: List[dict]):
+    """Yeni satır/kayıt deltasını tek sefer hesaplayıp tüm SSE abonelerine gönder."""
+    payload = {
+        "records": recs[-200:],
+        "rows": [dict(zip(chunk.columns, r)) for r in chunk.tail[-50:]][::-1] if chunk is not None else [],
+        "metrics": store.last_minutes(dt_to_minute(pd.Timestamp.now().floor("min")), 60),
+        "destinations": store.top_destinations(10),
+    }
+    last_by_cp = {r["checkpoint_id"]: r for r in recs}
+    if last_by_cp:
+        payload["summary"] = [_summarize(r) for _, r in sorted(last_by_cp.items())]
+    if "CP1" in last_by_cp:
+        payload["current_rho"] = _rho_view(last_by_cp["CP1"])
+    hub.publish("tick", payload)
+
+def ingest_chunks(chunks: List[Chunk], commit: bool = True) -> List[dict]:
+    """
+    Özetlenmiş blokları sırayla depoya işle, kapanan dakikaları bir kez
+    commit et. commit=False (açılıştaki geri yüklemeler) commit'i bir
+    sonraki update_tick'e bırakır; o tick yeni satır olmasa da commit eder.
+    """
+    global commit_due
+    with ingest_lock:
+        for chunk in chunks:
+            touched = store.apply(chunk)
+            for cp, pairs in touched.items():
+                pending[cp].update(m for m, _ in pairs)
+            if archive is not None:
+                archive.write(touched, store.counts.by_cp)
+        if not commit:
+            commit_due = commit_due or bool(chunks)
+            return []
+        commit_due = False
+        with EWMA_SECONDS.time():
+            recs = commit_closed_minutes()
+        data_changed()          # önbellekteki GET yanıtları artık eski
+        return recs
+
+def update_tick() -> int:
+    """Tek güncelleme adımı; işlenen yeni satır sayısını döndürür."""
+    with tick_lock:       # shutdown snapshot'ı yarım tick görmesin
+        # yalnızca yeni eklenen satırlar okunur (tick maliyeti O(yeni satır))
+        t0, off0 = time.perf_counter(), ingester.offset
+        # parse + dakika sayımı ayrı süreçte (büyük bloklar); buraya yalnızca özetler gelir
+        if columnar is None:
+            chunks = parser.poll(ingester, RING_SIZE)
+        else:
+            # kolon deposu için satırlar da aynı süreçte tiplenip döner
+            chunks = parser.poll(ingester, RING_SIZE, summarize_typed)
+            for c in chunks:
+                columnar.append(c.frame, ingester.inode, ingester.committed_offset, typed=True)
+        n = sum(c.rows for c in chunks)
+        if chunks:
+            PARSE_SECONDS.observe(time.perf_counter() - t0)
+            INGEST_BYTES.observe(max(0, ingester.offset - off0))
+            INGEST_ROWS.observe(n)
+        if chunks or commit_due:
+            # commit_due: açılışta geri yüklenen (ingest günlüğü vb.) satırlar CSV'de yeni satır olmasa da commit edilir
+            recs = ingest_chunks(chunks)
+            if hub.subscribers:
+                publish_tick(chunks[-1] if chunks else None, recs)
+            TICK_SECONDS.observe(time.perf_counter() - t0)
+        if columnar is not None:
+            columnar.maybe_flush()
+        if ingest_log is not None:
+            ingest_log.maybe_flush()
+        if SNAPSHOT_PATH and time.monotonic() - _last_snapshot >= SNAPSHOT_INTERVAL > 0:
+            save_state()
+        return n
+
+def _snapshot_config() -> list:
+    # bunlar değiştiyse saklı EWMA/ρ/kayıtlar geçersiz: baştan kurulur (JSON'dan liste döner)
+    return [os.path.abspath(CSV_PATH), ALPHA, MU_PER_OFFICER, GREEN, YELLOW, RING_SIZE, MINUTE_RETENTION_DAYS]
+
+_last_snapshot = time.monotonic()
+_snapshot_key = None          # son yazılan snapshot'ın durumu (değişmediyse yeniden yazılmaz)
+# yalnızca ingest'i yürüten süreç snapshot yazar; kapanışta liderliği yeni
+# devralan (boş durumlu) bir worker diskteki snapshot'ı ezmemeli
+state_owner = False
+
+def save_state():
+    """
+    EWMA/görevli/recent/store/tahmin durumunu ve ingester konumunu
+    SNAPSHOT_PATH'e yaz. tick_lock altında çağrılır. ingest_lock altında
+    yalnızca durumun düz veri kopyası alınır ve ingest günlüğünün tamponu
+    ayrılır; günlüğün yazımı/fsync'i, kodlama ve dosya yazımı kilit dışında.
+    Kopya artımlı değildir: dakika sayaçları ve rollup tamamen tutulduğu için
+    süre veri geçmişiyle (≈ dakika × CP) büyür. Bu yüzden son snapshot'tan
+    beri durum değişmediyse (veri sürümü, ofset, commit, görevli) yazılmaz.
+    """
+    global _last_snapshot, _snapshot_key
+    t0 = time.perf_counter()
+    with ingest_lock:
+        key = (SNAPSHOT_PATH, id(store), store.version, ingester.inode, ingester.committed_offset,
+               sorted(committed.items()), sorted(officers.items()))
+        if key == _snapshot_key:
+            _last_snapshot = time.monotonic()
+            return
+        with store.lock:
+            store_state = store.to_state()
+        with lock:
+            recent_state = recent.to_state()
+        state = {
+            "config": _snapshot_config(),
+            # yarım satır saklanmaz: devam, tam satır olarak işlenmiş son bayttan
+            "ingester": {"inode": ingester.inode, "offset": ingester.committed_offset,
+                         "columns": ingester.columns},
+            "store": store_state, "recent": recent_state, "forecaster": forecaster.to_state(),
+            "ewmas": {cp: e.v for cp, e in ewmas.items()}, "officers": dict(officers),
+            "committed": dict(committed),
+            "pending": {cp: np.fromiter(ms, dtype=np.int64, count=len(ms)) for cp, ms in pending.items()},
+        }
+        taken = ingest_log.take() if ingest_log is not None else None      # en son: mark'a kadar sıra tutulur
+    state["ingest_log"] = ingest_log.mark(taken) if ingest_log is not None else None
+    save_snapshot(SNAPSHOT_PATH, encode_snapshot(state))
+    _snapshot_key = key
+    _last_snapshot = time.monotonic()
+    SNAPSHOT_SECONDS.observe(time.perf_counter() - t0)
+
+def _unchanged(path: str, inode, offset: int) -> bool:
+    """Dosya aynı (inode) ve kesilmemiş mi? Öyleyse offset'ten devam edilebilir."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return offset == 0
+    return inode in (None, st.st_ino) and st.st_size >= offset
+
+def restore_state() -> Optional[dict]:
+    """
+    SNAPSHOT_PATH'teki durumu geri yükle. CSV (ve ingest günlüğü) snapshot'tan
+    sonra yalnızca büyüdüyse kullanılır; ardından sadece eklenen baytlar okunur.
+    Yüklenen snapshot'ı (ya da None) döndürür.
+    """
+    global store, recent, forecaster
+    snap = load_snapshot(SNAPSHOT_PATH) if SNAPSHOT_PATH else None
+    if snap is None or snap.get("config") != _snapshot_config():
+        return None
+    st = snap["ingester"]
+    mark = snap["ingest_log"]
+    if not _unchanged(CSV_PATH, st["inode"], st["offset"]):
+        return None
+    if mark is not None and not (ingest_log is not None and _unchanged(INGEST_LOG, mark["inode"], mark["offset"])):
+        return None
+    new_store = FlowStore.from_state(snap["store"])
+    new_store.lock = TimedLock(new_store.lock, LOCK_WAIT, "store")
+    new_recent = RecentIndex.from_state(snap["recent"])
+    new_forecaster = SeasonalForecaster.from_state(snap["forecaster"])
+    with tick_lock, ingest_lock:
+        ingester.reset()
+        ingester.inode, ingester.offset, ingester.columns = st["inode"], st["offset"], st["columns"]
+        store, forecaster = new_store, new_forecaster
+        with lock:
+            recent = new_recent
+        ewmas.clear()
+        for cp, v in snap["ewmas"].items():
+            ewmas[cp].v = v
+        officers.clear()
+        officers.update(snap["officers"])
+        committed.clear()
+        committed.update(snap["committed"])
+        pending.clear()
+        for cp, ms in snap["pending"].items():
+            pending[cp] = set(ms.tolist())
+    data_changed()
+    return snap
+
+def replay_columnar() -> bool:
+    """
+    Kolon deposunun aynaladığı CSV baytlarını depodan (yalnızca gereken
+    kolonlar) belleğe al; ingester o bayttan devam eder. Aynalanmış bir şey
+    yoksa ya da CSV değiştiyse False.
+    """
+    try:
+        st = os.stat(CSV_PATH)
+    except FileNotFoundError:
+        return False
+    done = columnar.mirrored_offset(st.st_ino)
+    if not done or st.st_size < done:
+        return False
+    cols, tail = read_tail(CSV_PATH, RING_SIZE, end=done)      # halka tampon için ham satırlar
+    # API satırları ingest günlüğünden geri yüklenir; günlük yoksa kolon deposundan
+    chunk = columnar.replay(cols, tail, csv_only=ingest_log is not None)
+    if chunk is None:
+        return False
+    ingest_chunks([chunk], commit=False)
+    ingester.inode, ingester.offset, ingester.columns = st.st_ino, done, cols
+    return True
+
+def _csv_columns(chunk):
+    """
+    API satırlarının halka tampon kısmını CSV kolonlarına indir: CSV başlığında
+    olmayan checkpoint_id sonda taşınır, kalsa FlowStore halkayı sıfırlardı.
+    """
+    cols = store.columns or ingester.columns
+    if not cols or chunk.columns == cols or chunk.columns[:len(cols)] != cols:
+        return chunk
+    return chunk._replace(columns=list(cols), tail=[r[:len(cols)] for r in chunk.tail])
+
 def updater_loop():
-    last_size = -1
-    while True:
+    t0 = time.perf_counter()
+    snap = None
+    try:
+        snap = restore_state()
+    except Exception:
+        ERRORS.inc(where="snapshot_restore")
+        log.exception("snapshot yüklenemedi, CSV baştan okunacak")
+    if snap is not None:
+        log.info("snapshot yüklendi (%.3f sn, ofset %d)", time.perf_counter() - t0, ingester.offset)
+    if ingest_log is not None and os.path.exists(INGEST_LOG):
+        # POST ile gelmiş (snapshot'tan sonraki) satırları geri yükle; commit ilk tick'te (CSV'nin birikmiş satırlarıyla birlikte)
+        try:
+            reader = ingest_log.reader(snap["ingest_log"] if snap is not None else None)
+            ingest_chunks([_csv_columns(c) for c in parser.poll(reader, RING_SIZE)], commit=False)
+        except Exception:
+            ERRORS.inc(where="ingest_log_replay")
+            log.exception("ingest günlüğü belleğe alınamadı")
+    if columnar is not None and ingester.offset == 0:
+        # kolon deposuna daha önce yazılmış satırları CSV'yi parse etmeden belleğe al
+        try:
+            if replay_columnar():
+                log.info("kolon deposu yüklendi (%.3f sn, ofset %d)", time.perf_counter() - t0, ingester.offset)
+        except Exception:
+            ingester.reset()
+            ERRORS.inc(where="columnar_replay")
+            log.exception("kolon deposu belleğe alınamadı, CSV baştan okunacak")
+    global state_owner
+    state_owner = True        # bundan sonra bu sürecin durumu snapshot'a yazılabilir
+    # sabit 1 sn uyku yerine dosyaya yazıldığı anda uyan; boştayken yalnızca idle tick
+    watcher = FileWatcher(CSV_PATH, WATCH_DEBOUNCE_MS, WATCH_IDLE_SECONDS, mode=WATCH_MODE)
+    for changed in itertools.chain([True], watcher.events()):     # ilk tick: birikmiş satırlar
+        WATCH_WAKEUPS.inc(reason="change" if changed else "idle")
         try:
-            size = os.path.getsize(CSV_PATH) if os.path.exists(CSV_PATH) else -1
-            if size != last_size:
-                res = build_counts()
-                if not res.empty:
-                    last = res.iloc[-1]
-                    ts = last["ts"]
-                    cp = str(last["checkpoint_id"])
-                    n_t = int(last["n_t"])
-                    x_t = n_t / 1.0  # kişi/dk
-                    lam = ewmas[cp].update(x_t)
-                    mu = mu_for(cp)
-                    rho = lam / mu if mu > 0 else 999.0
-                    rec = {
-                        "ts_minute": ts.isoformat(),
-                        "checkpoint_id": cp,
-                        "n_t": n_t,
-                        "x_t": x_t,
-                        "lambda_hat": round(lam, 4),
-                        "mu": round(mu, 4),
-                        "rho": round(rho, 4),
-                        "level": calc_level(rho)
-                    }
-                    with lock:
-                        recent.append(rec)
-                last_size = size
+            update_tick()
         except Exception:
-            pass
-        time.sleep(1.0)
+            ERRORS.inc(where="updater")
+            log.exception("updater tick başarısız")
 
-# arka planda CSV’yi izleyen thread
-threading.Thread(target=updater_loop, daemon=True).start()
+coordinator = Coordinator(STATE_SOCKET)
+
+def _start_leader():
+    # arka planda CSV’yi izleyen thread (yalnızca lider süreçte)
+    threading.Thread(target=updater_loop, daemon=True).start()
+    coordinator.serve(app)
+
+def _relay_event(event: bytes):
+    # liderin veri sürümü değişti: yerel önbellekteki yanıtlar eski (tarayıcılara iletilmez)
+    if b"\nevent: version\n" in event:
+        responses.bump()
+    else:
+        hub.publish_raw(event)
+
+def _start_follower():
+    threading.Thread(target=coordinator.relay_stream, args=(_relay_event, responses.bump), daemon=True).start()
+
+if AUTOSTART:
+    coordinator.start(_start_leader, _start_follower)
+else:
+    coordinator.is_leader = True
+
+# sürümle önbelleklenen GET uçları; CLOCK_PATHS ayrıca duvar saatinin dakikasına bağlı
+CACHED_PATHS = {
+    "/api/csv/latest", "/api/summary", "/api/latest", "/api/metrics/last_minutes",
+    "/api/metrics/last_hours", "/api/metrics/range", "/api/destinations", "/api/color-durations",
+    "/api/warning-durations", "/api/current-rho", "/api/forecast", "/api/staffing/plan",
+    "/api/history",
+}
+CLOCK_PATHS = {"/api/metrics/last_minutes", "/api/staffing/plan"}
+
+@app.middleware("http")
+async def _route_to_leader(request, call_next):
+    """Takipçi worker'da durum okuyan/yazan /api çağrılarını lidere ilet."""
+    path = request.url.path
+    if coordinator.is_leader or not path.startswith("/api/") or path == "/api/stream":
+        return await call_next(request)
+    target = path + ("?" + request.url.query if request.url.query else "")
+    body = await request.body()
+    try:
+        status, headers, data = await asyncio.to_thread(
+            coordinator.forward, request.method, target, list(request.headers.items()), body)
+    except (OSError, http.client.HTTPException):
+        return JSONResponse({"detail": "Lider süreç henüz hazır değil."}, status_code=503)
+    return Response(content=data, status_code=status, headers=dict(headers))
+
+@app.middleware("http")
+async def _cache_responses(request, call_next):
+    """
+    Veri sürümü değişmediyse yanıtı hazır bayttan (ya da 304) ver. Takipçi
+    worker'da da çalışır (lidere iletmenin dışında): liderin 'version'
+    olayları yerel sürümü artırır, böylece isabetler lidere hiç gitmez.
+    Liderin akışı alınamıyorsa takipçi önbelleği kullanmaz.
+    """
+    path = request.url.path
+    if request.method != "GET" or path not in CACHED_PATHS or not (coordinator.is_leader or coordinator.relay_connected):
+        return await call_next(request)
+    key = path + "?" + "&".join(sorted(request.url.query.split("&")))
+    # sürüm hesaplamadan önce alınır: hesap sırasında ingest olursa kayıt zaten eski sayılır
+    stamp = (responses.version, int(time.time() // 60) if path in CLOCK_PATHS else None)
+    # Cache-Control: no-cache -> yeniden hesapla (ve kaydı tazele); benchmark uç noktanın kendisini ölçer
+    bypass = "no-cache" in request.headers.get("cache-control", "")
+    hit = None if bypass else responses.get(key, stamp)
+    if hit is None:
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        hit = responses.put(key, stamp, body, response.headers.get("content-type", "application/json"))
+        result = "bypass" if bypass else "miss"
+    else:
+        result = "hit"
+    etag, body, media_type = hit
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        CACHE_RESULTS.inc(result="not_modified")
+        return Response(status_code=304, headers={"ETag": etag})
+    CACHE_RESULTS.inc(result=result)
+    return Response(content=body, headers={"ETag": etag, "Content-Type": media_type})
+
+_ROUTE_PATHS = set()
+
+def _route_label(request) -> str:
+    """
+    Rota şablonu (ham path değil) -> sınırlı kardinalite. Önbellek
+    isabetleri / 304'ler ve lidere iletilen istekler rotaya hiç ulaşmaz;
+    onlar path'in bilinen bir rotayla eşleşmesiyle etiketlenir.
+    """
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+    if not _ROUTE_PATHS:
+        _ROUTE_PATHS.update(r.path for r in app.routes if "{" not in r.path)
+    path = request.url.path
+    return path if path in _ROUTE_PATHS else "other"
+
+@app.middleware("http")
+async def _time_requests(request, call_next):
+    t = time.perf_counter()
+    response = await call_next(request)
+    HTTP_SECONDS.observe(time.perf_counter() - t, method=request.method,
+                         path=_route_label(request), status=response.status_code)
+    return response
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metin formatında süre histogramları ve sayaçlar (bu worker'ın)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.on_event("shutdown")
+def _flush_columnar():
+    if not coordinator.is_leader:
+        return
+    if columnar is not None:
+        columnar.flush()
+    if archive is not None:
+        archive.flush()
+    if ingest_log is not None:
+        ingest_log.flush()
+    if SNAPSHOT_PATH and state_owner:
+        with tick_lock:
+            save_state()
+    parser.close()
+
+def _row_bytes() -> float:
+    """CSV'deki ortalama satır boyu (okunan bayt / satır); veri yoksa kaba bir tahmin."""
+    rows = store.total_rows
+    return ingester.committed_offset / rows if rows and ingester.committed_offset else 256.0
 
 @app.get("/api/csv/latest")
-def csv_latest(limit: int = 50):
+def csv_latest(limit: int = 50, shape: str = "rows"):
     """
     CSV'nin son N satırını gönderir (en yeni en üstte).
+    Halka tampon yetiyorsa diske dokunmaz; yetmiyorsa dosya sondan geriye
+    okunur, yani gecikme CSV boyutundan bağımsızdır; tahmini boyutu
+    parser.inline_bytes'ı aşan kuyruklar ayrı süreçte okunur. shape=columns
+    kolon dizileri döndürür.
     """
     try:
-        # Basit CSV okuma
-        df = pd.read_csv(CSV_PATH)
-        
-        if df.empty:
-            return {"columns": list(df.columns), "rows": []}
+        limit = int(limit)
+        if store.covers_tail(limit):
+            return FastJSONResponse(store.tail(limit, shape))
+        if not os.path.exists(CSV_PATH):
+            return {"columns": [], "rows": []}
+        if limit * _row_bytes() < parser.inline_bytes:
+            cols, rows = read_tail(CSV_PATH, limit)               # küçük kuyruk: IPC okumadan pahalı
+        else:
+            cols, rows = parser.run(read_tail, CSV_PATH, limit)  # büyük kuyruk: ayrı süreçte
+        return FastJSONResponse(rows_payload(cols, rows, shape))
 
-        # son N satır
-        tail = df.tail(int(limit)).copy().reset_index(drop=True)
-        
-        # basit satır id'si
-        tail["__rowid"] = tail.index.astype(int)
-        
-        # NaN değerleri temizle ve tüm kolonları string yap
-        for col in tail.columns:
-            if col != "__rowid":
-                # NaN değerleri boş string yap
-                tail[col] = tail[col].fillna("")
-                # String'e çevir
-                tail[col] = tail[col].astype(str)
-
-        rows = tail.to_dict(orient="records")[::-1]  # en yeni en üste
-        return {"columns": list(tail.columns), "rows": rows}
-        
     except Exception as e:
+        ERRORS.inc(where="csv_latest")
         # Hata durumunda basit bir hata mesajı döndür
         import traceback
         return {"columns": [], "rows": [], "error": str(e), "traceback": traceback.format_exc()}
 
+@app.get("/api/stream")
+async def stream():
+    """
+    Server-Sent Events: updater_loop yeni satır/kayıt işlediğinde tek bir
+    'tick' deltası yayınlanır (records, summary, rows, metrics,
+    destinations, current_rho). Bağlanan istemci ilk durumu normal
+    GET uçlarından bir kez çeker, sonra yalnızca deltaları uygular.
+    """
+    q = hub.subscribe()
+    return StreamingResponse(
+        hub.stream(q), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/health")
 def health():
     return {"ok": True, "csv": os.path.abspath(CSV_PATH)}
@@ -253,23 +781,21 @@ def test():
 
 @app.get("/api/summary")
 def summary(minutes: int = 15):
+    # recent eklemede tekilleştirir; son N kayıt sıralamasız dilimlenir
     with lock:
-        data = list(recent)
-    # aynı dakika + checkpoint için en güncel kaydı al
-    data = _dedupe_by_minute(data)[-minutes:]
+        data = recent.last(minutes)
     human = [_summarize(r) for r in data]
-    return JSONResponse(human)
+    return FastJSONResponse(human)
 
 
 
 
 @app.get("/api/latest")
-def latest(minutes: int = 60):
+def latest(minutes: int = 60, shape: str = "rows"):
     with lock:
-        data = list(recent)
-    data = _dedupe_by_minute(data)
-    out = data[-minutes:]
-    return JSONResponse(out)
+        out = recent.last(minutes)
+    # shape=columns: {"ts_minute": [...], "rho": [...], ...}
+    return FastJSONResponse(columns_of(out) if shape == "columns" else out)
 
 
 @app.post("/api/capacity")
@@ -277,222 +803,311 @@ def set_capacity(payload: dict):
     cp = str(payload.get("checkpoint_id", "CP1"))
     n = int(payload.get("officers", 1))
     officers[cp] = max(1, n)
+    data_changed()          # μ değişti: özet/tahmin/plan yanıtları yeniden hesaplanmalı
     # mu güncellenir, sonraki döngüde rho/level güncel gelir
     return {"ok": True, "checkpoint_id": cp, "officers": officers[cp], "mu_per_officer": MU_PER_OFFICER}
 
-from datetime import timedelta
-
-@app.get("/api/metrics/last_minutes")
-def metrics_last_minutes(minutes: int = 60):
-    """
-    CSV'den okumaya dayanarak son N dakikanın tamamını (0'lar dahil)
-    dakika dakika döndürür. UI üst KPI'lar ve bar chart bu veriyi kullanabilir.
-    """
-    path = os.path.abspath(CSV_PATH)
-    if not os.path.exists(path) or os.path.getsize(path) == 0:
-        # Boş seri üret
-        end = pd.Timestamp.now().floor("min")
-        idx = pd.date_range(end=end, periods=minutes, freq="1min")
-        series = [{"ts": t.isoformat(), "count": 0} for t in idx]
-        return {
-            "series": series,
-            "kpis": {"total": 0, "avg_per_min": 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0},
-        }
-
-    # CSV'yi toleranslı oku (eşzamanlı yazımda sorun çıkmasın)
-    df = pd.read_csv(path)
+def _ingest_frame(body: bytes, content_type: str) -> pd.DataFrame:
+    """Gövde -> str kolonlu DataFrame: başlıklı CSV ya da JSON satırları / JSON dizi."""
+    if "csv" in content_type:
+        df = pd.read_csv(io.BytesIO(body), dtype=str, keep_default_na=False, on_bad_lines="skip")
+        df.columns = [str(c).strip() for c in df.columns]
+        return df
+    body = body.strip()
+    recs = loads(body) if body.startswith(b"[") else [loads(ln) for ln in body.splitlines() if ln.strip()]
+    return pd.DataFrame([{k: "" if v is None else str(v) for k, v in r.items()} for r in recs])
+
+def ingest_batch(body: bytes, content_type: str) -> dict:
+    try:
+        df = _ingest_frame(body, content_type)
+    except (ValueError, TypeError, AttributeError) as e:
+        raise HTTPException(400, f"Gövde okunamadı: {e}")
     if df.empty:
-        end = pd.Timestamp.now().floor("min")
-        idx = pd.date_range(end=end, periods=minutes, freq="1min")
-        series = [{"ts": t.isoformat(), "count": 0} for t in idx]
-        return {
-            "series": series,
-            "kpis": {"total": 0, "avg_per_min": 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0},
-        }
-
-    # Zaman sütunu
-    ts_col = _find_ts_col(df.columns)
+        return {"accepted": 0, "rejected": 0}
+    ts_col = resolve_ts_col(df.columns)
     if ts_col is None:
-        raise HTTPException(status_code=400, detail=f"Zaman sütunu bulunamadı. Mevcut: {list(df.columns)}")
+        raise HTTPException(400, "Zaman damgası alanı yok (CheckDate ya da ts)")
 
-    # Normalize et
+    # checkpoint_id CSV başlığında olmasa da korunur (yoksa CSV yolu gibi CP1); ingest
+    # günlüğüne ve kolon deposuna da yazılır, halka tampona yalnızca CSV kolonları girer
     if "checkpoint_id" not in df.columns:
         df["checkpoint_id"] = "CP1"
-    df[ts_col] = pd.to_datetime(df[ts_col], errors="coerce")
-    df = df.dropna(subset=[ts_col])
+    # CSV ile aynı kolonlara hizala (eksikler boş, bilinmeyenler atılır)
+    cols = store.columns or ingester.columns
+    if cols:
+        want = resolve_ts_col(cols)
+        if want is not None and want != ts_col:
+            df = df.rename(columns={ts_col: want})
+            ts_col = want
+        df = df.reindex(columns=cols + ([] if "checkpoint_id" in cols else ["checkpoint_id"]), fill_value="")
+    ts = pd.to_datetime(df[ts_col], errors="coerce")
+    bad = ts.isna().to_numpy()
+    m = ts.to_numpy().astype("datetime64[m]").astype("int64")
+    now = dt_to_minute(pd.Timestamp.now().floor("min"))
+    future = ~bad & (m > now + INGEST_MAX_AHEAD_MINUTES)
+    too_old = ~bad & (m < now - INGEST_MAX_AGE_MINUTES)
+    cps = df["checkpoint_id"].to_numpy()
+
+    with ingest_lock:                  # snapshot bellek ile günlüğü aynı anda görsün
+        # EWMA'ya işlenmiş dakikalara düşen satırlar kabul edilmez (sayaçlar ile λ̂ ayrışırdı)
+        done = np.array([committed.get(str(cp), np.iinfo(np.int64).min) for cp in cps], dtype=np.int64)
+        late = ~(bad | future | too_old) & (m <= done)
+        ok = ~(bad | future | too_old | late)
+        reasons = {"bad_ts": int(bad.sum()), "future": int(future.sum()),
+                   "too_old": int(too_old.sum()), "late": int(late.sum())}
+        rejected = len(df) - int(ok.sum())
+        if not ok.any():
+            raise HTTPException(400, {"message": "Tüm satırlar reddedildi", "rejected": rejected, "reasons": reasons})
+        df = df[ok].reset_index(drop=True)
+        INGEST_ROWS.observe(len(df))
+        chunk = _csv_columns(summarize(df, RING_SIZE))
+        recs = ingest_chunks([chunk])
+        if ingest_log is not None:
+            ingest_log.append(df)      # diske arkadan yazılır
+        if columnar is not None:
+            columnar.append(df, source="api")     # manifeste (CSV ofseti) dokunmaz
+    if hub.subscribers:
+        publish_tick(chunk, recs)
+    return {"accepted": len(df), "rejected": rejected, "reasons": reasons, "records": len(recs)}
+
+@app.post("/api/ingest")
+async def ingest(request: Request):
+    """
+    Toplu kayıt gönderimi (gate tarayıcıları): gövde JSON satırları
+    (application/x-ndjson ya da JSON dizi) veya başlıklı CSV (text/csv).
+    Satırlar doğrudan dakika sayaçlarına ve EWMA'ya işlenir, INGEST_LOG'a
+    arkadan yazılır, kolon deposu açıksa oraya da (source="api") eklenir;
+    paylaşılan CSV dosyasına dokunulmaz. Zaman damgası okunamayan, şimdiden
+    INGEST_MAX_AGE_MINUTES eski / INGEST_MAX_AHEAD_MINUTES ileri ya da
+    CP'nin EWMA'ya işlenmiş son dakikasından eski satırlar reddedilir;
+    hiçbiri kabul edilmezse 400.
+    """
+    body = await request.body()
+    return await run_in_threadpool(ingest_batch, body, request.headers.get("content-type", ""))
 
-    # Hedef zaman aralığı: son N tam dakika
-    end = pd.Timestamp.now().floor("min")
-    start = end - pd.Timedelta(minutes=minutes-1)
-    # Dakikalık sayım
-    grp = (
-        df.set_index(ts_col)
-          .groupby("checkpoint_id")
-          .resample("1min").size()
-          .rename("n_t")
-          .reset_index()
-    )
-    # Her CP için eksik dakikaları 0 ile doldur, sonra aralığa kırp
-    frames = []
-    for cp, g in grp.groupby("checkpoint_id"):
-        g = g.set_index(ts_col).asfreq("1min")
-        g["n_t"] = g["n_t"].fillna(0).astype(int)
-        g["checkpoint_id"] = cp
-        g = g.loc[start:end].reset_index()
-        frames.append(g)
-    if frames:
-        res = pd.concat(frames, ignore_index=True)
+def lambda_horizon(horizon: int):
+    """
+    Tüm CP'ler için önümüzdeki `horizon` dakikanın beklenen λ matrisi
+    (C × H) ve her satırın ilk dakikası: Holt-Winters tahmini; modeli
+    olmayan CP'de son EWMA sabit kabul edilir.
+    """
+    with lock:
+        cps = list(recent.checkpoints)
+        flat = np.array([recent.latest(cp)["lambda_hat"] for cp in cps], dtype=float)
+    lam, first = forecaster.forecast(cps, horizon)
+    missing = np.isnan(lam).all(axis=1)
+    lam[missing] = flat[missing, None]
+    first[missing] = dt_to_minute(pd.Timestamp.now().floor("min"))
+    return cps, lam, first
+
+def forecast_peak(cp: str, horizon: int):
+    """cp için ufuktaki en yüksek beklenen λ ve dakikası; model yoksa None."""
+    lam, first = forecaster.forecast([cp], horizon)
+    if np.isnan(lam[0, 0]):
+        return None
+    i = int(np.argmax(lam[0]))
+    return float(lam[0, i]), int(first[0]) + i
+
+@app.get("/api/history")
+def history(checkpoint_id: Optional[str] = None, from_: Optional[str] = Query(None, alias="from"),
+            to: Optional[str] = None, offset: int = 0, limit: int = 1000, shape: str = "rows"):
+    """
+    Verinin tamamı için dakika dakika λ̂, μ, ρ ve seviye (/api/latest kayıt
+    biçimi), zaman sırasıyla ve sayfalı: offset/limit, sonraki sayfa için
+    next_offset. μ güncel görevli sayılarıyla hesaplanır. Matrisler veri
+    sürümü değişene kadar saklanır; sayfalar yeniden hesaplama yapmaz.
+    """
+    try:
+        lo = dt_to_minute(pd.Timestamp(from_).floor("min")) if from_ else None
+        hi = dt_to_minute(pd.Timestamp(to).floor("min")) if to else None
+    except ValueError:
+        raise HTTPException(400, "from/to ISO zaman olmalı")
+    offset, limit = max(0, int(offset)), min(max(1, int(limit)), 10_000)
+    with store.lock:
+        key = (store.version, tuple((cp, mu_for(cp)) for cp in sorted(store.counts.last_minute)))
+        rep = history_replay.get(key, store.counts, mu_for)
+    if rep is None:
+        total, cols = 0, columns_of([], ["ts_minute", "checkpoint_id", "n_t", "x_t", "lambda_hat", "mu", "rho", "level"])
     else:
-        res = pd.DataFrame(columns=[ts_col, "checkpoint_id", "n_t"])
+        total, cols = rep.page(checkpoint_id, lo, hi, offset, limit)
+    n = len(cols["ts_minute"])
+    records = cols if shape == "columns" else [dict(zip(cols, vals)) for vals in zip(*cols.values())]
+    return FastJSONResponse({"total": total, "offset": offset, "limit": limit,
+                             "next_offset": offset + n if offset + n < total else None, "records": records})
+
+@app.get("/api/forecast")
+def forecast(horizon: int = 60, checkpoint_id: Optional[str] = None):
+    """
+    Önümüzdeki `horizon` dakika için CP başına beklenen kişi/dk (λ) ve
+    mevcut görevli sayısıyla ρ. Toplamsal Holt-Winters, günlük mevsim;
+    her kapanan dakikada artımlı güncellenir.
+    """
+    horizon = min(max(1, int(horizon)), 24 * 60)
+    cps = [checkpoint_id] if checkpoint_id else list(forecaster.cps)
+    lam, first = forecaster.forecast(cps, horizon)
+    out = []
+    for i, cp in enumerate(cps):
+        if np.isnan(lam[i, 0]):
+            continue
+        rho = lam[i] / mu_for(cp)
+        k = int(np.argmax(rho))
+        out.append({
+            "checkpoint_id": cp,
+            "from": minute_to_dt(first[i]).isoformat(),
+            "lambda": np.round(lam[i], 3).tolist(),
+            "rho": np.round(rho, 3).tolist(),
+            "peak_rho": round(float(rho[k]), 3),
+            "peak_ts": minute_to_dt(first[i] + k).isoformat(),
+            "level": calc_level(rho[k]),
+        })
+    return {"horizon_minutes": horizon, "checkpoints": out}
+
+def plan_allocation(peak: np.ndarray, budget=None):
+    """
+    Tepe λ vektörü için görevli dağılımı. Bütçe yetiyorsa hepsini GREEN'e,
+    yetmiyorsa önce hepsini YELLOW'a çekip kalanla en ucuz GREEN
+    yükseltmelerini yapar; o da yetmiyorsa en kötü ρ'yu en aza indirir.
+    Her CP'ye en az bir görevli gerekir: bütçe CP sayısından azsa ValueError.
+    """
+    if budget is not None and budget < len(peak):
+        raise ValueError(f"bütçe ({budget}) checkpoint sayısından ({len(peak)}) az: her CP'ye en az 1 görevli gerekir")
+    green, yellow = officers_needed(peak, GREEN), officers_needed(peak, YELLOW)
+    if budget is None or green.sum() <= budget:
+        return green, "GREEN"
+    if yellow.sum() <= budget:
+        alloc = yellow.copy()
+        spare = budget - int(yellow.sum())
+        gap = green - yellow
+        for i in np.argsort(gap, kind="stable"):          # en az ek görevliyle yeşile dönenler önce
+            if gap[i] > spare:
+                break
+            alloc[i] = green[i]
+            spare -= int(gap[i])
+        return alloc, "YELLOW"
+    # ρ* üzerinde ikili arama: sum(ceil(peak / (ρ*·μ))) <= bütçe olan en küçük ρ*
+    lo_r, hi_r = YELLOW, max(float(peak.max()) / MU_PER_OFFICER, YELLOW)
+    for _ in range(50):
+        mid = (lo_r + hi_r) / 2
+        need = np.maximum(np.ceil(peak / (mid * MU_PER_OFFICER)), 1)
+        lo_r, hi_r = (lo_r, mid) if need.sum() <= budget else (mid, hi_r)
+    alloc = np.maximum(np.ceil(peak / (hi_r * MU_PER_OFFICER)), 1).astype(np.int64)
+    for _ in range(budget - int(alloc.sum())):            # artan görevliler en yüksek ρ'ya
+        alloc[np.argmax(peak / (alloc * MU_PER_OFFICER))] += 1
+    return alloc, "BEST_EFFORT"
+
+@app.get("/api/staffing/plan")
+def staffing_plan(horizon: int = 60, budget: Optional[int] = None):
+    """
+    Ne-olursa (what-if) görevli planı: tüm CP'ler × önümüzdeki `horizon`
+    dakika tek NumPy adımında değerlendirilir. `budget` toplam görevli
+    üst sınırıdır; verilmezse herkesi GREEN'de tutan en küçük dağılım döner.
+    """
+    horizon = min(max(1, int(horizon)), 24 * 60)
+    cps, lam, first = lambda_horizon(horizon)
+    if not cps:
+        return {"horizon_minutes": horizon, "budget": budget, "target": None, "feasible": True,
+                "total_officers": 0, "checkpoints": []}
+    peak = lam.max(axis=1)
+    peak_at = lam.argmax(axis=1)
+    try:
+        alloc, target = plan_allocation(peak, budget)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    rho = peak / (alloc * MU_PER_OFFICER)
+    return {
+        "horizon_minutes": horizon,
+        "budget": budget,
+        "mu_per_officer": MU_PER_OFFICER,
+        "target": target,
+        "feasible": target != "BEST_EFFORT",
+        "total_officers": int(alloc.sum()),
+        "checkpoints": [{
+            "checkpoint_id": cp,
+            "current_officers": officers[cp],
+            "peak_lambda": round(float(peak[i]), 3),
+            "peak_ts": minute_to_dt(first[i] + peak_at[i]).isoformat(),
+            "needed_for_green": int(officers_needed(peak[i], GREEN)),
+            "needed_for_yellow": int(officers_needed(peak[i], YELLOW)),
+            "recommended": int(alloc[i]),
+            "delta": int(alloc[i]) - officers[cp],
+            "peak_rho": round(float(rho[i]), 3),
+            "level": calc_level(rho[i]),
+        } for i, cp in enumerate(cps)],
+    }
 
-    # Toplam (tüm CP'ler) dakika dakika
-    total_per_min = (
-        res.groupby(ts_col)["n_t"].sum()
-          .reindex(pd.date_range(start=start, end=end, freq="1min"), fill_value=0)
-    )
-    series = [{"ts": t.isoformat(), "count": int(c)} for t, c in total_per_min.items()]
-
-    # KPI'lar
-    total = int(total_per_min.sum())
-    avg = float(total_per_min.mean()) if len(total_per_min) else 0.0
-    peak_count = int(total_per_min.max()) if len(total_per_min) else 0
-    peak_ts = (
-        total_per_min.idxmax().isoformat() if len(total_per_min) and peak_count > 0 else None
-    )
-    cp_count = res["checkpoint_id"].nunique() if not res.empty else 0
+from datetime import timedelta
 
-    return {"series": series,
-            "kpis": {"total": total, "avg_per_min": round(avg, 2),
-                     "peak_count": peak_count, "peak_ts": peak_ts, "cp_count": int(cp_count)}}
+@app.get("/api/metrics/last_minutes")
+def metrics_last_minutes(minutes: int = 60, shape: str = "rows"):
+    """
+    Son N dakikanın tamamını (0'lar dahil) dakika dakika döndürür.
+    UI üst KPI'lar ve bar chart bu veriyi kullanabilir.
+    Bellekteki dakikalık sayaçlardan hesaplanır.
+    """
+    end = dt_to_minute(pd.Timestamp.now().floor("min"))
+    return FastJSONResponse(store.last_minutes(end, max(1, int(minutes)), shape))
 
 @app.get("/api/destinations")
 def get_destination_stats():
     """En çok gidilen destinasyonları döndür"""
     try:
-        if not os.path.exists(CSV_PATH) or os.path.getsize(CSV_PATH) == 0:
-            return {"destinations": []}
-        
-        df = pd.read_csv(CSV_PATH)
-        if df.empty or "DestinationAirport" not in df.columns:
-            return {"destinations": []}
-        
-        # Destinasyon sayılarını hesapla
-        dest_counts = df["DestinationAirport"].value_counts()
-        
-        # Top 10 destinasyonu al
-        top_destinations = dest_counts.head(10)
-        
-        # Toplam sayıyı hesapla
-        total_flights = len(df)
-        
-        # Yüzde hesapla ve formatla
-        destinations = []
-        for dest, count in top_destinations.items():
-            percentage = (count / total_flights) * 100
-            destinations.append({
-                "destination": str(dest),
-                "count": int(count),
-                "percentage": round(percentage, 1)
-            })
-        
-        return {"destinations": destinations, "total_flights": total_flights}
-        
+        return store.top_destinations(10)
     except Exception as e:
+        ERRORS.inc(where="get_destination_stats")
         return {"destinations": [], "error": str(e)}
 
 @app.get("/api/color-durations")
 def get_color_durations():
-    """Son 60 dakikadaki renk sürelerini döndür"""
+    """Son 60 dakikadaki renk sürelerini döndür (her checkpoint'in kendi son 60 dakikası)"""
     try:
-        with lock:
-            data = list(recent)
-        
-        if not data:
-            return {"colors": {"GREEN": 0, "YELLOW": 0, "RED": 0}, "total_minutes": 0}
-        
-        # Son 60 dakikayı al
-        data = _dedupe_by_minute(data)[-60:]
-        
-        # Renk sayılarını hesapla
+        # Sayaçlar kayıt eklenirken güncelleniyor; burada yalnızca toplanır
         color_counts = {"GREEN": 0, "YELLOW": 0, "RED": 0}
-        for record in data:
-            level = record.get("level", "GREEN")
-            color_counts[level] += 1
+        by_cp = {}
+        with lock:
+            for cp, w in recent.level_stats():
+                by_cp[cp] = dict(w.hist)
+                for level, n in w.hist.items():
+                    color_counts[level] += n
         
-        total_minutes = len(data)
+        total_minutes = sum(color_counts.values())
         
-        return {"colors": color_counts, "total_minutes": total_minutes}
+        return {"colors": color_counts, "total_minutes": total_minutes, "by_checkpoint": by_cp}
         
     except Exception as e:
+        ERRORS.inc(where="get_color_durations")
         return {"colors": {"GREEN": 0, "YELLOW": 0, "RED": 0}, "total_minutes": 0, "error": str(e)}
 
 @app.get("/api/warning-durations")
 def get_warning_durations():
     """RED durumunun üst üste kaç dakika sürdüğünü döndür"""
     try:
-        with lock:
-            data = list(recent)
-        
-        if not data:
-            return {"durations": [], "max_red_streak": 0}
-        
-        # Son 60 dakikayı al
-        data = _dedupe_by_minute(data)[-60:]
-        
-        # Her CP için RED streak'lerini hesapla
-        cp_red_streaks = {}
-        current_streaks = {}
-        
-        for record in data:
-            cp = record.get("checkpoint_id", "CP1")
-            level = record.get("level", "GREEN")
-            
-            if level == "RED":
-                # RED streak'i artır
-                current_streaks[cp] = current_streaks.get(cp, 0) + 1
-            else:
-                # RED streak'i bitir ve kaydet
-                if cp in current_streaks and current_streaks[cp] > 0:
-                    if cp not in cp_red_streaks:
-                        cp_red_streaks[cp] = []
-                    cp_red_streaks[cp].append(current_streaks[cp])
-                current_streaks[cp] = 0
-        
-        # Aktif streak'leri de ekle
-        for cp, streak in current_streaks.items():
-            if streak > 0:
-                if cp not in cp_red_streaks:
-                    cp_red_streaks[cp] = []
-                cp_red_streaks[cp].append(streak)
-        
-        # Sonuçları formatla
         durations = []
         max_red_streak = 0
-        
-        for cp, streaks in cp_red_streaks.items():
-            if streaks:
-                max_streak = max(streaks)
+        with lock:
+            for cp, w in recent.level_stats():
+                if not w.runs:
+                    continue
+                max_streak = w.max_red
                 max_red_streak = max(max_red_streak, max_streak)
                 durations.append({
                     "checkpoint": cp,
                     "max_streak": max_streak,
-                    "current_streak": current_streaks.get(cp, 0),
-                    "total_red_minutes": sum(streaks)
+                    "current_streak": w.current_red,
+                    "total_red_minutes": w.hist["RED"]
                 })
         
-        # CP'ye göre sırala
-        durations.sort(key=lambda x: x["checkpoint"])
-        
+        # level_stats zaten CP sırasında
         return {
             "durations": durations,
             "max_red_streak": max_red_streak
         }
         
     except Exception as e:
+        ERRORS.inc(where="get_warning_durations")
         return {"durations": [], "max_red_streak": 0, "error": str(e)}
     
 @app.get("/api/metrics/last_hours")
-def metrics_last_hours(hours: int = 24):
+def metrics_last_hours(hours: int = 24, shape: str = "rows"):
     """
     Saat başına toplam geçen kişi (tüm CP'lerin toplamı).
     Çıkış:
@@ -501,80 +1116,88 @@ def metrics_last_hours(hours: int = 24):
       "kpis":   { "total":..., "avg_per_hour":..., "peak_count":..., "peak_ts":..., "cp_count":... }
     }
     """
-    df = build_counts()  # 'ts', 'checkpoint_id', 'n_t' (dakikalık) döner
-    if df.empty:
-        return {"series": [], "kpis": {"total": 0, "avg_per_hour": 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0}}
+    # saat katmanından ~N okuma; ham satır ya da dakika taranmaz
+    return FastJSONResponse(store.last_hours(max(1, int(hours)), shape))
 
-    df = df.dropna(subset=["ts"])
-    end_ts = df["ts"].max()
-    hours = max(1, int(hours))
-    start_ts = end_ts - pd.Timedelta(hours=hours - 1)
-
-    win = df[(df["ts"] >= start_ts) & (df["ts"] <= end_ts)]
-    if win.empty:
-        return {"series": [], "kpis": {"total": 0, "avg_per_hour": 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0}}
-
-    # Saat tabanına indir ve tüm CP'leri topla
-    s = (
-        win.assign(hour=win["ts"].dt.floor("H"))
-           .groupby("hour")["n_t"].sum()
-           .reset_index()
-           .sort_values("hour")
-    )
 
-    series = [{"ts": t.isoformat(), "count": int(c)} for t, c in zip(s["hour"], s["n_t"])]
-
-    total = int(s["n_t"].sum())
-    avg = float(s["n_t"].mean()) if not s.empty else 0.0
-    if not s.empty:
-        idx = s["n_t"].idxmax()
-        peak_count = int(s.loc[idx, "n_t"])
-        peak_ts = s.loc[idx, "hour"].isoformat()
-    else:
-        peak_count, peak_ts = 0, None
-    cp_count = int(win["checkpoint_id"].nunique())
+STEPS = {"minute": 1, "hour": 60, "day": 1440}
 
+def _range_payload(starts, sums, avg_key: str, cp_count: int, shape: str = "rows") -> dict:
+    if not len(sums):
+        return {"series": series([], [], shape), "kpis": {"total": 0, avg_key: 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0}}
+    i = int(np.argmax(sums))
     return {
-        "series": series,
+        "series": series(starts, sums, shape),
         "kpis": {
-            "total": total,
-            "avg_per_hour": round(avg, 2),
-            "peak_count": peak_count,
-            "peak_ts": peak_ts,
+            "total": int(sums.sum()),
+            avg_key: round(float(sums.mean()), 2),
+            "peak_count": int(sums[i]),
+            "peak_ts": minute_to_dt(starts[i]).isoformat(),
             "cp_count": cp_count,
         },
     }
 
+@app.get("/api/metrics/range")
+def metrics_range(from_: str = Query(..., alias="from"), to: str = Query(...), step: str = "hour",
+                  shape: str = "rows"):
+    """
+    [from, to] aralığında (ISO zaman, dahil) tüm CP'lerin toplam geçişi;
+    step = minute | hour | day. Kova sınırlarına hizalı hour/day sorguları
+    saat/gün katmanından, diğerleri dakika arşivinin kopyasız diliminden
+    (arşiv kapalıysa kolon deposundan; son flush'tan sonraki satırlar
+    henüz orada olmayabilir) toplanır; CSV'ye dokunmaz.
+    """
+    if step not in STEPS:
+        raise HTTPException(status_code=400, detail=f"Geçersiz step: {step} ({'|'.join(STEPS)})")
+    try:
+        lo, hi = dt_to_minute(pd.Timestamp(from_).floor("min")), dt_to_minute(pd.Timestamp(to).floor("min"))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="from/to ISO tarih-saat olmalı (ör. 2025-08-14T13:00).")
+    if hi < lo:
+        raise HTTPException(status_code=400, detail="to, from'dan önce olamaz.")
+
+    size = STEPS[step]
+    if size > 1 and (archive is None or (lo % size == 0 and (hi + 1) % size == 0)):
+        # katmandan: kova başına tek sayı (arşiv yoksa aralık kovalara genişletilir)
+        b0, b1 = lo // size, hi // size
+        lo, hi = b0 * size, b1 * size + size - 1
+        with store.lock:
+            sums = store.rollup.series(size, b0, b1)
+            by_cp = {cp: n for cp, n in store.rollup.cp_totals(size, b0, b1).items() if n}
+        starts = size * np.arange(b0, b1 + 1, dtype=np.int64)
+    elif archive is None and columnar is not None:
+        # arşiv yok: kolon deposundan yalnızca aralığın bölümleri / kolonları okunur
+        df = build_counts(minute_to_dt(lo), minute_to_dt(hi + 1) - timedelta(milliseconds=1))
+        m = df["ts"].to_numpy().astype("datetime64[m]").astype(np.int64) - lo
+        total = np.bincount(m, weights=df["n_t"].to_numpy(np.int64), minlength=hi - lo + 1).astype(np.int64)
+        starts, sums = bucket_sum(total, lo, size)
+        by_cp = {str(cp): int(n) for cp, n in df.groupby("checkpoint_id")["n_t"].sum().items()}
+    elif archive is None:
+        raise HTTPException(status_code=503, detail="Dakika arşivi kapalı (MINUTE_ARCHIVE).")
+    else:
+        per_cp, total = archive.window(lo, hi)
+        starts, sums = bucket_sum(total, lo, size)
+        by_cp = {cp: int(v.sum()) for cp, v in per_cp.items()}
+    out = _range_payload(starts, sums, "avg_per_step", sum(1 for v in by_cp.values() if v), shape)
+    out.update({"from": minute_to_dt(lo).isoformat(), "to": minute_to_dt(hi).isoformat(),
+                "step": step, "by_checkpoint": by_cp})
+    return FastJSONResponse(out)
+
 
 @app.get("/api/current-rho")
 def get_current_rho():
     """CP1'in ρ değerini döndür (CP kartındaki ile aynı)"""
     try:
+        # CP1'in en son kaydı (cp başına sıralı tutuluyor)
         with lock:
-            data = list(recent)
-        
-        if not data:
-            return {"rho": 0.0, "lambda_hat": 0.0, "mu": 0.0}
-        
-        # CP1'in en son kaydını bul
-        cp1_data = [r for r in data if r.get("checkpoint_id") == "CP1"]
+            latest_cp1 = recent.latest("CP1")
         
-        if not cp1_data:
+        if latest_cp1 is None:
             return {"rho": 0.0, "lambda_hat": 0.0, "mu": 0.0}
         
-        # En son CP1 kaydını al
-        latest_cp1 = cp1_data[-1]
-        
-        rho = latest_cp1.get("rho", 0.0)
-        lambda_hat = latest_cp1.get("lambda_hat", 0.0)
-        mu = latest_cp1.get("mu", 0.0)
-        
-        return {
-            "rho": round(rho, 3),
-            "lambda_hat": round(lambda_hat, 3),
-            "mu": round(mu, 3)
-        }
+        return _rho_view(latest_cp1)
         
     except Exception as e:
+        ERRORS.inc(where="get_current_rho")
         return {"rho": 0.0, "lambda_hat": 0.0, "mu": 0.0, "error": str(e)}
     
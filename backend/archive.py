@@ -0,0 +1,106 @@
+# backend/archive.py
+import os, threading
+from typing import Dict, Iterable, Tuple
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from backend.ingest import dt_to_minute
+
+ARCHIVE_EPOCH = dt_to_minute("2020-01-01")   # dosyadaki 0. indeks
+DTYPE = np.uint32
+GROW_MINUTES = 30 * 1440                     # dosya 30 günlük adımlarla büyür
+
+
+class MinuteArchive:
+    """
+    Checkpoint başına sabit genişlikli dakika sayacı dosyası (<cp>.u32).
+    i. eleman = ARCHIVE_EPOCH + i dakikasındaki geçiş sayısı. Dosyalar
+    np.memmap ile açılır; aralık sorguları kopyasız dilim + toplamdır.
+    Değerler mutlak yazılır, aynı CSV'nin yeniden okunması sayıları ikilemez.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._maps: Dict[str, np.memmap] = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, cp: str) -> str:
+        return os.path.join(self.root, quote(cp, safe="") + ".u32")
+
+    def _open(self, cp: str, need: int = 0):
+        """cp dosyasını (gerekirse büyütüp) eşle; dosya yoksa ve need=0 ise None."""
+        path = self._path(cp)
+        mm = self._maps.get(cp)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        length = size // DTYPE().itemsize
+        if need > length:
+            length = (need // GROW_MINUTES + 1) * GROW_MINUTES
+            with open(path, "ab") as f:
+                f.truncate(length * DTYPE().itemsize)   # seyrek dosya, sıfırlarla dolar
+            mm = None
+        if length == 0:
+            return None
+        if mm is None or len(mm) != length:
+            # başka süreç dosyayı büyütmüş olabilir -> yeniden eşle
+            mm = self._maps[cp] = np.memmap(path, dtype=DTYPE, mode="r+", shape=(length,))
+        return mm
+
+    def checkpoints(self) -> Iterable[str]:
+        return sorted(unquote(f[:-4]) for f in os.listdir(self.root) if f.endswith(".u32"))
+
+    def write(self, touched: Dict[str, list], by_cp: Dict[str, Dict[int, int]]):
+        """Dokunulan dakikaların güncel (mutlak) sayılarını yaz."""
+        with self._lock:
+            for cp, pairs in touched.items():
+                idx = np.array([m for m, _ in pairs], dtype=np.int64) - ARCHIVE_EPOCH
+                ok = idx >= 0
+                if not ok.any():
+                    continue
+                bucket = by_cp[cp]
+                vals = np.array([bucket[m] for m, _ in pairs], dtype=np.int64)[ok]
+                idx = idx[ok]
+                mm = self._open(cp, int(idx.max()) + 1)
+                mm[idx] = np.minimum(vals, np.iinfo(DTYPE).max)
+
+    def flush(self):
+        with self._lock:
+            for mm in self._maps.values():
+                mm.flush()
+
+    def window(self, lo: int, hi: int) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+        """
+        [lo, hi] (epoch dakikası, dahil) için cp başına sayılar ve toplam
+        seri. Dosyadaki kısım kopyasız görünümdür; dışı 0 kabul edilir.
+        """
+        n = hi - lo + 1
+        total = np.zeros(n, dtype=np.int64)
+        per_cp: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for cp in self.checkpoints():
+                mm = self._open(cp)
+                if mm is None:
+                    continue
+                a, b = max(lo - ARCHIVE_EPOCH, 0), min(hi - ARCHIVE_EPOCH + 1, len(mm))
+                if a >= b:
+                    continue
+                view = mm[a:b]
+                off = a + ARCHIVE_EPOCH - lo
+                total[off:off + len(view)] += view
+                per_cp[cp] = view
+        return per_cp, total
+
+
+def bucket_sum(series: np.ndarray, lo: int, step: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    lo'dan başlayan dakikalık seriyi saat/gün gibi takvime hizalı `step`
+    dakikalık kovalara topla. Dönüş: (kova başlangıçları, toplamlar).
+    """
+    head = lo % step
+    n = head + len(series)
+    padded = np.zeros(-(-n // step) * step, dtype=np.int64)
+    padded[head:n] = series
+    sums = padded.reshape(-1, step).sum(axis=1)
+    starts = (lo - head) + step * np.arange(len(sums), dtype=np.int64)
+    return starts, sums
@@ -0,0 +1,51 @@
+# backend/cache.py
+import threading, zlib
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    GET yanıtlarının hazır JSON baytları. Anahtar = uç nokta + sorgu,
+    geçerlilik = `stamp` (veri sürümü, gerekiyorsa dakika). Veri değişmediyse
+    istek yalnızca bir sürüm karşılaştırmasına mal olur; ETag gövdenin
+    CRC'sidir, içerik aynı kaldıkça istemci 304 alır.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.version = 0                  # ingest / kapasite değişiminde artar
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+
+    def get(self, key: str, stamp: Hashable) -> Optional[Tuple[str, bytes, str]]:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None or e[0] != stamp:
+                return None
+            self._entries.move_to_end(key)
+            return e[1:]
+
+    def put(self, key: str, stamp: Hashable, body: bytes, media_type: str) -> Tuple[str, bytes, str]:
+        entry = (stamp, etag_for(body), body, media_type)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry[1:]
+
+
+def etag_for(body: bytes) -> str:
+    return '"%08x-%x"' % (zlib.crc32(body), len(body))
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or ("W/" + etag) in tags
@@ -0,0 +1,213 @@
+# backend/columnar.py
+import json, os, threading, time
+from typing import List, Optional
+
+import pandas as pd
+
+from backend.ingest import Chunk, count_minutes, parse_block, summarize
+
+try:  # opsiyonel bağımlılık: yalnızca STORE_BACKEND=parquet|arrow iken gerekir
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+
+# CSV kolonları ve tipleri (bilinmeyen kolonlar aynaya yazılmaz); `source` satırın
+# nereden geldiği: "csv" (CSV_PATH) ya da "api" (POST /api/ingest); eski dosyalarda null
+INT_COLS = {"ID": "int64", "FlightDate": "int16", "IsSuccess": "int8"}
+FORMATS = {"parquet": ("parquet", ".parquet"), "arrow": ("ipc", ".arrow")}
+
+
+def _schema():
+    return pa.schema([
+        ("ID", pa.int64()), ("Name", pa.string()), ("PNR", pa.string()),
+        ("OriginAirport", pa.string()), ("DestinationAirport", pa.string()),
+        ("IATA", pa.string()), ("FlightNumber", pa.string()), ("FlightDate", pa.int16()),
+        ("CheckDate", pa.timestamp("ms")), ("IsSuccess", pa.int8()),
+        ("ErrorReason", pa.string()), ("Type", pa.string()), ("checkpoint_id", pa.string()),
+        ("source", pa.string()),
+    ])
+
+
+def typed_frame(df: pd.DataFrame, source: str = "csv") -> pd.DataFrame:
+    """Ingester'ın str kolonlarını şemadaki tiplere çevir (eksik kolonlar null)."""
+    out = pd.DataFrame(index=df.index)
+    for c in _schema().names:
+        if c == "source":
+            out[c] = source
+        elif c not in df.columns:
+            out[c] = None
+        elif c == "CheckDate":
+            out[c] = pd.to_datetime(df[c], errors="coerce")
+        elif c in INT_COLS:
+            out[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+        else:
+            out[c] = df[c].replace("", None)
+    return out
+
+
+def summarize_typed(columns: List[str], data: bytes, tail: int) -> Chunk:
+    """summarize_block + tipli satırlar (Chunk.frame); ayrıştırma sürecinde çalışır."""
+    df = parse_block(columns, data)
+    return summarize(df, tail)._replace(frame=typed_frame(df))
+
+
+class ColumnarStore:
+    """
+    Ingest edilen satırların tarih bölümlü (date=YYYY-MM-DD) Parquet ya da
+    Arrow IPC kopyası. Yazımlar tamponlanıp `flush_interval` saniyede bir
+    diske iner; okuma tarafı yalnızca istenen kolonları ve CheckDate
+    aralığına düşen bölümleri tarar.
+    """
+
+    def __init__(self, root: str, fmt: str = "parquet", flush_interval: float = 10.0,
+                 max_parts: int = 64):
+        if pa is None:
+            raise RuntimeError("STORE_BACKEND=%s için pyarrow gerekli (pip install pyarrow)" % fmt)
+        if fmt not in FORMATS:
+            raise ValueError(f"Bilinmeyen STORE_BACKEND: {fmt} (csv|parquet|arrow)")
+        self.root = root
+        self.fmt = fmt
+        self.ds_format, self.ext = FORMATS[fmt]
+        self.flush_interval = flush_interval
+        self.max_parts = max_parts
+        self.schema = _schema()
+        self._buf: List[pd.DataFrame] = []
+        self._source = None
+        self._last_flush = time.monotonic()
+        self._seq = 0
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    # --- manifest: kaynak CSV'nin hangi bayta kadar aynalandığı ---
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.root, "_manifest.json")
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def mirrored_offset(self, inode) -> int:
+        """Bu inode'lu CSV'nin daha önce aynalanmış bayt sayısı (yoksa 0)."""
+        src = self.manifest.get("source") or {}
+        return int(src.get("offset", 0)) if src.get("inode") == inode else 0
+
+    # --- yazma ---
+
+    def append(self, df: pd.DataFrame, inode=None, offset: Optional[int] = None, typed: bool = False,
+               source: str = "csv"):
+        """
+        Satırları tampona ekle; `typed` değilse (ingester'ın str kolonları)
+        burada `source` ile tiplenir. inode/offset yalnızca CSV satırları
+        için verilir (manifest); API satırları manifesti değiştirmez.
+        """
+        if not typed:
+            df = typed_frame(df, source)
+        with self._lock:
+            self._buf.append(df)
+            if inode is not None:
+                self._source = {"inode": inode, "offset": offset}
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buf:
+                return
+            self._flush()
+
+    def _flush(self):
+        df = pd.concat(self._buf, ignore_index=True)
+        self._buf = []
+        dates = df["CheckDate"].dt.strftime("%Y-%m-%d").fillna("unknown")
+        for day, part in df.groupby(dates, sort=False):
+            self._write_part(day, pa.Table.from_pandas(part, schema=self.schema, preserve_index=False, safe=False))
+        if self._source is not None:
+            self.manifest = {"format": self.fmt, "source": self._source}
+            tmp = self._manifest_path() + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.manifest, f)
+            os.replace(tmp, self._manifest_path())
+
+    def _write_part(self, day: str, table):
+        d = os.path.join(self.root, f"date={day}")
+        os.makedirs(d, exist_ok=True)
+        self._write_file(d, table)
+        self._compact(d)
+
+    def _write_file(self, d: str, table):
+        self._seq += 1
+        name = f"part-{int(time.time() * 1000)}-{self._seq}{self.ext}"
+        tmp = os.path.join(d, "." + name)        # '.' ile başlayanlar dataset'e görünmez
+        if self.fmt == "parquet":
+            pq.write_table(table, tmp)
+        else:
+            feather.write_feather(table, tmp, compression="lz4")
+        os.replace(tmp, os.path.join(d, name))
+
+    def _compact(self, d: str):
+        """Bölümdeki küçük parça sayısı sınırı aşınca tek dosyada birleştir."""
+        parts = sorted(p for p in os.listdir(d) if p.endswith(self.ext) and not p.startswith("."))
+        if len(parts) <= self.max_parts:
+            return
+        paths = [os.path.join(d, p) for p in parts]
+        self._write_file(d, ds.dataset(paths, format=self.ds_format, schema=self.schema).to_table())
+        for p in paths:
+            os.remove(p)
+
+    # --- okuma ---
+
+    def read(self, columns: List[str], start=None, end=None, csv_only: bool = False) -> pd.DataFrame:
+        """
+        Yalnızca `columns` kolonlarını oku. start/end (CheckDate) verilirse
+        dışarıda kalan date= bölümleri hiç açılmaz, satır filtresi de
+        tarayıcıya itilir. `csv_only`: API'den gelen satırlar hariç.
+        """
+        part = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+        dataset = ds.dataset(self.root, format=self.ds_format, schema=self.schema.append(pa.field("date", pa.string())),
+                             partitioning=part)
+        filt = None
+        if start is not None:
+            start = pd.Timestamp(start)
+            filt = (ds.field("date") >= start.strftime("%Y-%m-%d")) & \
+                   (ds.field("CheckDate") >= pa.scalar(start.to_pydatetime(), pa.timestamp("ms")))
+        if end is not None:
+            end = pd.Timestamp(end)
+            f2 = (ds.field("date") <= end.strftime("%Y-%m-%d")) & \
+                 (ds.field("CheckDate") <= pa.scalar(end.to_pydatetime(), pa.timestamp("ms")))
+            filt = f2 if filt is None else filt & f2
+        if csv_only:
+            f3 = ds.field("source").is_null() | (ds.field("source") == "csv")
+            filt = f3 if filt is None else filt & f3
+        cols = [c for c in columns if c in self.schema.names]
+        return dataset.to_table(columns=cols, filter=filt).to_pandas()
+
+    def replay(self, columns: List[str], tail: List[list], csv_only: bool = True) -> Optional[Chunk]:
+        """
+        Aynalanmış satırların depo özeti, CSV yeniden parse edilmeden: yalnızca
+        CheckDate / checkpoint_id / DestinationAirport kolonları okunur.
+        `columns` CSV başlığı, `tail` CSV'nin (aynalanan kısmının) son
+        satırlarıdır. Zaman damgası CheckDate değilse None (ayna onu tutmaz).
+        `csv_only`: API satırları dahil edilmez (ingest günlüğünden geri
+        yüklenenler iki kez sayılmasın).
+        """
+        if "CheckDate" not in columns:
+            return None
+        df = self.read(["CheckDate", "checkpoint_id", "DestinationAirport"], csv_only=csv_only)
+        frame = df[["CheckDate"]].copy()
+        if "checkpoint_id" in columns:         # boş hücre CSV yolunda da "" sayılır
+            frame["checkpoint_id"] = df["checkpoint_id"].fillna("")
+        dest = {}
+        if "DestinationAirport" in columns:
+            dest = {str(k): int(v) for k, v in df["DestinationAirport"].dropna().value_counts().items()}
+        return Chunk(list(columns), len(df), count_minutes(frame), dest, [tuple(r) for r in tail])
@@ -0,0 +1,38 @@
+# backend/ewma.py
+import math
+
+import numpy as np
+
+
+def ewma_matrix(x: np.ndarray, v0: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    (C×M) matrisin her satırına EWMA uygular: v_t = α·x_t + (1−α)·v_{t−1}.
+    Dakika başına Python döngüsü yok; kapalı form blok blok hesaplanır.
+    v0'da NaN olan satır ilk gözlemle başlar (EWMA.update ile aynı).
+    Dönüş: her dakikanın λ̂ değeri, (C×M).
+    """
+    x = np.asarray(x, dtype=float)
+    C, M = x.shape
+    out = np.empty((C, M))
+    if M == 0:
+        return out
+    v = np.asarray(v0, dtype=float).copy()
+    v = np.where(np.isnan(v), x[:, 0], v)
+
+    b = 1.0 - alpha
+    if b <= 0.0:
+        out[:] = x
+        return out
+
+    # b^-k taşmasın diye blok uzunluğunu sınırla (b^-L <= ~1e50)
+    L = max(1, min(256, int(50 / max(1e-12, -math.log10(b)))))
+    k = np.arange(L, dtype=float)
+    for s in range(0, M, L):
+        xs = x[:, s:s + L]
+        n = xs.shape[1]
+        inv = b ** -k[:n]                       # b^-j
+        acc = np.cumsum(xs * inv, axis=1)       # Σ_{j<=k} b^-j x_j
+        pw = b ** k[:n]                         # b^k
+        out[:, s:s + n] = (b * pw) * v[:, None] + alpha * pw * acc
+        v = out[:, s + n - 1]
+    return out
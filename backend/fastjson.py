@@ -0,0 +1,62 @@
+# backend/fastjson.py
+import json
+from typing import Any
+
+import numpy as np
+from fastapi.responses import Response
+
+try:  # opsiyonel: varsa ~5-10x hızlı serileştirme, NumPy dizileri doğrudan
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, np.ndarray):
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    raise TypeError(f"JSON'a çevrilemiyor: {type(o).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    """JSONResponse ile aynı çıktı (UTF-8, boşluksuz); NumPy dizi/skalerleri kabul eder."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+                      default=_default).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def minute_iso(minutes: np.ndarray) -> list:
+    """Epoch dakikaları -> 'YYYY-MM-DDTHH:MM:00' (minute_to_dt(m).isoformat() ile aynı), vektörel."""
+    return np.datetime_as_string(np.asarray(minutes, dtype=np.int64).astype("datetime64[m]"), unit="s").tolist()
+
+
+def series(starts: np.ndarray, counts: np.ndarray, shape: str = "rows"):
+    """
+    Zaman serisi gövdesi. rows: [{"ts":..., "count":...}, ...] (varsayılan);
+    columns: {"ts": [...], "count": [...]} (daha küçük, dizilerden doğrudan).
+    """
+    ts = minute_iso(starts)
+    if shape == "columns":
+        return {"ts": ts, "count": np.asarray(counts, dtype=np.int64)}
+    return [{"ts": t, "count": int(c)} for t, c in zip(ts, counts)]
+
+
+def columns_of(records: list, keys=None) -> dict:
+    """Kayıt listesini kolon sözlüğüne çevir ({"ts_minute": [...], ...})."""
+    if not records:
+        return {k: [] for k in (keys or [])}
+    keys = keys or list(records[0])
+    return {k: [r.get(k) for r in records] for k in keys}
@@ -0,0 +1,127 @@
+# backend/forecast.py
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SEASON = 1440          # günlük mevsimsellik (dakika)
+
+
+class SeasonalForecaster:
+    """
+    Checkpoint başına toplamsal Holt-Winters (seviye + sönümlü eğilim +
+    günlük mevsim). Durum CP'ler boyunca vektörel tutulur (C, C, C×1440);
+    her kapanan dakika tüm CP'ler için tek bir O(C) adımla işlenir, model
+    hiçbir zaman baştan kurulmaz. Dakika indeksleri epoch dakikasıdır,
+    mevsim yuvası = dakika % 1440 (günün dakikası).
+    """
+
+    def __init__(self, alpha: float = 0.1, beta: float = 0.01, gamma: float = 0.1,
+                 phi: float = 0.98, season: int = SEASON, max_gap: int = SEASON):
+        self.alpha, self.beta, self.gamma, self.phi, self.season = alpha, beta, gamma, phi, season
+        self.max_gap = max_gap     # hiçbir CP'de geçiş olmayan dakikalardan en fazla bu kadarı adımlanır
+        self.cps: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.level = np.zeros(0)
+        self.trend = np.zeros(0)
+        self.seasonal = np.zeros((0, season))
+        self.last = np.zeros(0, dtype=np.int64)       # işlenen son dakika
+        self.lock = threading.Lock()
+
+    def to_state(self) -> dict:
+        """Snapshot için düz veri: parametreler, CP sırası ve durum dizileri."""
+        with self.lock:
+            return {"alpha": self.alpha, "beta": self.beta, "gamma": self.gamma, "phi": self.phi,
+                    "season": self.season, "max_gap": self.max_gap, "cps": list(self.cps),
+                    "level": self.level.copy(), "trend": self.trend.copy(),
+                    "seasonal": self.seasonal.copy(), "last": self.last.copy()}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "SeasonalForecaster":
+        out = cls(state["alpha"], state["beta"], state["gamma"], state["phi"], state["season"], state["max_gap"])
+        out.cps = list(state["cps"])
+        out._index = {cp: i for i, cp in enumerate(out.cps)}
+        out.level, out.trend = state["level"].astype(float), state["trend"].astype(float)
+        out.seasonal, out.last = state["seasonal"].astype(float), state["last"].astype(np.int64)
+        return out
+
+    def _rows(self, cps: Sequence[str]) -> np.ndarray:
+        new = [cp for cp in cps if cp not in self._index]
+        if new:
+            for cp in new:
+                self._index[cp] = len(self.cps)
+                self.cps.append(cp)
+            k = len(new)
+            self.level = np.concatenate([self.level, np.full(k, np.nan)])
+            self.trend = np.concatenate([self.trend, np.zeros(k)])
+            self.seasonal = np.vstack([self.seasonal, np.zeros((k, self.season))])
+            self.last = np.concatenate([self.last, np.full(k, -1, dtype=np.int64)])
+        return np.array([self._index[cp] for cp in cps], dtype=np.int64)
+
+    def update(self, cps: Sequence[str], lo: int, X: np.ndarray, starts: Sequence[int]):
+        """
+        X[i, t] = cps[i]'nin lo+t dakikasındaki sayım. Her satır kendi
+        starts[i] dakikasından itibaren işlenir (daha önce işlenenler atlanır).
+        Tüm CP'lerin boş olduğu `max_gap`'ten uzun aralıklarda yalnızca son
+        `max_gap` dakika adımlanır: öncesi modeli sıfıra doğru söndürmekten
+        başka bir şey yapmaz, dakika başına adım ise aralıkla orantılıdır.
+        """
+        if X.size == 0:
+            return
+        with self.lock:
+            rows = self._rows(cps)
+            first = np.maximum(np.asarray(starts, dtype=np.int64), self.last[rows] + 1) - lo
+            a, b, g, phi, S = self.alpha, self.beta, self.gamma, self.phi, self.season
+            for t in self._steps(X, int(first.min())):
+                sel = first <= t
+                if not sel.all():
+                    r, x = rows[sel], X[sel, t]
+                else:
+                    r, x = rows, X[:, t]
+                slot = (lo + t) % S
+                lvl, trd, s_old = self.level[r], self.trend[r], self.seasonal[r, slot]
+                fresh = np.isnan(lvl)
+                lvl = np.where(fresh, x, lvl)                    # ilk gözlem seviyeyi başlatır
+                new_lvl = a * (x - s_old) + (1 - a) * (lvl + phi * trd)
+                new_lvl = np.where(fresh, x, new_lvl)
+                self.trend[r] = b * (new_lvl - lvl) + (1 - b) * phi * trd
+                self.seasonal[r, slot] = np.where(fresh, s_old, g * (x - new_lvl) + (1 - g) * s_old)
+                self.level[r] = new_lvl
+                self.last[r] = lo + t
+
+    def _steps(self, X: np.ndarray, t0: int) -> np.ndarray:
+        """t0'dan itibaren adımlanacak sütunlar: boş koşuların yalnızca son max_gap'i."""
+        n = X.shape[1] - t0
+        if n <= 0:
+            return np.zeros(0, dtype=np.int64)
+        idle = ~X[:, t0:].any(axis=0)
+        pos = np.where(idle, n, np.arange(n))
+        next_busy = np.minimum.accumulate(pos[::-1])[::-1]     # her sütundan sonraki ilk dolu sütun
+        return t0 + np.flatnonzero(next_busy - np.arange(n) <= self.max_gap)
+
+    def forecast(self, cps: Sequence[str], horizon: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (C × horizon) beklenen kişi/dk matrisi ve her satırın ilk tahmin
+        dakikası. Modeli olmayan CP'ler NaN döner.
+        """
+        h = np.arange(1, horizon + 1)
+        damp = np.cumsum(self.phi ** h)                  # sönümlü eğilim katsayısı
+        out = np.full((len(cps), horizon), np.nan)
+        first = np.zeros(len(cps), dtype=np.int64)
+        with self.lock:
+            idx = [self._index.get(cp) for cp in cps]
+            have = np.array([i is not None for i in idx], dtype=bool)
+            if not have.any():
+                return out, first
+            rows = np.array([i for i in idx if i is not None], dtype=np.int64)
+            last = self.last[rows]
+            slots = (last[:, None] + h[None, :]) % self.season
+            f = (self.level[rows][:, None] + self.trend[rows][:, None] * damp[None, :]
+                 + np.take_along_axis(self.seasonal[rows], slots, axis=1))
+        out[have] = np.maximum(f, 0.0)
+        first[have] = last + 1
+        return out, first
+
+    def last_minute(self, cp: str) -> Optional[int]:
+        i = self._index.get(cp)
+        return None if i is None else int(self.last[i])
@@ -0,0 +1,104 @@
+# backend/history.py
+import threading
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.ewma import ewma_matrix
+from backend.fastjson import minute_iso
+from backend.ingest import MinuteCounts
+
+LEVELS = np.array(["GREEN", "YELLOW", "RED"])
+
+
+class Replay:
+    """Bir hesaplamanın sonucu: CP × dakika matrisleri (dakika = lo + sütun)."""
+
+    def __init__(self, cps: List[str], lo: int, X: np.ndarray, lam: np.ndarray, mu: np.ndarray,
+                 green: float, yellow: float):
+        self.cps, self.lo = cps, lo
+        self.index = {cp: i for i, cp in enumerate(cps)}
+        self.X, self.lam, self.mu = X, lam, mu
+        self.rho = lam / mu[:, None]
+        # calc_level ile aynı eşikler (NaN -> RED olur ama NaN hücreler hiç okunmaz)
+        self.level = np.where(self.rho < green, 0, np.where(self.rho < yellow, 1, 2)).astype(np.int8)
+
+    @property
+    def minutes(self) -> int:
+        return self.X.shape[1]
+
+    def page(self, cp: Optional[str] = None, lo: Optional[int] = None, hi: Optional[int] = None,
+             offset: int = 0, limit: int = 1000) -> Tuple[int, Dict[str, list]]:
+        """
+        [lo, hi] dakikalarının kayıtları, zaman sonra CP sırasıyla (canlı
+        commit çıktısıyla aynı sıra); (toplam, kolonlar) döndürür.
+        """
+        rows = np.arange(len(self.cps)) if cp is None else np.array([self.index[cp]] if cp in self.index else [], dtype=np.int64)
+        a = 0 if lo is None else max(0, lo - self.lo)
+        b = self.minutes if hi is None else min(self.minutes, hi - self.lo + 1)
+        if not len(rows) or a >= b:
+            return 0, _columns([], [], [], [], [], [], [])
+        valid = ~np.isnan(self.lam[rows, a:b])
+        t, r = np.nonzero(valid.T)                 # dakika-öncelikli sıra
+        total = len(t)
+        t, r = t[offset:offset + limit] + a, rows[r[offset:offset + limit]]
+        lam, rho = self.lam[r, t], self.rho[r, t]
+        return total, _columns(
+            minute_iso(self.lo + t), [self.cps[i] for i in r], self.X[r, t].astype(np.int64).tolist(),
+            [round(float(v), 4) for v in lam], [round(float(v), 4) for v in self.mu[r]],
+            [round(float(v), 4) for v in rho], LEVELS[self.level[r, t]].tolist())
+
+
+def _columns(ts, cps, n, lam, mu, rho, level) -> Dict[str, list]:
+    return {"ts_minute": ts, "checkpoint_id": cps, "n_t": n, "x_t": [float(v) for v in n],
+            "lambda_hat": lam, "mu": mu, "rho": rho, "level": level}
+
+
+class HistoryReplay:
+    """
+    Tüm veri boyunca her CP ve her dakika için λ̂, μ, ρ ve seviye. Bellekteki
+    dakika sayaçlarından (0'lar dahil) tek ewma_matrix geçişiyle hesaplanır:
+    dakika başına Python döngüsü yok. Sonuç `key` (store sürümü + μ'ler)
+    değişene kadar saklanır. Canlı EWMA gibi her CP kendi ilk dakikasından
+    başlar ve en yeni (açık) dakika dahil edilmez; geç gelen satırlar
+    burada kendi dakikalarına sayılır.
+    """
+
+    def __init__(self, alpha: float, green: float, yellow: float):
+        self.alpha, self.green, self.yellow = alpha, green, yellow
+        self._key: Hashable = None
+        self._replay: Optional[Replay] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, counts: MinuteCounts, mu_for: Callable[[str], float]) -> Optional[Replay]:
+        """Çağıran, sayaçlar değişmesin diye store kilidini tutar."""
+        with self._lock:
+            if self._key != key:
+                self._replay = self._compute(counts, mu_for)
+                self._key = key
+            return self._replay
+
+    def _compute(self, counts: MinuteCounts, mu_for) -> Optional[Replay]:
+        if not counts.last_minute:
+            return None
+        cps = sorted(counts.last_minute)
+        cutoff = max(counts.last_minute.values())
+        first = np.array([counts.first_minute[cp] for cp in cps], dtype=np.int64)
+        lo = int(first.min())
+        M = cutoff - lo
+        X = np.zeros((len(cps), max(M, 0)))
+        for i, cp in enumerate(cps):
+            bucket = counts.by_cp[cp]
+            ms = np.fromiter(bucket.keys(), dtype=np.int64, count=len(bucket))
+            ns = np.fromiter(bucket.values(), dtype=np.int64, count=len(bucket))
+            sel = ms < cutoff
+            X[i, ms[sel] - lo] = ns[sel]
+
+        lam = np.full(X.shape, np.nan)
+        starts = first - lo
+        for s0 in np.unique(starts):
+            rows = np.flatnonzero(starts == s0)
+            if s0 < M:
+                lam[rows, s0:] = ewma_matrix(X[rows, s0:], np.full(len(rows), np.nan), self.alpha)
+        mu = np.array([mu_for(cp) for cp in cps], dtype=float)
+        return Replay(cps, lo, X, lam, mu, self.green, self.yellow)
@@ -0,0 +1,252 @@
+# backend/ingest.py
+import csv, io, os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def minute_to_dt(m: int) -> datetime:
+    """Epoch dakikasını (int) naive datetime'a çevir."""
+    return EPOCH + timedelta(minutes=int(m))
+
+
+def dt_to_minute(ts) -> int:
+    """datetime / Timestamp -> epoch dakikası."""
+    return int((pd.Timestamp(ts) - pd.Timestamp(EPOCH)) // pd.Timedelta(minutes=1))
+
+
+def resolve_ts_col(columns) -> Optional[str]:
+    # build_counts ile aynı öncelik: önce 'CheckDate', sonra 'ts'
+    for c in ("CheckDate", "ts"):
+        if c in columns:
+            return c
+    return None
+
+
+def parse_header(line: bytes) -> List[str]:
+    """CSV başlık satırı -> kolon adları (tırnaklı adlar dahil; tüm okuma yolları aynı)."""
+    return [c.strip() for c in next(csv.reader([line.decode("utf-8-sig").strip()]), [])]
+
+
+def read_tail(path: str, n: int, block_size: int = 64 * 1024,
+              end: Optional[int] = None) -> Tuple[List[str], List[List[str]]]:
+    """
+    Dosyayı baştan okumadan son N tam satırı döndürür: sondan geriye doğru
+    bloklar okunur, yalnızca gereken satırlar parse edilir. Satır sonu
+    henüz yazılmamış yarım son satır atlanır. `end` verilirse dosya o
+    bayttan kısaymış gibi okunur. Dönüş: (kolonlar, satırlar)
+    """
+    with open(path, "rb") as f:
+        header = f.readline()
+        data_start = f.tell()
+        if not header:
+            return [], []
+        cols = parse_header(header)
+
+        size = f.seek(0, os.SEEK_END)
+        end = size if end is None else min(end, size)
+        pos, buf, nl = end, b"", 0
+        # n tam satır + baştaki yarım parça için n+1 satır sonu yeterli
+        while pos > data_start and nl <= n:
+            step = min(block_size, pos - data_start)
+            pos -= step
+            f.seek(pos)
+            block = f.read(step)
+            nl += block.count(b"\n")
+            buf = block + buf
+
+    cut = buf.rfind(b"\n")
+    if cut < 0:
+        return cols, []
+    lines = buf[:cut].split(b"\n")
+    if pos > data_start:
+        lines = lines[1:]          # ilk parça satır ortasından başlıyor olabilir
+    lines = [ln for ln in lines[-n:] if ln.strip()] if n > 0 else []
+    rows = list(csv.reader(ln.decode("utf-8", "replace").rstrip("\r") for ln in lines))
+    return cols, rows
+
+
+class CsvTailIngester:
+    """
+    CSV'yi `tail -f` gibi takip eder: bayt ofsetini hatırlar, yalnızca
+    sonradan eklenen baytları okur. Yarım kalan son satır bir sonraki
+    okumaya saklanır; dosya küçülür (truncate) ya da inode değişirse
+    (rotation) baştan okunur.
+    """
+
+    def __init__(self, path: str, block_size: int = 16 * 1024 * 1024):
+        self.path = path
+        self.block_size = block_size
+        self.offset = 0          # dosyadan okunan bayt
+        self.inode = None
+        self.columns = None      # başlık satırı
+        self.resets = 0
+        self._partial = b""
+
+    @property
+    def committed_offset(self) -> int:
+        """Tam satır olarak işlenmiş son bayt (yarım satır hariç)."""
+        return self.offset - len(self._partial)
+
+    def reset(self):
+        self.offset = 0
+        self.inode = None
+        self.columns = None
+        self._partial = b""
+
+    def read_blocks(self, until: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Yeni gelen baytları tam satırlık bloklar halinde üret (başlık
+        ayıklanmış, `columns` ayarlanmış). `until` verilirse en fazla o bayta
+        kadar okunur (satır sınırı olmalı). Parse etmez; bkz. parse_block.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        if self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset):
+            # rotation / truncate -> yeni dosyayı baştan oku
+            self.reset()
+            self.resets += 1
+        self.inode = st.st_ino
+        stop = st.st_size if until is None else min(until, st.st_size)
+        if stop <= self.offset:
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            while self.offset < stop:
+                block = f.read(min(self.block_size, stop - self.offset))
+                if not block:
+                    break
+                self.offset += len(block)
+                data = self._complete_lines(block)
+                if data:
+                    yield data
+
+    def poll(self, until: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """Yeni gelen tam satırları (tüm kolonlar str) döndür; yoksa None."""
+        frames = [parse_block(self.columns, data) for data in self.read_blocks(until)]
+        if not frames:
+            return None
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+    def _complete_lines(self, block: bytes) -> Optional[bytes]:
+        data = self._partial + block
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            # henüz satır sonu yok, bir sonraki okumayı bekle
+            self._partial = data
+            return None
+        self._partial = data[cut + 1:]
+        data = data[:cut + 1]
+
+        if self.columns is None:
+            nl = data.find(b"\n")
+            self.columns = parse_header(data[:nl])
+            data = data[nl + 1:]
+
+        return data if data.strip() else None
+
+
+def parse_block(columns: List[str], data: bytes) -> pd.DataFrame:
+    """Başlıksız, tam satırlardan oluşan CSV baytlarını parse et (tüm kolonlar str)."""
+    return pd.read_csv(
+        io.BytesIO(data), header=None, names=columns,
+        dtype=str, keep_default_na=False, on_bad_lines="skip",
+    )
+
+
+class Chunk(NamedTuple):
+    """
+    Bir satır bloğunun depoya işlenecek özeti; DataFrame'in kendisi yerine
+    bu taşınır (süreçler arası pickle edilir, birkaç KB). `frame` yalnızca
+    kolon deposu açıkken dolar.
+    """
+    columns: List[str]
+    rows: int
+    counts: List[Tuple[str, int, int]]        # (cp, epoch dakikası, n)
+    destinations: Dict[str, int]
+    tail: List[tuple]                         # son satırlar (ham, en eski önce)
+    frame: Optional[pd.DataFrame] = None      # kolon deposu için tipli satırlar (bkz. columnar)
+
+
+def count_minutes(df: pd.DataFrame) -> List[Tuple[str, int, int]]:
+    """Satırları (cp, dakika) başına say."""
+    ts_col = resolve_ts_col(df.columns)
+    if ts_col is None:
+        raise ValueError(f"Zaman damgası sütunu bulunamadı. Mevcut sütunlar: {list(df.columns)}")
+
+    ts = pd.to_datetime(df[ts_col], errors="coerce")
+    ok = ts.notna().to_numpy()
+    if not ok.any():
+        return []
+    minutes = ts[ok].to_numpy().astype("datetime64[m]").astype("int64")
+    if "checkpoint_id" in df.columns:
+        cps = df["checkpoint_id"].to_numpy()[ok]
+    else:
+        cps = "CP1"
+    grp = pd.DataFrame({"cp": cps, "m": minutes}).value_counts(sort=False)
+    return [(str(cp), int(m), int(n)) for (cp, m), n in grp.items()]
+
+
+def summarize(df: pd.DataFrame, tail: int) -> Chunk:
+    dest = {}
+    if "DestinationAirport" in df.columns:
+        d = df["DestinationAirport"]
+        dest = {str(k): int(v) for k, v in d[d != ""].value_counts().items()}
+    return Chunk(list(df.columns), len(df), count_minutes(df), dest,
+                 list(df.tail(tail).itertuples(index=False, name=None)))
+
+
+def summarize_block(columns: List[str], data: bytes, tail: int) -> Chunk:
+    """parse_block + summarize; ayrıştırma sürecinde çalışır."""
+    return summarize(parse_block(columns, data), tail)
+
+
+class MinuteCounts:
+    """
+    Bellekte dakikalık sayaçlar: checkpoint -> {epoch dakikası -> n_t}.
+    Sıkıştırılmaz (MINUTE_RETENTION_DAYS yalnızca rollup'ın toplam dakika
+    katmanını sınırlar); geçmiş replay ve arşiv yazımı buna dayanır.
+    """
+
+    def __init__(self):
+        self.by_cp: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.first_minute: Dict[str, int] = {}
+        self.last_minute: Dict[str, int] = {}
+
+    def add(self, counts: List[Tuple[str, int, int]]) -> Dict[str, List[Tuple[int, int]]]:
+        """(cp, dakika, n) sayımlarını ekle; cp bazında (dakika, eklenen) listesi döndür."""
+        touched: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for cp, m, n in counts:
+            bucket = self.by_cp[cp]
+            bucket[m] = bucket.get(m, 0) + n
+            if m > self.last_minute.get(cp, m - 1):
+                self.last_minute[cp] = m
+            if m < self.first_minute.get(cp, m + 1):
+                self.first_minute[cp] = m
+            touched[cp].append((m, n))
+        return touched
+
+    def to_state(self) -> dict:
+        """Snapshot için düz veri: cp adları + (cp sırası, dakika, n) dizileri."""
+        cps = list(self.by_cp)
+        sizes = [len(self.by_cp[cp]) for cp in cps]
+        return {"cps": cps,
+                "cp": np.repeat(np.arange(len(cps), dtype=np.int64), sizes),
+                "minute": np.fromiter((m for cp in cps for m in self.by_cp[cp]), dtype=np.int64, count=sum(sizes)),
+                "n": np.fromiter((n for cp in cps for n in self.by_cp[cp].values()), dtype=np.int64, count=sum(sizes))}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "MinuteCounts":
+        out = cls()
+        cps = state["cps"]
+        out.add(zip((cps[i] for i in state["cp"].tolist()), state["minute"].tolist(), state["n"].tolist()))
+        return out
@@ -0,0 +1,118 @@
+# backend/ingestlog.py
+import os, threading, time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from backend.ingest import CsvTailIngester, parse_header
+
+
+class IngestLog:
+    """
+    POST /api/ingest ile gelen satırların kalıcı kopyası: CSV_PATH'ten ayrı,
+    yalnızca eklenen bir CSV. Yazma arkadan yapılır (write-behind): istek
+    satırları belleğe işleyip tampona ekler, disk yazımı `maybe_flush`
+    (updater tick'i) / `flush` (kapanış) ile toplu yapılır. Tampon
+    `max_rows`'u aşarsa ekleyen istek yazımı kendisi yapar. Açılışta dosya
+    CSV_PATH gibi baştan okunup belleğe geri yüklenir. Gelen satırlarda
+    başlıkta olmayan bir kolon varsa dosya bir kez genişletilir; eski
+    satırlar o kolonu `defaults`'taki değerle (yoksa boş) alır.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 1.0, max_rows: int = 50_000,
+                 defaults: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.defaults = defaults or {}
+        self.flush_interval, self.max_rows = flush_interval, max_rows
+        self.columns: Optional[List[str]] = None      # dosya başlığı
+        self._buf: List[pd.DataFrame] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._io = threading.Lock()
+
+    def take(self) -> List[pd.DataFrame]:
+        """
+        Snapshot'ın ilk yarısı, çağıranın (ingest_lock) altında: tamponu al ve
+        yazma sırasını ayır. Hemen ardından `mark` çağrılmalı; o dönene kadar
+        başka yazım beklediği için günlükte snapshot'tan yeni satır öne geçemez.
+        """
+        self._io.acquire()
+        with self._lock:
+            buf, self._buf, self._buffered = self._buf, [], 0
+            self._last_flush = time.monotonic()
+        return buf
+
+    def mark(self, buf: List[pd.DataFrame]) -> Optional[dict]:
+        """`take` ile alınan tamponu yaz (fsync) ve diskteki son konumu döndür; kilit dışında."""
+        try:
+            self._write(buf)
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return None
+            return {"inode": st.st_ino, "offset": st.st_size, "columns": self.columns or self._header()}
+        finally:
+            self._io.release()
+
+    def reader(self, mark: Optional[dict] = None) -> CsvTailIngester:
+        """Günlüğü `mark`'tan (yoksa baştan) okuyan ingester."""
+        r = CsvTailIngester(self.path)
+        if mark:
+            r.inode, r.offset, r.columns = mark["inode"], mark["offset"], mark["columns"]
+        return r
+
+    def append(self, df: pd.DataFrame):
+        with self._lock:
+            self._buf.append(df)
+            self._buffered += len(df)
+            full = self._buffered >= self.max_rows
+        if full:
+            self.flush()
+
+    def maybe_flush(self):
+        if self._buffered and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self._io:
+            with self._lock:
+                buf, self._buf, self._buffered = self._buf, [], 0
+                self._last_flush = time.monotonic()
+            self._write(buf)
+
+    def _write(self, buf: List[pd.DataFrame]):
+        """Tamponu dosyaya ekle (`_io` çağıranda)."""
+        if not buf:
+            return
+        df = pd.concat(buf, ignore_index=True)
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if new or self.columns is None:
+            self.columns = list(df.columns) if new else self._header()
+        missing = [c for c in df.columns if c not in self.columns]
+        if missing:
+            self._widen(missing)
+        # dosya başlığındaki kolonlar, aynı sırayla (eksikler boş)
+        df = df.reindex(columns=self.columns, fill_value="")
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            df.to_csv(f, header=new, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _widen(self, missing: List[str]):
+        """Başlığa kolon ekle: dosya yeniden yazılıp atomik olarak değiştirilir (yeni inode)."""
+        old = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+        for c in missing:
+            old[c] = self.defaults.get(c, "")
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            old.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.columns = list(old.columns)
+
+    def _header(self) -> List[str]:
+        with open(self.path, "rb") as f:
+            return parse_header(f.readline())
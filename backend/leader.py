@@ -0,0 +1,169 @@
+# backend/leader.py
+import http.client, os, select, socket, threading, time
+from typing import Callable, List, Optional, Tuple
+
+try:  # Windows'ta yok -> her süreç kendi başına lider
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+# lidere iletilmeyecek hop-by-hop başlıklar
+_HOP = {"connection", "keep-alive", "transfer-encoding", "te", "trailer", "upgrade", "host", "content-length"}
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = 10.0):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(self.timeout)
+        s.connect(self._path)
+        self.sock = s
+
+
+class Coordinator:
+    """
+    `uvicorn --workers N` için tek-yazar / çok-okur düzeni. Kilit dosyasını
+    (flock) alan worker lider olur: CSV ingest + EWMA yalnızca onda çalışır
+    ve durumu bir Unix soketi üzerinden HTTP ile sunar. Soket sunucusu ilk
+    takipçi bağlandığında başlar; tek worker'lı çalışmada hiç açılmaz.
+    Diğer worker'lar durum isteyen çağrıları kalıcı (havuzlanmış)
+    bağlantılarla lidere iletir, /api/stream'i tek bağlantıyla liderden
+    alıp kendi istemcilerine dağıtır. Lider ölürse kilit serbest kalır ve
+    bekleyen worker'lardan biri liderliği devralır.
+    """
+
+    def __init__(self, sock_path: str, max_idle: int = 32, idle_timeout: float = 30.0):
+        self.sock_path = sock_path
+        self.is_leader = False
+        self.relay_connected = False      # takipçi: liderin akışı şu an alınıyor mu
+        self.max_idle, self.idle_timeout = max_idle, idle_timeout
+        self._idle: List[Tuple[_UnixHTTPConnection, float]] = []    # boştaki bağlantılar
+        self._idle_lock = threading.Lock()
+        self._fd = None
+        self._server = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sock_path) and fcntl is not None and hasattr(socket, "AF_UNIX")
+
+    def start(self, on_leader: Callable[[], None], on_follower: Callable[[], None]):
+        if not self.enabled:
+            self.is_leader = True
+            on_leader()
+            return
+        self._fd = os.open(self.sock_path + ".lock", os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            on_follower()
+
+            def wait():
+                fcntl.flock(self._fd, fcntl.LOCK_EX)   # lider ölene kadar bekler
+                self.is_leader = True
+                on_leader()
+
+            threading.Thread(target=wait, daemon=True).start()
+            return
+        self.is_leader = True
+        on_leader()
+
+    # --- lider tarafı ---
+
+    def serve(self, app):
+        """
+        Uygulamayı Unix soketi üzerinden de sun (worker'lar buraya bağlanır).
+        Soket hemen dinlemeye açılır, uvicorn sunucusu ise ilk bağlantı
+        geldiğinde başlar (bekleyen bağlantı kuyrukta kalır).
+        """
+        if not self.enabled:
+            return
+        if os.path.exists(self.sock_path):
+            os.unlink(self.sock_path)          # kilit bizde: eski soket artık ölü
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.sock_path)
+        sock.listen(128)
+        threading.Thread(target=self._serve_on_demand, args=(app, sock), daemon=True).start()
+
+    def _serve_on_demand(self, app, sock):
+        import uvicorn
+        select.select([sock], [], [])          # ilk takipçi bağlanana kadar bekle
+        config = uvicorn.Config(app, loop="asyncio", lifespan="off", log_level="warning",
+                                access_log=False, timeout_keep_alive=2 * int(self.idle_timeout))
+        self._server = uvicorn.Server(config)
+        self._server.run(sockets=[sock])
+
+    # --- takipçi tarafı ---
+
+    def _checkout(self) -> Tuple[_UnixHTTPConnection, bool]:
+        """Boştaki bir bağlantı (süresi dolmamış) ya da yenisi; (bağlantı, yeniden mi)."""
+        with self._idle_lock:
+            while self._idle:
+                conn, used = self._idle.pop()
+                if time.monotonic() - used < self.idle_timeout:
+                    return conn, True
+                conn.close()                   # sunucu keep-alive süresini aşmak üzere
+        return _UnixHTTPConnection(self.sock_path), False
+
+    def _checkin(self, conn: _UnixHTTPConnection):
+        with self._idle_lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def forward(self, method: str, target: str, headers: List[Tuple[str, str]],
+                body: bytes) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        headers = {k: v for k, v in headers if k.lower() not in _HOP}
+        while True:
+            conn, reused = self._checkout()
+            try:
+                conn.request(method, target, body=body or None, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected):
+                conn.close()
+                if reused and method in ("GET", "HEAD"):
+                    continue                   # lider boştaki bağlantıyı kapatmış: yenisiyle dene
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            return resp.status, [(k, v) for k, v in resp.getheaders() if k.lower() not in _HOP], data
+
+    def relay_stream(self, publish_raw: Callable[[bytes], None], on_connect: Callable[[], None] = lambda: None):
+        """
+        Liderin /api/stream akışını okuyup olayları yerel hub'a aktar
+        (takipçi thread'i). `on_connect` her (yeniden) bağlanmada çağrılır:
+        arada kaçan olaylar için yerel önbellek geçersizlenir.
+        """
+        while not self.is_leader:
+            conn: Optional[_UnixHTTPConnection] = None
+            try:
+                conn = _UnixHTTPConnection(self.sock_path, timeout=60)
+                conn.request("GET", "/api/stream")
+                resp = conn.getresponse()
+                self.relay_connected = True
+                on_connect()
+                buf = b""
+                while not self.is_leader:
+                    chunk = resp.read1(65536)
+                    if not chunk:
+                        break
+                    buf += chunk
+                    while b"\n\n" in buf:
+                        event, buf = buf.split(b"\n\n", 1)
+                        if event.startswith(b"id:"):      # retry/ping satırlarını atla
+                            publish_raw(event + b"\n\n")
+            except (OSError, http.client.HTTPException):   # lider kapanırken akış yarıda kesilebilir
+                time.sleep(1.0)
+            finally:
+                self.relay_connected = False
+                if conn is not None:
+                    conn.close()
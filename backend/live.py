@@ -0,0 +1,78 @@
+# backend/live.py
+import asyncio, threading
+
+from backend.fastjson import dumps
+
+
+class LiveHub:
+    """
+    Tek üretici (updater_loop) -> çok istemci (SSE) dağıtımı.
+    Her mesaj bir kez serileştirilir, tüm abonelere aynı bayt dizisi gider.
+    Yetişemeyen istemcinin akışı kapatılır; EventSource yeniden bağlanır.
+    """
+
+    def __init__(self, max_queue: int = 64):
+        self.max_queue = max_queue
+        self.seq = 0
+        self._subs = set()
+        self._lock = threading.Lock()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self) -> asyncio.Queue:
+        q = asyncio.Queue(maxsize=self.max_queue)
+        with self._lock:
+            self._subs.add((asyncio.get_running_loop(), q))
+        return q
+
+    def unsubscribe(self, q: asyncio.Queue):
+        with self._lock:
+            self._subs = {s for s in self._subs if s[1] is not q}
+
+    def publish(self, event: str, payload: dict):
+        """Thread-safe; updater thread'inden çağrılır."""
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+        if not self._subs:
+            return
+        self.publish_raw(f"id: {seq}\nevent: {event}\ndata: ".encode() + dumps(payload) + b"\n\n")
+
+    def publish_raw(self, data: bytes):
+        """Hazır SSE olayını (ör. liderden aktarılan) olduğu gibi dağıt."""
+        with self._lock:
+            subs = list(self._subs)
+        for loop, q in subs:
+            try:
+                loop.call_soon_threadsafe(self._offer, q, data)
+            except RuntimeError:
+                # loop kapanmış
+                self.unsubscribe(q)
+
+    @staticmethod
+    def _offer(q: asyncio.Queue, data: bytes):
+        if q.full():
+            # yavaş istemci: kuyruğu boşalt ve akışı sonlandır
+            while not q.empty():
+                q.get_nowait()
+            q.put_nowait(None)
+            return
+        q.put_nowait(data)
+
+    async def stream(self, q: asyncio.Queue, keepalive: float = 15.0):
+        """StreamingResponse için SSE bayt üreteci."""
+        try:
+            yield b"retry: 2000\n\n"
+            while True:
+                try:
+                    msg = await asyncio.wait_for(q.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if msg is None:
+                    break
+                yield msg
+        finally:
+            self.unsubscribe(q)
@@ -0,0 +1,151 @@
+# backend/metrics.py
+import bisect, threading, time
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+# varsayılan kovalar: saniye / bayt / satır
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = tuple(256 * 4 ** i for i in range(10))           # 256 B .. 64 MB
+ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    items = ['%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")) for k, v in pairs]
+    return "{" + ",".join(items) + "}" if items else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, n: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(k)} {v:g}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Değeri okuma anında bir fonksiyondan alınır."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn):
+        super().__init__(name, help)
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name} {float(self.fn()):g}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = TIME_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(buckets)
+        self._series: Dict[tuple, list] = {}        # etiketler -> [kova sayıları, toplam, adet]
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t, **labels)
+
+    def render(self) -> List[str]:
+        out = self.header()
+        with self._lock:
+            items = sorted((k, ([*s[0]], s[1], s[2])) for k, s in self._series.items())
+        for key, (counts, total, n) in items:
+            acc = 0
+            for le, c in zip(self.buckets, counts):
+                acc += c
+                out.append(f"{self.name}_bucket{_labels(key + (('le', f'{le:g}'),))} {acc}")
+            out.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {n}")
+            out.append(f"{self.name}_sum{_labels(key)} {total:g}")
+            out.append(f"{self.name}_count{_labels(key)} {n}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def add(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self.add(Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = TIME_BUCKETS) -> Histogram:
+        return self.add(Histogram(name, help, buckets))
+
+    def gauge(self, name: str, help: str, fn) -> Gauge:
+        return self.add(Gauge(name, help, fn))
+
+    def render(self) -> str:
+        """Prometheus metin formatı (0.0.4)."""
+        lines = []
+        for m in self._metrics.values():
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+class TimedLock:
+    """
+    threading.Lock sarmalayıcısı: kilidi almak için beklenen süreyi
+    `hist`'e (lock=<ad> etiketiyle) yazar. `with lock:` kullanımı aynı kalır.
+    """
+
+    def __init__(self, lock, hist: Histogram, name: str):
+        self._lock, self._hist, self._name = lock, hist, name
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        t = time.perf_counter()
+        ok = self._lock.acquire(blocking, timeout)
+        self._hist.observe(time.perf_counter() - t, lock=self._name)
+        return ok
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+REGISTRY = Registry()
@@ -0,0 +1,84 @@
+# backend/parsepool.py
+import logging, multiprocessing, threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List
+
+from backend.ingest import Chunk, CsvTailIngester, summarize_block
+
+log = logging.getLogger("paxflow")
+
+
+class ChunkParser:
+    """
+    CSV bloklarını ayrı süreç(ler)de parse edip özetler; ana sürece yalnızca
+    kompakt `Chunk`'lar döner. Böylece büyük pd.read_csv'ler istek sunan
+    süreçte GIL'i tutmaz. Küçük bloklar (canlı tick'ler) IPC maliyetine
+    değmediği için yerinde işlenir. Havuz ilk büyük blokta (spawn ile)
+    açılır; bozulursa yerinde işlemeye düşülür.
+    """
+
+    def __init__(self, workers: int = 1, inline_bytes: int = 256 * 1024):
+        self.workers, self.inline_bytes = workers, inline_bytes
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None and self.workers > 0:
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _broken(self):
+        log.exception("ayrıştırma süreci çöktü, yerinde parse ediliyor")
+        with self._lock:
+            self._pool = None
+
+    def poll(self, ingester: CsvTailIngester, tail: int, fn: Callable = summarize_block) -> List[Chunk]:
+        """
+        Ingester'daki yeni baytları sırayla `fn(columns, data, tail)` ile
+        özetle (en fazla 2×worker blok uçuşta). `fn` modül düzeyinde olmalı.
+        """
+        out, inflight = [], deque()
+        for data in ingester.read_blocks():
+            pool = self._executor() if len(data) >= self.inline_bytes else None
+            if pool is None:
+                while inflight:                      # sıra korunur
+                    out.append(self._result(*inflight.popleft(), tail))
+                out.append(fn(ingester.columns, data, tail))
+                continue
+            try:
+                inflight.append((pool.submit(fn, ingester.columns, data, tail), fn, ingester.columns, data))
+            except BrokenProcessPool:
+                self._broken()
+                inflight.append((None, fn, ingester.columns, data))
+            while len(inflight) > 2 * self.workers:
+                out.append(self._result(*inflight.popleft(), tail))
+        while inflight:
+            out.append(self._result(*inflight.popleft(), tail))
+        return out
+
+    def _result(self, fut, fn, columns, data, tail) -> Chunk:
+        if fut is not None:
+            try:
+                return fut.result()
+            except BrokenProcessPool:
+                self._broken()
+        return fn(columns, data, tail)
+
+    def run(self, fn, *args):
+        """`fn(*args)`'ı havuzda çalıştır (havuz yoksa / bozuksa yerinde)."""
+        pool = self._executor()
+        if pool is not None:
+            try:
+                return pool.submit(fn, *args).result()
+            except BrokenProcessPool:
+                self._broken()
+        return fn(*args)
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
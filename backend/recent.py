@@ -0,0 +1,148 @@
+# backend/recent.py
+import bisect
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional
+
+
+class LevelWindow:
+    """
+    Bir checkpoint'in son N dakikası için kayan pencere: seviye histogramı
+    ve RED serileri. Her yeni dakikada O(1) güncellenir, en eski dakika
+    pencereden düşerken sayaçlardan da çıkarılır.
+    """
+
+    def __init__(self, size: int = 60):
+        self.size = size
+        self.levels: deque = deque()
+        self.hist = {"GREEN": 0, "YELLOW": 0, "RED": 0}
+        self.runs: deque = deque()     # RED serileri: [başlangıç sırası, uzunluk]
+        self.seq = 0                   # sonraki dakikanın sıra numarası
+
+    def push(self, level: str):
+        if len(self.levels) == self.size:
+            old = self.levels.popleft()
+            self.hist[old] -= 1
+            if old == "RED":
+                run = self.runs[0]
+                run[0] += 1
+                run[1] -= 1
+                if run[1] == 0:
+                    self.runs.popleft()
+        self.levels.append(level)
+        self.hist[level] += 1
+        if level == "RED":
+            if self.runs and self.runs[-1][0] + self.runs[-1][1] == self.seq:
+                self.runs[-1][1] += 1
+            else:
+                self.runs.append([self.seq, 1])
+        self.seq += 1
+
+    @property
+    def current_red(self) -> int:
+        return self.runs[-1][1] if self.levels and self.levels[-1] == "RED" else 0
+
+    @property
+    def max_red(self) -> int:
+        # pencerede en fazla size/2 seri olabilir
+        return max((r[1] for r in self.runs), default=0)
+
+
+class RecentIndex:
+    """
+    EWMA kayıtları için (checkpoint, dakika) anahtarlı pencere.
+    Aynı dakika+checkpoint eklemede tekilleştirilir (son gelen kazanır),
+    her checkpoint kendi içinde zaman sıralı tutulur. Okumalar sıralama
+    yapmaz: son k kayıt O(k + checkpoint) ile dilimlenir. Her cp için
+    son `window` dakikanın seviye penceresi de eklemeyle birlikte güncellenir.
+    """
+
+    def __init__(self, per_cp: int = 600, window: int = 60):
+        self.per_cp = per_cp                      # ~10 saat / 1 dk (cp başına)
+        self.window = window
+        self._by_cp: Dict[str, deque] = {}
+        self._cps: List[str] = []                 # sıralı checkpoint listesi
+        self.levels: Dict[str, LevelWindow] = {}
+
+    def __len__(self):
+        return sum(len(d) for d in self._by_cp.values())
+
+    @property
+    def checkpoints(self) -> List[str]:
+        return self._cps
+
+    def append(self, rec: dict):
+        cp, ts = rec["checkpoint_id"], rec["ts_minute"]
+        d = self._by_cp.get(cp)
+        if d is None:
+            d = self._by_cp[cp] = deque(maxlen=self.per_cp)
+            self.levels[cp] = LevelWindow(self.window)
+            bisect.insort(self._cps, cp)
+        if not d or d[-1]["ts_minute"] < ts:
+            d.append(rec)
+            self.levels[cp].push(rec.get("level", "GREEN"))
+            return
+        # aynı dakika ya da sıra dışı kayıt: yerini sondan geriye ara (nadir)
+        for i in range(len(d) - 1, -1, -1):
+            cur = d[i]["ts_minute"]
+            if cur == ts:
+                d[i] = rec
+                break
+            if cur < ts:
+                if len(d) == d.maxlen:
+                    d.popleft()
+                    i -= 1
+                d.insert(i + 1, rec)
+                break
+        else:
+            if len(d) < d.maxlen:
+                d.appendleft(rec)
+        self._rebuild_levels(cp)
+
+    def _rebuild_levels(self, cp: str):
+        w = self.levels[cp] = LevelWindow(self.window)
+        d = self._by_cp[cp]
+        for r in islice(d, max(0, len(d) - self.window), None):
+            w.push(r.get("level", "GREEN"))
+
+    def extend(self, recs):
+        for r in recs:
+            self.append(r)
+
+    def to_state(self) -> dict:
+        """Snapshot için düz veri; seviye pencereleri kayıtlardan yeniden kurulur."""
+        return {"per_cp": self.per_cp, "window": self.window,
+                "records": {cp: list(self._by_cp[cp]) for cp in self._cps}}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "RecentIndex":
+        out = cls(state["per_cp"], state["window"])
+        for recs in state["records"].values():
+            out.extend(recs)
+        return out
+
+    def level_stats(self) -> List[tuple]:
+        """cp sırasıyla (cp, pencere) listesi; O(checkpoint)."""
+        return [(cp, self.levels[cp]) for cp in self._cps]
+
+    def latest(self, cp: str) -> Optional[dict]:
+        d = self._by_cp.get(cp)
+        return d[-1] if d else None
+
+    def last(self, k: int) -> List[dict]:
+        """(checkpoint, dakika) sırasındaki son k kayıt (eski _dedupe_by_minute(...)[-k:])."""
+        if k <= 0:
+            return []
+        chunks, need = [], k
+        for cp in reversed(self._cps):
+            d = self._by_cp[cp]
+            take = list(islice(reversed(d), need))
+            take.reverse()
+            chunks.append(take)
+            need -= len(take)
+            if need <= 0:
+                break
+        out = []
+        for c in reversed(chunks):
+            out.extend(c)
+        return out
@@ -0,0 +1,89 @@
+# backend/rollup.py
+from collections import defaultdict
+from typing import Dict
+
+import numpy as np
+
+HOUR, DAY = 60, 1440
+
+
+class TieredRollup:
+    """
+    Dakika -> saat -> gün katmanlı toplamlar (tüm CP'ler + CP başına).
+    Her yeni sayım üç katmana birden eklenir; böylece N saatlik/günlük
+    sorgu ~N sayı okur. Toplam dakika katmanı `minute_retention` dakikadan
+    eskiyse sıkıştırılır (silinir): o dakikalar saat/gün katmanlarında
+    zaten toplanmış durumdadır. Saklama süresi yalnızca bu türetilmiş
+    katmanı sınırlar; CP başına dakika sayaçları (MinuteCounts.by_cp)
+    EWMA commit'i, /api/history ve dakika arşivi için tamamen tutulur,
+    yani bellek veri süresi × CP ile büyümeye devam eder.
+    """
+
+    def __init__(self, minute_retention: int = 7 * DAY):
+        self.minute_retention = minute_retention
+        self.minute: Dict[int, int] = defaultdict(int)                 # dakika -> toplam
+        self.tiers = {HOUR: defaultdict(int), DAY: defaultdict(int)}   # kova -> toplam
+        self.by_cp = {HOUR: defaultdict(lambda: defaultdict(int)),      # cp -> kova -> toplam
+                      DAY: defaultdict(lambda: defaultdict(int))}
+        self.minute_floor = None          # bundan eski dakikalar yalnızca saat/gün katmanında
+        self._compacted_at = None
+
+    def to_state(self) -> dict:
+        """Snapshot için düz veri: her katman (kova, toplam) dizileri olarak."""
+        def pairs(d):
+            return {"key": np.fromiter(d.keys(), dtype=np.int64, count=len(d)),
+                    "n": np.fromiter(d.values(), dtype=np.int64, count=len(d))}
+        return {"minute_retention": self.minute_retention, "minute_floor": self.minute_floor,
+                "compacted_at": self._compacted_at, "minute": pairs(self.minute),
+                "tiers": {str(step): pairs(t) for step, t in self.tiers.items()},
+                "by_cp": {str(step): {cp: pairs(t) for cp, t in tiers.items()} for step, tiers in self.by_cp.items()}}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "TieredRollup":
+        def fill(d, p):
+            d.update(zip(p["key"].tolist(), p["n"].tolist()))
+        out = cls(state["minute_retention"])
+        out.minute_floor, out._compacted_at = state["minute_floor"], state["compacted_at"]
+        fill(out.minute, state["minute"])
+        for step in out.tiers:
+            fill(out.tiers[step], state["tiers"][str(step)])
+            for cp, p in state["by_cp"][str(step)].items():
+                fill(out.by_cp[step][cp], p)
+        return out
+
+    def add(self, cp: str, m: int, n: int):
+        if self.minute_floor is None or m >= self.minute_floor:
+            self.minute[m] += n
+        for step, tier in self.tiers.items():
+            tier[m // step] += n
+            self.by_cp[step][cp][m // step] += n
+
+    def compact(self, now: int):
+        """Saklama süresini aşan dakikaları düşür (en fazla saatte bir tarar)."""
+        cutoff = now - self.minute_retention
+        if self._compacted_at is not None and cutoff - self._compacted_at < HOUR:
+            return 0
+        self._compacted_at = cutoff
+        self.minute_floor = cutoff if self.minute_floor is None else max(self.minute_floor, cutoff)
+        old = [m for m in self.minute if m < cutoff]
+        for m in old:
+            del self.minute[m]
+        return len(old)
+
+    def has_minutes(self, lo: int) -> bool:
+        return self.minute_floor is None or lo >= self.minute_floor
+
+    def minute_sum(self, lo: int, hi: int) -> int:
+        get = self.minute.get
+        return sum(get(m, 0) for m in range(lo, hi + 1))
+
+    def series(self, step: int, lo: int, hi: int) -> np.ndarray:
+        """[lo, hi] kova indeksleri için toplamlar (hi-lo+1 okuma)."""
+        get = self.tiers[step].get
+        return np.fromiter((get(b, 0) for b in range(lo, hi + 1)), dtype=np.int64, count=hi - lo + 1)
+
+    def cp_totals(self, step: int, lo: int, hi: int) -> Dict[str, int]:
+        out = {}
+        for cp, tier in self.by_cp[step].items():
+            out[cp] = sum(tier.get(b, 0) for b in range(lo, hi + 1))
+        return out
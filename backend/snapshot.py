@@ -0,0 +1,69 @@
+# backend/snapshot.py
+import io, json, os
+from typing import Optional
+
+import numpy as np
+
+VERSION = 2          # durum şeması değişince artır; eski dosyalar yok sayılır
+
+
+def encode_snapshot(state: dict) -> bytes:
+    """
+    Durumu düz veri olarak yaz: NumPy dizileri npz üyeleri, geri kalan her
+    şey (yalnızca JSON tipleri) tek bir "meta" JSON'u. Nesne pickle'lanmaz;
+    sınıflar okurken kendi `from_state`'leriyle yeniden kurulur.
+    """
+    arrays = {}
+
+    def split(v):
+        if isinstance(v, np.ndarray):
+            if v.dtype == object:
+                raise TypeError("snapshot'ta nesne dizisi olamaz")
+            key = f"a{len(arrays)}"
+            arrays[key] = v
+            return {"__array__": key}
+        if isinstance(v, dict):
+            return {str(k): split(x) for k, x in v.items()}
+        if isinstance(v, (list, tuple)):
+            return [split(x) for x in v]
+        if v is None or isinstance(v, (str, bool, int, float)):
+            return v
+        raise TypeError(f"snapshot'ta desteklenmeyen tip: {type(v).__name__}")
+
+    meta = json.dumps({"version": VERSION, **split(state)})
+    buf = io.BytesIO()
+    np.savez(buf, meta=np.frombuffer(meta.encode("utf-8"), dtype=np.uint8), **arrays)
+    return buf.getvalue()
+
+
+def save_snapshot(path: str, data: bytes):
+    """encode_snapshot çıktısını atomik yaz (tmp + rename)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str) -> Optional[dict]:
+    """Snapshot'ı oku; yoksa, bozuksa ya da sürümü farklıysa None."""
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            state = json.loads(z["meta"].tobytes().decode("utf-8"))
+            if not isinstance(state, dict) or state.get("version") != VERSION:
+                return None
+
+            def join(v):
+                if isinstance(v, dict):
+                    if set(v) == {"__array__"}:
+                        return z[v["__array__"]]
+                    return {k: join(x) for k, x in v.items()}
+                if isinstance(v, list):
+                    return [join(x) for x in v]
+                return v
+
+            return join(state)
+    except Exception:          # yok / yarım yazılmış / eski biçim: baştan kurulur
+        return None
@@ -0,0 +1,170 @@
+# backend/store.py
+import threading
+from collections import Counter, deque
+from typing import Dict, List
+
+import numpy as np
+
+from backend.fastjson import series
+from backend.ingest import Chunk, MinuteCounts, minute_to_dt
+from backend.rollup import HOUR, TieredRollup
+
+
+class FlowStore:
+    """
+    Süreç genelindeki tek bellek deposu. Ingester satırları bir kez buraya
+    işler; okuma uçları (son dakikalar, saatlik seri, destinasyonlar, CSV
+    önizleme) diske dokunmadan buradan cevap verir.
+    """
+
+    def __init__(self, ring_size: int = 1000, minute_retention: int = 7 * 1440):
+        self.lock = threading.RLock()
+        self.counts = MinuteCounts()                        # cp -> dakika -> n_t
+        self.rollup = TieredRollup(minute_retention)        # toplam: dakika -> saat -> gün
+        self.destinations: Counter = Counter()
+        self.total_rows = 0
+        self.columns: List[str] = []
+        self.ring: deque = deque(maxlen=ring_size)          # ham satırlar (tuple)
+        self.version = 0
+
+    def to_state(self) -> dict:
+        """Snapshot için düz veri (kilit çağıranda)."""
+        return {"ring_size": self.ring.maxlen, "counts": self.counts.to_state(), "rollup": self.rollup.to_state(),
+                "destinations": [[d, n] for d, n in self.destinations.items()], "total_rows": self.total_rows,
+                "columns": list(self.columns), "ring": [list(r) for r in self.ring], "version": self.version}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "FlowStore":
+        out = cls(ring_size=state["ring_size"])
+        out.counts = MinuteCounts.from_state(state["counts"])
+        out.rollup = TieredRollup.from_state(state["rollup"])
+        out.destinations.update({d: n for d, n in state["destinations"]})
+        out.total_rows, out.columns, out.version = state["total_rows"], state["columns"], state["version"]
+        out.ring.extend(tuple(r) for r in state["ring"])
+        return out
+
+    def apply(self, chunk: Chunk) -> Dict[str, list]:
+        """Önceden özetlenmiş bir bloğu (bkz. ingest.summarize) sayaçlara işle."""
+        with self.lock:
+            if chunk.columns != self.columns:
+                # başlık değiştiyse eski satırlar yeni kolonlarla uyuşmaz
+                self.columns = list(chunk.columns)
+                self.ring.clear()
+
+            touched = self.counts.add(chunk.counts)
+            for cp, pairs in touched.items():
+                for m, n in pairs:
+                    self.rollup.add(cp, m, n)
+            if self.counts.last_minute:
+                self.rollup.compact(max(self.counts.last_minute.values()))
+
+            self.destinations.update(chunk.destinations)
+            self.total_rows += chunk.rows
+
+            self.ring.extend(chunk.tail)
+            self.version += 1
+            return touched
+
+    # --- okuma tarafı ---
+
+    def cps_overlapping(self, lo: int, hi: int) -> int:
+        first, last = self.counts.first_minute, self.counts.last_minute
+        return sum(1 for cp in last if first[cp] <= hi and last[cp] >= lo)
+
+    def last_minutes(self, end: int, minutes: int, shape: str = "rows") -> dict:
+        """[end-minutes+1, end] aralığının dakikalık toplamı (0'lar dahil) + KPI'lar."""
+        start = end - minutes + 1
+        with self.lock:
+            get = self.rollup.minute.get
+            counts = np.fromiter((get(m, 0) for m in range(start, end + 1)), dtype=np.int64, count=minutes)
+            cp_count = self.cps_overlapping(start, end)
+
+        total = int(counts.sum())
+        peak_i = int(counts.argmax())
+        peak_count = int(counts[peak_i])
+        peak_ts = minute_to_dt(start + peak_i).isoformat() if peak_count > 0 else None
+        return {"series": series(np.arange(start, end + 1), counts, shape),
+                "kpis": {"total": total, "avg_per_min": round(total / minutes, 2),
+                         "peak_count": peak_count, "peak_ts": peak_ts, "cp_count": cp_count}}
+
+    def last_hours(self, hours: int, shape: str = "rows") -> dict:
+        """Son verili dakikadan geriye N saatlik pencerenin saatlik toplamları."""
+        with self.lock:
+            if not self.counts.last_minute:
+                return {"series": [], "kpis": {"total": 0, "avg_per_hour": 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0}}
+            end = max(self.counts.last_minute.values())
+            start = end - (hours - 1) * 60
+            first, last = self.counts.first_minute, self.counts.last_minute
+
+            buckets = []
+            for h in range(start // 60, end // 60 + 1):
+                lo, hi = max(start, h * 60), min(end, h * 60 + 59)
+                if not any(first[cp] <= hi and last[cp] >= lo for cp in last):
+                    continue
+                if lo == h * 60 or not self.rollup.has_minutes(lo):
+                    # saat katmanından tek okuma (dakikaları sıkıştırılmışsa yarım saat de tam sayılır)
+                    c = self.rollup.tiers[HOUR].get(h, 0)
+                else:
+                    # pencerenin ilk saati yarım kalabilir
+                    c = self.rollup.minute_sum(lo, hi)
+                buckets.append((h, c))
+            cp_count = self.cps_overlapping(start, end)
+
+        if not buckets:
+            return {"series": series([], [], shape), "kpis": {"total": 0, "avg_per_hour": 0.0, "peak_count": 0, "peak_ts": None, "cp_count": 0}}
+        hs = np.array([h for h, _ in buckets], dtype=np.int64)
+        vals = np.array([c for _, c in buckets], dtype=np.int64)
+        peak_i = int(vals.argmax())
+        return {
+            "series": series(hs * 60, vals, shape),
+            "kpis": {
+                "total": int(vals.sum()),
+                "avg_per_hour": round(float(vals.mean()), 2),
+                "peak_count": int(vals[peak_i]),
+                "peak_ts": minute_to_dt(hs[peak_i] * 60).isoformat(),
+                "cp_count": cp_count,
+            },
+        }
+
+    def top_destinations(self, k: int = 10) -> dict:
+        with self.lock:
+            top = self.destinations.most_common(k)
+            total = self.total_rows
+        if not total:
+            return {"destinations": []}
+        return {"destinations": [{"destination": str(d), "count": int(c), "percentage": round(c / total * 100, 1)}
+                                 for d, c in top],
+                "total_flights": total}
+
+    def tail(self, limit: int, shape: str = "rows") -> dict:
+        """Halka tampondan son N ham satır (en yeni en üstte)."""
+        with self.lock:
+            cols = list(self.columns)
+            rows = list(self.ring)[-limit:] if limit > 0 else []
+        return rows_payload(cols, rows, shape)
+
+    def covers_tail(self, limit: int) -> bool:
+        """Son N satır halka tamponda tam olarak var mı?"""
+        with self.lock:
+            have = len(self.ring)
+            return have > 0 and (limit <= have or self.total_rows <= have)
+
+
+def rows_payload(cols: List[str], rows, shape: str = "rows") -> dict:
+    """
+    /api/csv/latest biçimi: kolonlar + '__rowid', en yeni satır en üstte.
+    shape=columns: satır sözlükleri yerine {"values": {kolon: [...]}}.
+    """
+    if shape == "columns":
+        rev = rows[::-1]
+        values = {c: [r[j] for r in rev] for j, c in enumerate(cols)}
+        values["__rowid"] = list(range(len(rows) - 1, -1, -1))
+        return {"columns": cols + ["__rowid"], "values": values}
+    if not rows:
+        return {"columns": cols, "rows": []}
+    out = []
+    for i, r in enumerate(rows):
+        d = dict(zip(cols, r))
+        d["__rowid"] = i
+        out.append(d)
+    return {"columns": cols + ["__rowid"], "rows": out[::-1]}
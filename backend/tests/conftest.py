@@ -0,0 +1,55 @@
+# backend/tests/conftest.py
+import os, tempfile
+
+import pandas as pd
+import pytest
+
+# backend.app import'ta yapılandırmayı okur: testler kalıcı duruma / sokete /
+# arka plan thread'ine dokunmasın, CSV geçici klasörde olsun
+_TMP = tempfile.mkdtemp(prefix="paxflow-test-")
+os.environ.update(
+    PAXFLOW_AUTOSTART="0", STATE_SOCKET="", STORE_BACKEND="csv", PARSE_WORKERS="0",
+    CSV_PATH=os.path.join(_TMP, "flight_data.csv"), SNAPSHOT_PATH="", INGEST_LOG="", MINUTE_ARCHIVE="",
+)
+
+HEADER = "ID,CheckDate,checkpoint_id,DestinationAirport\n"
+
+
+def csv_rows(start, n: int, step_s: int = 7, cps=("CP1", "CP2", "CP3"), dests=("ESB", "AYT", "ADB")) -> str:
+    """`start`'tan itibaren `step_s` saniye aralıklı n satır (başlıksız)."""
+    t0 = pd.Timestamp(start)
+    return "".join(f"{i},{t0 + pd.Timedelta(seconds=step_s * i):%Y-%m-%d %H:%M:%S},{cps[i % len(cps)]},{dests[i % len(dests)]}\n"
+                   for i in range(n))
+
+
+def reset_state(A):
+    """backend.app'in bellek durumunu import sonrası haline getir (CSV'ye dokunmaz)."""
+    from backend.forecast import SeasonalForecaster
+    from backend.history import HistoryReplay
+    from backend.metrics import TimedLock
+    from backend.recent import RecentIndex
+    from backend.store import FlowStore
+
+    with A.tick_lock, A.ingest_lock:
+        A.ingester.reset()
+        A.store = FlowStore(ring_size=A.RING_SIZE, minute_retention=int(A.MINUTE_RETENTION_DAYS * 1440))
+        A.store.lock = TimedLock(A.store.lock, A.LOCK_WAIT, "store")
+        A.recent = RecentIndex(per_cp=600)
+        A.forecaster = SeasonalForecaster()
+        A.history_replay = HistoryReplay(A.ALPHA, A.GREEN, A.YELLOW)
+        for d in (A.ewmas, A.officers, A.committed, A.pending):
+            d.clear()
+        A.commit_due = False
+        A.responses.bump()
+
+
+@pytest.fixture
+def app():
+    """Boş durumlu backend.app modülü; CSV_PATH her testte yeniden yazılır."""
+    import backend.app as A
+
+    reset_state(A)
+    if os.path.exists(A.CSV_PATH):
+        os.remove(A.CSV_PATH)
+    yield A
+    A.SNAPSHOT_PATH = ""
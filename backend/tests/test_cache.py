@@ -0,0 +1,61 @@
+# backend/tests/test_cache.py
+import json
+import re
+
+from fastapi.testclient import TestClient
+
+from backend.cache import etag_for, etag_matches
+from conftest import HEADER, csv_rows
+
+
+def _other_count(c) -> int:
+    return sum(int(n) for n in re.findall(r'^paxflow_http_request_seconds_count\{[^}]*path="other"[^}]*\} (\d+)',
+                                         c.get("/metrics").text, re.M))
+
+
+def test_etag_matches():
+    tag = etag_for(b"abc")
+    assert etag_matches(tag, tag) and etag_matches("W/" + tag, tag) and etag_matches('"x", ' + tag, tag)
+    assert etag_matches("*", tag)
+    assert not etag_matches(None, tag) and not etag_matches(etag_for(b"abd"), tag)
+
+
+def test_cached_response_etag_and_304(app):
+    A = app
+    with open(A.CSV_PATH, "w") as f:
+        f.write(HEADER + csv_rows("2025-08-14 10:00", 300))
+    A.update_tick()
+    c = TestClient(A.app)
+
+    other = _other_count(c)
+    r1 = c.get("/api/destinations")
+    etag = r1.headers["etag"]
+    assert r1.status_code == 200
+    assert r1.json() == json.loads(json.dumps(A.get_destination_stats()))   # önbelleksiz uç noktayla aynı
+    r2 = c.get("/api/destinations")
+    assert (r2.headers["etag"], r2.content) == (etag, r1.content)
+    r3 = c.get("/api/destinations", headers={"If-None-Match": etag})
+    assert r3.status_code == 304 and r3.content == b""
+    assert c.get("/api/destinations", headers={"If-None-Match": "W/" + etag}).status_code == 304
+    bypass = c.get("/api/destinations", headers={"Cache-Control": "no-cache", "If-None-Match": etag})
+    assert bypass.status_code == 304                       # yeniden hesaplandı, içerik aynı
+
+    with open(A.CSV_PATH, "a") as f:
+        f.write(csv_rows("2025-08-14 11:00", 50, dests=("IST",)))
+    A.update_tick()
+    r4 = c.get("/api/destinations", headers={"If-None-Match": etag})
+    assert r4.status_code == 200 and r4.headers["etag"] != etag
+    assert r4.json() == json.loads(json.dumps(A.get_destination_stats()))
+
+    # isabetler / 304'ler rotanın adıyla etiketlenir, "other"a düşmez
+    assert 'path="/api/destinations",status="304"' in c.get("/metrics").text
+    assert _other_count(c) == other
+
+
+def test_uncached_paths_and_methods_skip_cache(app):
+    A = app
+    c = TestClient(A.app)
+    r = c.get("/health")
+    assert r.status_code == 200 and "etag" not in r.headers
+    assert c.post("/api/capacity", json={"checkpoint_id": "CP1", "officers": 2}).status_code == 200
+    assert A.officers["CP1"] == 2
@@ -0,0 +1,49 @@
+# backend/tests/test_ewma.py
+import numpy as np
+import pytest
+
+from backend.ewma import ewma_matrix
+
+
+class EWMA:
+    """Eski dakika başına skaler EWMA (app.EWMA)."""
+
+    def __init__(self, alpha: float): self.a, self.v = alpha, None
+
+    def update(self, x: float) -> float:
+        self.v = x if self.v is None else self.a * x + (1 - self.a) * self.v
+        return self.v
+
+
+def scalar_ewma(X, v0, alpha):
+    out = np.empty(X.shape)
+    for i, row in enumerate(X):
+        e = EWMA(alpha)
+        e.v = None if np.isnan(v0[i]) else v0[i]
+        for t, x in enumerate(row):
+            out[i, t] = e.update(float(x))
+    return out
+
+
+@pytest.mark.parametrize("alpha", [0.25, 0.01, 0.9, 1.0])
+@pytest.mark.parametrize("M", [1, 7, 600, 2000])
+def test_matches_scalar_ewma(alpha, M):
+    rng = np.random.default_rng(M)
+    X = rng.poisson(rng.uniform(0, 40, size=(4, 1)), size=(4, M)).astype(float)
+    X[2, M // 3:M // 3 + 50] = 0                     # uzun boş aralık
+    v0 = np.array([np.nan, 0.0, 12.5, np.nan])
+    np.testing.assert_allclose(ewma_matrix(X, v0, alpha), scalar_ewma(X, v0, alpha), rtol=1e-9, atol=1e-9)
+
+
+def test_continues_across_calls():
+    rng = np.random.default_rng(0)
+    X = rng.poisson(20, size=(3, 900)).astype(float)
+    v0 = np.full(3, np.nan)
+    whole = ewma_matrix(X, v0, 0.25)
+    a = ewma_matrix(X[:, :400], v0, 0.25)
+    b = ewma_matrix(X[:, 400:], a[:, -1], 0.25)
+    np.testing.assert_allclose(np.hstack([a, b]), whole, rtol=1e-12)
+
+
+def test_empty():
+    assert ewma_matrix(np.zeros((2, 0)), np.zeros(2), 0.25).shape == (2, 0)
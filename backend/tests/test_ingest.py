@@ -0,0 +1,53 @@
+# backend/tests/test_ingest.py
+import os
+
+import pandas as pd
+
+from backend.ingest import CsvTailIngester
+from conftest import HEADER, csv_rows
+
+
+def _full_read(path):
+    """Eski yol: dosyanın tamamını her seferinde pd.read_csv ile oku."""
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+def _polled(ing):
+    df = ing.poll()
+    return df if df is not None else pd.DataFrame()
+
+
+def test_tail_matches_full_read_with_partial_lines(tmp_path):
+    path = tmp_path / "f.csv"
+    data = (HEADER + csv_rows("2025-08-14 10:00", 500)).encode()
+    ing = CsvTailIngester(str(path), block_size=97)      # bloklar satır ortasında biter
+    frames = []
+    # dosya rastgele baytlardan (başlığın ortası dahil) parça parça yazılır
+    for cut in (5, 40, 41, 1000, 1001, 5000, 9999, len(data) - 3, len(data)):
+        with open(path, "ab") as f:
+            f.write(data[os.path.getsize(path) if path.exists() else 0:cut])
+        frames.append(_polled(ing))
+        assert ing.committed_offset == data.rfind(b"\n", 0, cut) + 1
+    got = pd.concat(frames, ignore_index=True)
+    pd.testing.assert_frame_equal(got, _full_read(path))
+    assert ing.poll() is None
+
+
+def test_rotation_and_truncate_restart_from_top(tmp_path):
+    path = tmp_path / "f.csv"
+    path.write_text(HEADER + csv_rows("2025-08-14 10:00", 50))
+    ing = CsvTailIngester(str(path))
+    assert len(ing.poll()) == 50
+
+    # rotation: yeni inode, daha uzun dosya
+    rotated = tmp_path / "new.csv"
+    rotated.write_text(HEADER + csv_rows("2025-08-15 10:00", 80))
+    os.replace(rotated, path)
+    pd.testing.assert_frame_equal(ing.poll(), _full_read(path))
+    assert ing.resets == 1
+
+    # truncate: aynı inode, küçülen dosya
+    with open(path, "w") as f:
+        f.write(HEADER + csv_rows("2025-08-16 10:00", 10))
+    pd.testing.assert_frame_equal(ing.poll(), _full_read(path))
+    assert ing.resets == 2
@@ -0,0 +1,117 @@
+# backend/tests/test_ingest_api.py
+import json
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from conftest import HEADER, csv_rows, reset_state
+
+
+def _now():
+    return pd.Timestamp.now().floor("min")
+
+
+def _rows(start, n, step_s=20):
+    return [dict(zip(HEADER.strip().split(","), ln.split(","))) for ln in csv_rows(start, n, step_s).splitlines()]
+
+
+def _counts(A):
+    return {cp: dict(b) for cp, b in A.store.counts.by_cp.items()}
+
+
+def test_ingest_matches_csv_path(app):
+    """POST ile gelen satırlar, aynı satırların CSV'den okunmasıyla aynı sayaç/EWMA'yı verir."""
+    A = app
+    rows = _rows(_now() - pd.Timedelta(minutes=90), 240)
+    r = TestClient(A.app).post("/api/ingest", json=rows)
+    assert r.status_code == 200 and r.json()["accepted"] == 240 and r.json()["rejected"] == 0
+    via_api = (_counts(A), A.store.total_rows, dict(A.store.destinations), dict(A.committed),
+               {cp: e.v for cp, e in A.ewmas.items()})
+
+    reset_state(A)
+    with open(A.CSV_PATH, "w") as f:
+        f.write(HEADER + "".join(",".join(r.values()) + "\n" for r in rows))
+    A.update_tick()
+    via_csv = (_counts(A), A.store.total_rows, dict(A.store.destinations), dict(A.committed),
+               {cp: e.v for cp, e in A.ewmas.items()})
+    assert via_api == via_csv
+
+
+def test_ingest_rejects_out_of_window_and_late_rows(app):
+    A = app
+    c = TestClient(A.app)
+    now = _now()
+    assert c.post("/api/ingest", json=_rows(now - pd.Timedelta(minutes=30), 60)).status_code == 200
+    done = A.committed["CP1"]
+    version = A.store.version
+
+    fmt = lambda t: f"{t:%Y-%m-%d %H:%M:%S}"
+    bad = [{"CheckDate": "not-a-date", "checkpoint_id": "CP1"},
+           {"CheckDate": fmt(now + pd.Timedelta(minutes=A.INGEST_MAX_AHEAD_MINUTES + 2)), "checkpoint_id": "CP1"},
+           {"CheckDate": fmt(now - pd.Timedelta(minutes=A.INGEST_MAX_AGE_MINUTES + 2)), "checkpoint_id": "CP1"},
+           {"CheckDate": fmt(A.minute_to_dt(done)), "checkpoint_id": "CP1"}]
+    r = c.post("/api/ingest", json=bad)
+    assert r.status_code == 400
+    assert r.json()["detail"]["reasons"] == {"bad_ts": 1, "future": 1, "too_old": 1, "late": 1}
+    assert A.store.version == version                     # hiçbir şey işlenmedi
+
+    # geçerli satırla birlikte: yalnızca o kabul edilir
+    ok = {"CheckDate": fmt(now), "checkpoint_id": "CP1"}
+    r = c.post("/api/ingest", content="\n".join(json.dumps(x) for x in bad + [ok]),
+               headers={"content-type": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert (r.json()["accepted"], r.json()["rejected"]) == (1, 4)
+    assert A.store.counts.by_cp["CP1"][A.dt_to_minute(now)] >= 1
+    # başka bir CP'nin işlenmiş dakikası bu CP için geç sayılmaz
+    r = c.post("/api/ingest", json=[{"CheckDate": fmt(A.minute_to_dt(done)), "checkpoint_id": "CP9"}])
+    assert r.status_code == 200 and r.json()["accepted"] == 1
+
+
+def test_ingest_bad_body(app):
+    c = TestClient(app.app)
+    assert c.post("/api/ingest", content=b"{not json", headers={"content-type": "application/json"}).status_code == 400
+    assert c.post("/api/ingest", json=[{"foo": 1}]).status_code == 400
+    assert c.post("/api/ingest", json=[]).json() == {"accepted": 0, "rejected": 0}
+
+
+def test_commit_window_is_capped(app):
+    A = app
+    with open(A.CSV_PATH, "w") as f:
+        f.write(HEADER + csv_rows("2025-01-01 10:00", 30))
+    A.update_tick()
+    with open(A.CSV_PATH, "a") as f:                      # bir yıl sonrası: tek commit en fazla pencere kadar
+        f.write("99,2026-01-01 10:00:00,CP1,ESB\n")
+    A.update_tick()
+    cutoff = A.dt_to_minute(pd.Timestamp("2026-01-01 10:00"))
+    assert all(m == cutoff - 1 for m in A.committed.values())
+    assert len(A.forecaster.cps) == 3
+
+
+def test_ingest_keeps_checkpoint_when_csv_header_lacks_it(app, tmp_path, monkeypatch):
+    """CSV'de checkpoint_id kolonu yoksa POST'taki CP yine sayılır ve günlüğe yazılır."""
+    from backend.ingestlog import IngestLog
+
+    A = app
+    log_path = tmp_path / "ingested.csv"
+    log_path.write_text("ID,CheckDate,DestinationAirport\n1,2025-08-14 10:00:00,ESB\n")      # eski günlük
+    monkeypatch.setattr(A, "ingest_log", IngestLog(str(log_path), defaults={"checkpoint_id": "CP1"}))
+    now = _now()
+    with open(A.CSV_PATH, "w") as f:
+        f.write("ID,CheckDate,DestinationAirport\n"
+                + "".join(f"{i},{now - pd.Timedelta(minutes=60 - i):%Y-%m-%d %H:%M:%S},ESB\n" for i in range(30)))
+    A.update_tick()
+    assert set(A.store.counts.by_cp) == {"CP1"}
+
+    c = TestClient(A.app)
+    r = c.post("/api/ingest", json=[{"ID": "x", "CheckDate": f"{now:%Y-%m-%d %H:%M:%S}",
+                                     "checkpoint_id": "CP2", "DestinationAirport": "AYT"}])
+    assert r.status_code == 200 and r.json()["accepted"] == 1
+    assert A.store.counts.by_cp["CP2"][A.dt_to_minute(now)] == 1
+    latest = c.get("/api/csv/latest?limit=5").json()
+    assert latest["columns"][:3] == ["ID", "CheckDate", "DestinationAirport"]
+    assert latest["rows"][0]["ID"] == "x"
+
+    A.ingest_log.flush()
+    logged = pd.read_csv(log_path, dtype=str, keep_default_na=False)
+    assert list(logged.columns) == ["ID", "CheckDate", "DestinationAirport", "checkpoint_id"]
+    assert list(logged["checkpoint_id"]) == ["CP1", "CP2"]
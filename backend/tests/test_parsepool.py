@@ -0,0 +1,29 @@
+# backend/tests/test_parsepool.py
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from conftest import HEADER, csv_rows
+
+
+def test_csv_latest_reads_small_tails_inline(app, monkeypatch):
+    A = app
+    with open(A.CSV_PATH, "w") as f:
+        f.write(HEADER + csv_rows("2025-08-14 10:00", 20000, step_s=2))
+    A.update_tick()
+    pooled = []
+    run = A.parser.run
+    monkeypatch.setattr(A.parser, "run", lambda fn, *args: pooled.append(args) or run(fn, *args))
+    c = TestClient(A.app)
+    full = pd.read_csv(A.CSV_PATH, dtype=str, keep_default_na=False)
+
+    small = A.RING_SIZE + 500                               # halka tamponu aşar, birkaç on KB
+    assert small * A._row_bytes() < A.parser.inline_bytes
+    body = c.get(f"/api/csv/latest?limit={small}", headers={"Cache-Control": "no-cache"}).json()
+    assert pooled == []
+    assert [r["ID"] for r in body["rows"]] == full["ID"].tail(small)[::-1].tolist()
+
+    big = 15000
+    assert big * A._row_bytes() >= A.parser.inline_bytes
+    body = c.get(f"/api/csv/latest?limit={big}", headers={"Cache-Control": "no-cache"}).json()
+    assert pooled == [(A.CSV_PATH, big)]
+    assert [r["ID"] for r in body["rows"]] == full["ID"].tail(big)[::-1].tolist()
@@ -0,0 +1,88 @@
+# backend/tests/test_recent.py
+import random
+from collections import deque
+
+import pytest
+
+from backend.recent import LevelWindow, RecentIndex
+
+
+def _dedupe_by_minute(records):
+    """Eski app._dedupe_by_minute: aynı dakika+checkpoint için en son kayıt."""
+    uniq = {}
+    for r in records:
+        uniq[(r["ts_minute"], r["checkpoint_id"])] = r
+    return sorted(uniq.values(), key=lambda r: (r["checkpoint_id"], r["ts_minute"]))
+
+
+def _records(n, seed):
+    rng = random.Random(seed)
+    out, t = [], 0
+    for i in range(n):
+        t += rng.choice([0, 1, 1, 1, 2])
+        m = t - (rng.randrange(5) if rng.random() < 0.1 else 0)      # arada sıra dışı / tekrar dakika
+        out.append({"ts_minute": f"2025-08-14T{m // 60:02d}:{m % 60:02d}:00",
+                    "checkpoint_id": rng.choice(["CP1", "CP2", "CP3"]),
+                    "level": rng.choice(["GREEN", "YELLOW", "RED", "RED"]), "i": i})
+    return out
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_last_matches_deque_and_dedupe(seed):
+    recs = _records(500, seed)
+    old = deque(maxlen=600)              # eski: tek global deque (bu boyutta hiç taşmaz)
+    idx = RecentIndex(per_cp=600)
+    for r in recs:
+        old.append(r)
+        idx.append(r)
+    ref = _dedupe_by_minute(list(old))
+    assert len(idx) == len(ref)
+    for k in (1, 15, 60, 200, len(ref), len(ref) + 10):
+        assert idx.last(k) == ref[-k:]
+    assert idx.last(0) == []
+    assert idx.latest("CP2") == [r for r in ref if r["checkpoint_id"] == "CP2"][-1]
+
+
+def _window_ref(levels, size):
+    """Son `size` seviyenin histogramı, en uzun ve güncel RED serisi (baştan sayım)."""
+    w = levels[-size:]
+    hist = {c: w.count(c) for c in ("GREEN", "YELLOW", "RED")}
+    best = cur = 0
+    for lv in w:
+        cur = cur + 1 if lv == "RED" else 0
+        best = max(best, cur)
+    return hist, best, cur
+
+
+@pytest.mark.parametrize("size", [1, 5, 60])
+def test_level_window_matches_recount(size):
+    rng = random.Random(size)
+    w, seen = LevelWindow(size), []
+    for _ in range(400):
+        lv = rng.choice(["GREEN", "YELLOW", "RED", "RED", "RED"])
+        w.push(lv)
+        seen.append(lv)
+        hist, best, cur = _window_ref(seen, size)
+        assert (w.hist, w.max_red, w.current_red) == (hist, best, cur)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_level_windows_follow_dedupe(seed):
+    """Her cp penceresi, tekilleştirilmiş kayıtlardaki o cp'nin son `window` seviyesi."""
+    recs = _records(400, seed)
+    idx = RecentIndex(per_cp=600, window=60)
+    idx.extend(recs)
+    ref = _dedupe_by_minute(recs)
+    for cp, w in idx.level_stats():
+        levels = [r["level"] for r in ref if r["checkpoint_id"] == cp]
+        hist, best, cur = _window_ref(levels, 60)
+        assert (w.hist, w.max_red, w.current_red) == (hist, best, cur)
+
+
+def test_state_round_trip():
+    idx = RecentIndex(per_cp=50, window=20)
+    idx.extend(_records(300, 7))
+    back = RecentIndex.from_state(idx.to_state())
+    assert back.last(1000) == idx.last(1000)
+    assert [(cp, w.hist, w.max_red, w.current_red) for cp, w in back.level_stats()] == \
+           [(cp, w.hist, w.max_red, w.current_red) for cp, w in idx.level_stats()]
@@ -0,0 +1,108 @@
+# backend/tests/test_snapshot.py
+import pickle
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from backend.snapshot import VERSION, encode_snapshot, load_snapshot, save_snapshot
+from conftest import HEADER, csv_rows, reset_state
+
+ENDPOINTS = ["/api/latest?minutes=3000", "/api/summary?minutes=15", "/api/metrics/last_hours?hours=48",
+             "/api/destinations", "/api/csv/latest?limit=100", "/api/forecast?horizon=30", "/api/color-durations",
+             "/api/warning-durations", "/api/current-rho", "/api/history?limit=200&offset=100"]
+
+
+def _responses(A):
+    c = TestClient(A.app)
+    return {ep: c.get(ep, headers={"Cache-Control": "no-cache"}).json() for ep in ENDPOINTS}
+
+
+def test_encode_round_trip(tmp_path):
+    state = {"a": np.arange(5, dtype=np.int64), "nested": {"x": [1, 2.5, None, "s"], "m": np.eye(2)},
+             "nan": float("nan")}
+    save_snapshot(str(tmp_path / "s.npz"), encode_snapshot(state))
+    back = load_snapshot(str(tmp_path / "s.npz"))
+    assert back["version"] == VERSION
+    np.testing.assert_array_equal(back["a"], state["a"])
+    np.testing.assert_array_equal(back["nested"]["m"], np.eye(2))
+    assert back["nested"]["x"] == [1, 2.5, None, "s"] and np.isnan(back["nan"])
+
+
+def test_rejects_pickle_and_other_versions(tmp_path):
+    p = tmp_path / "s.npz"
+    p.write_bytes(pickle.dumps({"version": VERSION}))
+    assert load_snapshot(str(p)) is None
+    assert load_snapshot(str(tmp_path / "missing.npz")) is None
+    data = encode_snapshot({})
+    save_snapshot(str(p), data.replace(b'"version": %d' % VERSION, b'"version": %d' % (VERSION + 9)))
+    assert load_snapshot(str(p)) is None
+
+
+def test_restore_matches_uninterrupted_run(app, tmp_path):
+    A = app
+    full = HEADER + csv_rows("2025-08-14 06:00", 6000, step_s=9)
+    cut = full.index("\n", len(full) // 2) + 20               # yarım satırda kesilmiş dosya
+
+    with open(A.CSV_PATH, "w") as f:
+        f.write(full)
+    A.officers["CP2"] = 3                                      # görevli sayısı da snapshot'ta
+    A.update_tick()
+    expected = _responses(A)
+
+    # aynı veri: önce yarısı + snapshot, sonra yeni süreçteymiş gibi geri yükle + kalanı
+    reset_state(A)
+    with open(A.CSV_PATH, "w") as f:
+        f.write(full[:cut])
+    A.officers["CP2"] = 3
+    A.update_tick()
+    A.SNAPSHOT_PATH = str(tmp_path / "state.npz")
+    with A.tick_lock:
+        A.save_state()
+    reset_state(A)
+    with open(A.CSV_PATH, "w") as f:
+        f.write(full)
+    assert A.restore_state() is not None
+    A.update_tick()
+    assert _responses(A) == expected
+
+
+
+def test_ingest_log_fsync_outside_ingest_lock(app, tmp_path, monkeypatch):
+    """Günlük yazımı ingest_lock bırakıldıktan sonra; durum değişmediyse snapshot yeniden yazılmaz."""
+    import threading
+
+    from backend import ingestlog
+    from backend.ingestlog import IngestLog
+
+    A = app
+    with open(A.CSV_PATH, "w") as f:
+        f.write(HEADER + csv_rows("2025-08-14 06:00", 300))
+    A.update_tick()
+    monkeypatch.setattr(A, "ingest_log", IngestLog(str(tmp_path / "ingested.csv")))
+    A.ingest_log.append(pd.DataFrame({"ID": ["1"], "CheckDate": ["2025-08-14 07:00:00"]}))
+
+    held = []
+
+    def free():                               # RLock: başka bir thread'den denenmeli
+        ok = A.ingest_lock.acquire(blocking=False)
+        if ok:
+            A.ingest_lock.release()
+        return ok
+
+    def fsync(fd):
+        t = threading.Thread(target=lambda: held.append(not free()))
+        t.start()
+        t.join()
+
+    monkeypatch.setattr(ingestlog.os, "fsync", fsync)
+    A.SNAPSHOT_PATH = str(tmp_path / "state.npz")
+    with A.tick_lock:
+        A.save_state()
+    assert held and not any(held)                          # günlük + snapshot fsync'i
+    assert load_snapshot(A.SNAPSHOT_PATH)["ingest_log"]["offset"] == (tmp_path / "ingested.csv").stat().st_size
+
+    mtime = (tmp_path / "state.npz").stat().st_mtime_ns
+    with A.tick_lock:
+        A.save_state()
+    assert (tmp_path / "state.npz").stat().st_mtime_ns == mtime
@@ -0,0 +1,82 @@
+# backend/tests/test_staffing.py
+import itertools
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import GREEN, MU_PER_OFFICER, YELLOW, officers_needed, plan_allocation
+from conftest import HEADER, csv_rows
+
+
+def _rho(peak, alloc):
+    return peak / (np.asarray(alloc) * MU_PER_OFFICER)
+
+
+def _brute(peak, budget):
+    """Tüm dağılımlar (CP başına ≥1, toplam ≤ bütçe) içinde planın hedefleri."""
+    best_green, best_yellow_greens, best_max = None, -1, np.inf
+    for alloc in itertools.product(range(1, budget + 1), repeat=len(peak)):
+        if sum(alloc) > budget:
+            continue
+        rho = _rho(peak, alloc)
+        if (rho < GREEN).all():
+            best_green = min(best_green or np.inf, sum(alloc))
+        if (rho < YELLOW).all():
+            best_yellow_greens = max(best_yellow_greens, int((rho < GREEN).sum()))
+        best_max = min(best_max, rho.max())
+    return best_green, best_yellow_greens, best_max
+
+
+def test_officers_needed_is_smallest_k():
+    lam = np.linspace(0, 40, 401)
+    for thr in (GREEN, YELLOW):
+        k = officers_needed(lam, thr)
+        assert (lam / (k * MU_PER_OFFICER) < thr).all()
+        assert ((k == 1) | (lam >= thr * (k - 1) * MU_PER_OFFICER)).all()      # k-1 yetmez
+
+
+def test_no_budget_is_minimal_green():
+    peak = np.array([0.0, 1.9, 2.1, 30.0])
+    alloc, target = plan_allocation(peak)
+    assert target == "GREEN"
+    np.testing.assert_array_equal(alloc, officers_needed(peak, GREEN))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_matches_exhaustive_search(seed):
+    rng = np.random.default_rng(seed)
+    peak = np.round(rng.uniform(0.5, 12, size=3), 2)
+    budget = int(rng.integers(3, 14))
+    green, yellow_greens, best_max = _brute(peak, budget)
+    alloc, target = plan_allocation(peak, budget)
+    rho = _rho(peak, alloc)
+    assert alloc.min() >= 1 and alloc.sum() <= budget
+    if green is not None:
+        assert target == "GREEN" and alloc.sum() == green and (rho < GREEN).all()
+    elif yellow_greens >= 0:
+        assert target == "YELLOW" and (rho < YELLOW).all()
+        assert int((rho < GREEN).sum()) == yellow_greens
+    else:
+        assert target == "BEST_EFFORT"
+        assert rho.max() == pytest.approx(best_max)
+
+
+def test_budget_below_checkpoint_count_is_rejected():
+    with pytest.raises(ValueError):
+        plan_allocation(np.array([5.0, 9.0, 1.0]), budget=2)
+    alloc, _ = plan_allocation(np.array([5.0, 9.0, 1.0]), budget=3)       # tam CP sayısı: herkese 1
+    np.testing.assert_array_equal(alloc, [1, 1, 1])
+
+
+def test_endpoint_never_exceeds_budget(app):
+    A = app
+    with open(A.CSV_PATH, "w") as f:
+        f.write(HEADER + csv_rows("2025-08-14 10:00", 2000, step_s=2))
+    A.update_tick()
+    c = TestClient(A.app)
+    assert c.get("/api/staffing/plan?budget=2").status_code == 400
+    for budget in (3, 4, 7, 50):
+        body = c.get(f"/api/staffing/plan?budget={budget}").json()
+        assert body["total_officers"] <= budget
+        assert sum(cp["recommended"] for cp in body["checkpoints"]) == body["total_officers"]
@@ -0,0 +1,22 @@
+# backend/tests/test_store.py
+import pandas as pd
+
+from backend.ingest import MinuteCounts, count_minutes
+from conftest import HEADER, csv_rows
+
+
+def test_minute_counts_match_groupby(tmp_path):
+    """Dakika sayaçları, eski build_counts'un tam okuma + groupby sonucuyla aynı."""
+    path = tmp_path / "f.csv"
+    path.write_text(HEADER + csv_rows("2025-08-14 10:00", 3000, step_s=3) + "x,not-a-date,CP1,ESB\n")
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    mc = MinuteCounts()
+    mc.add(count_minutes(df))
+    ts = pd.to_datetime(df["CheckDate"], errors="coerce")
+    ref = df.assign(m=ts.dt.floor("min")).dropna(subset=["m"]).groupby(["checkpoint_id", "m"]).size()
+    got = {(cp, pd.Timestamp(m * 60, unit="s")): n for cp, b in mc.by_cp.items() for m, n in b.items()}
+    assert got == ref.to_dict()
+    assert mc.first_minute == {cp: min(b) for cp, b in mc.by_cp.items()}
+    assert mc.last_minute == {cp: max(b) for cp, b in mc.by_cp.items()}
+    back = MinuteCounts.from_state(mc.to_state())
+    assert (dict(back.by_cp), back.first_minute, back.last_minute) == (dict(mc.by_cp), mc.first_minute, mc.last_minute)
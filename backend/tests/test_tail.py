@@ -0,0 +1,35 @@
+# backend/tests/test_tail.py
+import pandas as pd
+import pytest
+
+from backend.ingest import read_tail
+from conftest import HEADER, csv_rows
+
+
+def _full_read(path):
+    """Eski /api/csv/latest yolu: tüm dosyayı pd.read_csv ile oku."""
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+@pytest.mark.parametrize("n", [0, 1, 7, 50, 499, 500, 1000])
+@pytest.mark.parametrize("block_size", [16, 333, 64 * 1024])
+def test_read_tail_matches_read_csv_tail(tmp_path, n, block_size):
+    path = tmp_path / "f.csv"
+    body = csv_rows("2025-08-14 10:00", 500).replace(",ESB\n", ',"ESB, Ankara"\n')   # tırnaklı virgül
+    path.write_text(HEADER + body + "500,2025-08-14 11:")                              # yarım son satır
+    cols, rows = read_tail(str(path), n, block_size=block_size)
+    ref = _full_read(path).iloc[:500].tail(n) if n else _full_read(path).iloc[:0]
+    assert cols == list(ref.columns)
+    assert rows == ref.values.tolist()
+
+
+def test_read_tail_end_and_edge_cases(tmp_path):
+    path = tmp_path / "f.csv"
+    path.write_text("")
+    assert read_tail(str(path), 5) == ([], [])
+    path.write_text(HEADER)
+    assert read_tail(str(path), 5) == (["ID", "CheckDate", "checkpoint_id", "DestinationAirport"], [])
+    path.write_text(HEADER + csv_rows("2025-08-14 10:00", 100))
+    end = len((HEADER + csv_rows("2025-08-14 10:00", 60)).encode())
+    _, rows = read_tail(str(path), 5, block_size=64, end=end)
+    assert rows == _full_read(path).iloc[55:60].values.tolist()
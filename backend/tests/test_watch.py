@@ -0,0 +1,61 @@
+# backend/tests/test_watch.py
+import threading, time
+
+import pytest
+
+from backend import watch
+from backend.watch import FileWatcher
+
+
+def _first_change(w: FileWatcher, path, timeout: float = 3.0) -> float:
+    """Dosyaya ekleme yapıldıktan sonra ilk True olayına kadar geçen süre."""
+    def append():
+        with open(path, "a") as f:
+            f.write("x\n")
+
+    events = w.events()
+    threading.Timer(0.3, append).start()
+    t0 = time.monotonic()
+    for changed in events:
+        if changed:
+            return time.monotonic() - t0 - 0.3
+        if time.monotonic() - t0 > timeout:
+            break
+    pytest.fail("yazma görülmedi")
+
+
+@pytest.mark.skipif(watch.watchfiles is None, reason="watchfiles yok")
+def test_notify_sees_appends(tmp_path):
+    path = tmp_path / "f.csv"
+    path.write_text("a\n")
+    w = FileWatcher(str(path), idle=0.2, mode="inotify")
+    assert _first_change(w, path) < 1.0
+    assert w.backend == "inotify"
+
+
+def test_appends_seen_without_any_notify_events(tmp_path, monkeypatch):
+    """Bind mount'ta inotify olayı gelmeyebilir: stat karşılaştırması yine de yakalar."""
+    def silent_watch(*paths, rust_timeout, **kw):
+        while True:
+            time.sleep(rust_timeout / 1000)
+            yield set()
+
+    class FakeWatchfiles:
+        watch = staticmethod(silent_watch)
+
+    monkeypatch.setattr(watch, "watchfiles", FakeWatchfiles)
+    path = tmp_path / "f.csv"
+    path.write_text("a\n")
+    w = FileWatcher(str(path), idle=0.2, poll_interval=0.1, mode="auto")
+    assert _first_change(w, path) < 0.5
+    assert w.backend == "inotify"                     # yoklamaya düşmeden
+
+
+def test_idle_ticks(tmp_path):
+    path = tmp_path / "f.csv"
+    path.write_text("a\n")
+    w = FileWatcher(str(path), idle=0.2, poll_interval=0.05, mode="poll")
+    t0 = time.monotonic()
+    assert next(w.events()) is False
+    assert time.monotonic() - t0 < 1.0
+    assert FileWatcher(str(path)).idle <= 1.0        # eski yoklama aralığından uzun değil
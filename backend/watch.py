@@ -0,0 +1,90 @@
+# backend/watch.py
+import logging, os, time
+from typing import Iterator, Optional
+
+try:  # opsiyonel: Linux'ta inotify (uvicorn[standard] ile gelir); yoksa stat yoklaması
+    import watchfiles
+except ImportError:  # pragma: no cover
+    watchfiles = None
+
+log = logging.getLogger("paxflow")
+
+
+class FileWatcher:
+    """
+    Tek bir dosyayı izler; `events()` dosyaya yazıldığında True, `idle`
+    saniye boyunca değişiklik yoksa False üretir. Ard arda gelen yazmalar
+    (ilk olaydan sonra `debounce_ms` içinde) tek uyanmada birleştirilir.
+    Hem dosyanın kendisi hem dizini izlenir: dizin yeniden oluşturma /
+    rename'i, dosya ise başka bir mount üzerinden (docker'da tek dosya
+    bind mount'u) yapılan eklemeleri yakalar. Olay hiç gelmese de her
+    `poll_interval`'da bir stat karşılaştırılır, yani gecikme en kötü
+    ihtimalle yoklamanınki kadardır. inotify kullanılamazsa (watchfiles
+    yok, limit dolu, dizin yok) yalnızca stat yoklamasına düşer.
+    """
+
+    def __init__(self, path: str, debounce_ms: int = 20, idle: float = 1.0,
+                 poll_interval: float = 0.25, mode: str = "auto"):
+        self.path = os.path.abspath(path)
+        self.debounce_ms, self.idle, self.poll_interval = debounce_ms, idle, poll_interval
+        self.mode = mode                 # auto | inotify | poll
+        self.backend: Optional[str] = None
+
+    def events(self) -> Iterator[bool]:
+        if self.mode != "poll" and watchfiles is not None:
+            try:
+                yield from self._notify()
+                return
+            except Exception:
+                if self.mode == "inotify":
+                    raise
+                log.exception("dosya izleyici başlatılamadı, yoklamaya geçiliyor")
+        yield from self._poll()
+
+    def _notify(self) -> Iterator[bool]:
+        name = os.path.basename(self.path)
+        self.backend = "inotify"
+        paths = [os.path.dirname(self.path)] + ([self.path] if os.path.exists(self.path) else [])
+        last, quiet = self._stamp(), time.monotonic()
+        # zaman aşımı = poll_interval: olay gelmeyen yazmalar da stat ile görülür
+        for changes in watchfiles.watch(
+                *paths, watch_filter=lambda _c, p: os.path.basename(p) == name,
+                debounce=max(1, self.debounce_ms), step=max(1, self.debounce_ms // 4),
+                rust_timeout=max(1, int(self.poll_interval * 1000)), yield_on_timeout=True,
+                raise_interrupt=False, recursive=False):
+            cur = self._stamp()
+            if changes or cur != last:
+                last, quiet = cur, time.monotonic()
+                yield True
+            elif time.monotonic() - quiet >= self.idle:
+                quiet = time.monotonic()
+                yield False
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_ino, st.st_size, st.st_mtime_ns
+        except OSError:
+            return None
+
+    def _poll(self) -> Iterator[bool]:
+        self.backend = "poll"
+        last, quiet = self._stamp(), time.monotonic()
+        while True:
+            time.sleep(self.poll_interval)
+            cur = self._stamp()
+            if cur == last:
+                if time.monotonic() - quiet >= self.idle:
+                    quiet = time.monotonic()
+                    yield False
+                continue
+            # yazma sürüyorsa debounce süresince durulmasını bekle
+            deadline = time.monotonic() + self.debounce_ms / 1000
+            while time.monotonic() < deadline:
+                time.sleep(self.debounce_ms / 4000)
+                nxt = self._stamp()
+                if nxt == cur:
+                    break
+                cur = nxt
+            last, quiet = cur, time.monotonic()
+            yield True
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tekrarlanabilir benchmark: 10k / 1M / 10M satırlık flight_data.csv üretir,
+her boyut için ayrı bir süreçte backend'i yükleyip şunları ölçer:
+
+  - build_counts() (tüm CSV'den dakikalık sayım)
+  - ilk ingest (soğuk başlangıç) ve updater tick gecikmesi (yeni satır ekle -> update_tick)
+  - uç noktalar (FastAPI TestClient): /api/csv/latest, /api/metrics/last_minutes,
+    /api/metrics/last_hours, /api/destinations, /api/summary; yanıt önbelleği
+    ayrı ölçülür: "miss" (Cache-Control: no-cache ile her istekte yeniden
+    hesaplanır) ve "hit" (değişmemiş veri, hazır bayt)
+
+Sonuç JSON dosyasına yazılır (commit hash'iyle); --compare ile önceki bir
+sonuçla oran tablosu basılır.
+
+  python scripts/benchmark.py --sizes 10k,1M --repeat 30
+  python scripts/benchmark.py --compare data/bench/<eski>.json
+"""
+
+import argparse, csv, importlib.util, json, os, platform, shutil, statistics, subprocess, sys, tempfile, time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+BENCH_DIR = ROOT / "data" / "bench"
+
+ENDPOINTS = [
+    "/api/csv/latest?limit=50",
+    "/api/csv/latest?limit=5000",          # halka tamponu aşar -> sondan okuma
+    "/api/metrics/last_minutes?minutes=60",
+    "/api/metrics/last_hours?hours=24",
+    "/api/destinations",
+    "/api/summary?minutes=15",
+]
+
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(s[-1], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def stats(samples) -> dict:
+    xs = sorted(samples)
+    return {
+        "n": len(xs),
+        "min_ms": round(xs[0] * 1e3, 3),
+        "median_ms": round(statistics.median(xs) * 1e3, 3),
+        "p95_ms": round(xs[min(len(xs) - 1, int(len(xs) * 0.95))] * 1e3, 3),
+        "max_ms": round(xs[-1] * 1e3, 3),
+    }
+
+
+def _generator():
+    spec = importlib.util.spec_from_file_location("dummyGenerator", ROOT / "scripts" / "dummyGenerator.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def make_csv(path: Path, rows: int, days: float, checkpoints: int, seed: int):
+    """Son `days` güne yayılmış, tohumlu `rows` satırlık CSV (varsa yeniden üretilmez)."""
+    meta = path.with_suffix(".json")
+    want = {"rows": rows, "days": days, "checkpoints": checkpoints, "seed": seed}
+    if path.exists() and meta.exists() and json.loads(meta.read_text()) == want:
+        return
+    dg = _generator()
+    rng = np.random.default_rng(seed)
+    end = float(int(dg.local_now()))
+    ts = np.sort(rng.uniform(end - days * 86400, end, rows))
+    cols = dg.COLUMNS + (["checkpoint_id"] if checkpoints else [])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerow(cols)
+        for i in range(0, rows, 1_000_000):
+            dg.synth_frame(rng, ts[i:i + 1_000_000], checkpoints)[cols].to_csv(f, header=False, index=False)
+    meta.write_text(json.dumps(want))
+
+
+# ------------------------------------------------------------------
+# alt süreç: tek boyut için ölçüm (CSV_PATH import'ta okunduğu için ayrı süreç)
+# ------------------------------------------------------------------
+
+def run_one(csv_path: str, repeat: int, tick_rows: int) -> dict:
+    import backend.app as A
+    from fastapi.testclient import TestClient
+
+    out = {"csv_bytes": os.path.getsize(csv_path)}
+
+    # build_counts büyük dosyada pahalı: en fazla 3 kez
+    times = []
+    for _ in range(min(repeat, 3)):
+        t = time.perf_counter()
+        A.build_counts()
+        times.append(time.perf_counter() - t)
+    out["build_counts"] = stats(times)
+
+    t = time.perf_counter()
+    n = A.update_tick()
+    out["cold_ingest"] = {"rows": n, "seconds": round(time.perf_counter() - t, 3)}
+
+    dg = _generator()
+    rng = np.random.default_rng(0)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f))
+    times = []
+    for _ in range(repeat):
+        now = dg.local_now()
+        df = dg.synth_frame(rng, np.sort(rng.uniform(now - 1, now, tick_rows)), 3 if "checkpoint_id" in header else 0)
+        with open(csv_path, "a", newline="", encoding="utf-8") as f:
+            df.reindex(columns=header, fill_value="").to_csv(f, header=False, index=False)
+        t = time.perf_counter()
+        A.update_tick()
+        times.append(time.perf_counter() - t)
+    out["tick"] = dict(stats(times), rows_per_tick=tick_rows)
+
+    client = TestClient(A.app)
+    out["endpoints"] = {}
+    for ep in ENDPOINTS:
+        client.get(ep)                            # ısınma
+        res = {}
+        for kind, headers in (("miss", {"Cache-Control": "no-cache"}), ("hit", {})):
+            times = []
+            for _ in range(repeat):
+                t = time.perf_counter()
+                r = client.get(ep, headers=headers)
+                times.append(time.perf_counter() - t)
+            res[kind] = stats(times)
+        out["endpoints"][ep] = dict(res, status=r.status_code, bytes=len(r.content))
+    return out
+
+
+def bench_size(csv_path: Path, repeat: int, tick_rows: int) -> dict:
+    # kopya üzerinde çalış: tick ölçümü dosyaya satır ekliyor
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp) / "flight_data.csv"
+        shutil.copyfile(csv_path, work)
+        # snapshot / ingest günlüğü kapalı: her koşu CSV'den soğuk başlar, diske durum bırakmaz
+        env = dict(os.environ, CSV_PATH=str(work), PAXFLOW_AUTOSTART="0", STATE_SOCKET="",
+                   SNAPSHOT_PATH="", INGEST_LOG="",
+                   STORE_BACKEND="csv", MINUTE_ARCHIVE=str(Path(tmp) / "minutes"),
+                   PYTHONPATH=str(ROOT) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+        proc = subprocess.run([sys.executable, __file__, "--_child", str(work),
+                               "--repeat", str(repeat), "--tick-rows", str(tick_rows)],
+                              env=env, cwd=str(ROOT), capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr[-2000:])
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT), text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path: Path, new: dict):
+    old = json.loads(old_path.read_text())
+    print(f"\n{old['commit']} -> {new['commit']} (median, yeni/eski)")
+    for size, res in new["results"].items():
+        prev = old["results"].get(size)
+        if not prev:
+            continue
+        pairs = [("build_counts", res["build_counts"], prev["build_counts"]),
+                 ("tick", res["tick"], prev["tick"])]
+        for ep, cur in res["endpoints"].items():
+            old_ep = prev["endpoints"].get(ep) or {}
+            for kind in ("miss", "hit"):
+                # önbellekten önceki sonuçlarda tek ölçüm var: her istek yeniden hesaplanıyordu (= miss)
+                b = old_ep.get(kind, old_ep if kind == "miss" and "median_ms" in old_ep else None)
+                pairs.append((f"{ep} [{kind}]", cur[kind], b))
+        for name, a, b in pairs:
+            if b and b["median_ms"] > 0:
+                print(f"  {size:>8} {name:<42} {b['median_ms']:>10.3f} -> {a['median_ms']:>10.3f} ms  x{a['median_ms'] / b['median_ms']:.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="PaxFlow ingest/uç nokta benchmark'ı")
+    ap.add_argument("--sizes", default="10k,1M,10M", help="virgülle satır sayıları (k/M son ekleri)")
+    ap.add_argument("--days", type=float, default=3, help="verinin yayıldığı gün sayısı")
+    ap.add_argument("--checkpoints", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=20, help="ölçüm tekrarı (uç nokta / tick)")
+    ap.add_argument("--tick-rows", type=int, default=100, help="tick başına eklenen satır")
+    ap.add_argument("--data-dir", type=Path, default=BENCH_DIR / "csv", help="üretilen CSV'lerin önbelleği")
+    ap.add_argument("--out", type=Path, default=None, help="sonuç JSON (varsayılan data/bench/<commit>.json)")
+    ap.add_argument("--compare", type=Path, default=None, help="önceki sonuç JSON'u ile karşılaştır")
+    ap.add_argument("--_child", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._child:
+        print(json.dumps(run_one(args._child, args.repeat, args.tick_rows)))
+        return
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {"days": args.days, "checkpoints": args.checkpoints, "seed": args.seed,
+                   "repeat": args.repeat, "tick_rows": args.tick_rows},
+        "results": {},
+    }
+    for label in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+        rows = parse_size(label)
+        path = args.data_dir / f"flight_data_{label}.csv"
+        t = time.perf_counter()
+        make_csv(path, rows, args.days, args.checkpoints, args.seed)
+        print(f"[{label}] CSV hazır ({time.perf_counter() - t:.1f} sn), ölçülüyor...", flush=True)
+        res = result["results"][label] = bench_size(path, args.repeat, args.tick_rows)
+        print(f"[{label}] build_counts {res['build_counts']['median_ms']} ms, "
+              f"soğuk ingest {res['cold_ingest']['seconds']} sn, tick {res['tick']['median_ms']} ms", flush=True)
+        for ep, st in res["endpoints"].items():
+            print(f"    {ep:<42} miss median {st['miss']['median_ms']:>9.3f} ms  p95 {st['miss']['p95_ms']:>9.3f} ms"
+                  f"  | hit median {st['hit']['median_ms']:>7.3f} ms")
+
+    out = args.out or BENCH_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2, ensure_ascii=False))
+    print(f"\nSonuç -> {out}")
+    if args.compare:
+        compare(args.compare, result)
+
+
+if __name__ == "__main__":
+    main()
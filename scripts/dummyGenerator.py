@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import random, time, string, shutil, os, re, unicodedata
+import argparse, bisect, csv, json, random, threading, time, string, shutil, os, re, sys, unicodedata
 from datetime import datetime
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # =================== Proje yolları ===================
@@ -11,6 +12,7 @@ ROOT = Path(__file__).resolve().parents[1]   # scripts/.. = proje kökü
 DATA = ROOT / "data"
 XLSX = DATA / "flight_data.xlsx"
 CSV  = DATA / "flight_data.csv"
+FLIGHTS = DATA / "flights_snapshot.json"   # uçuş tarifesi anlık görüntüsü
 
 # =================== Yardımcılar ===================
 COLUMNS = ["ID","Name","PNR","OriginAirport","DestinationAirport","IATA",
@@ -34,30 +36,101 @@ def is_valid_xlsx(path: Path) -> bool:
     except FileNotFoundError:
         return False
 
-def ensure_files():
-    DATA.mkdir(parents=True, exist_ok=True)
-    if not CSV.exists():
-        pd.DataFrame(columns=COLUMNS).to_csv(CSV, index=False)
-    if not is_valid_xlsx(XLSX):
-        if XLSX.exists():
-            backup = XLSX.with_suffix(f".xlsx.corrupt-{int(time.time())}")
-            shutil.move(str(XLSX), str(backup))
-            print(f"Uyarı: Bozuk XLSX yedeklendi -> {backup.name}")
-        pd.DataFrame(columns=COLUMNS).to_excel(XLSX, index=False)
-
-def safe_read_xlsx() -> pd.DataFrame:
-    try:
-        return pd.read_excel(XLSX, engine="openpyxl")
-    except Exception as e:
-        print("Uyarı:", e, "-> Excel sıfırlanıyor.")
-        pd.DataFrame(columns=COLUMNS).to_excel(XLSX, index=False)
-        return pd.DataFrame(columns=COLUMNS)
+def ensure_csv(path: Path, columns=COLUMNS):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists() or path.stat().st_size == 0:
+        pd.DataFrame(columns=columns).to_csv(path, index=False)
 
 def atomic_write_xlsx(df: pd.DataFrame, target: Path):
     tmp = target.with_suffix(".tmp.xlsx")
     df.to_excel(tmp, index=False)
     tmp.replace(target)  # atomik replace
 
+def export_xlsx(csv_path: Path, xlsx_path: Path):
+    """CSV'nin o anki halinin XLSX anlık görüntüsü (üretim döngüsünden bağımsız)."""
+    if xlsx_path.exists() and not is_valid_xlsx(xlsx_path):
+        backup = xlsx_path.with_suffix(f".xlsx.corrupt-{int(time.time())}")
+        shutil.move(str(xlsx_path), str(backup))
+        print(f"Uyarı: Bozuk XLSX yedeklendi -> {backup.name}")
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    atomic_write_xlsx(df, xlsx_path)
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] XLSX anlık görüntüsü → {xlsx_path} ({len(df)} satır)")
+
+class RowSink:
+    """
+    Üretilen satırları tamponlar, `flush_interval` saniyede bir CSV'ye
+    (ve istenirse kolon deposuna) toplu ekler. Satır başı maliyet sabittir;
+    mevcut dosya hiç yeniden okunmaz/yazılmaz.
+    """
+
+    def __init__(self, csv_path: Path, flush_interval: float = 1.0, columnar_dir: str = "",
+                 columnar_format: str = "parquet", columns=COLUMNS):
+        ensure_csv(csv_path, columns)
+        with csv_path.open(newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), None) or columns   # mevcut kolon sırasına uy
+        missing = [c for c in columns if c not in header]
+        if missing:
+            print(f"Uyarı: {csv_path.name} başlığında {missing} yok, bu kolonlar yazılmayacak.")
+        self.header = header
+        self.fh = csv_path.open("a", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.fh, fieldnames=header, extrasaction="ignore", restval="")
+        self.flush_interval = flush_interval
+        self.buf = []
+        self.last_flush = time.monotonic()
+        self.columnar = None
+        if columnar_dir:
+            sys.path.insert(0, str(ROOT))
+            from backend.columnar import ColumnarStore
+            self.columnar = ColumnarStore(columnar_dir, columnar_format, flush_interval=0)
+
+    def add(self, row: dict):
+        self.buf.append(row)
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def sleep(self, seconds: float):
+        """
+        Üretici döngüsünün beklemesi: tampondaki satırlar bekleme bitmeden,
+        `flush_interval` dolduğu anda yazılır (uyku aralığından bağımsız).
+        """
+        end = time.monotonic() + seconds
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                return
+            due = self.last_flush + self.flush_interval if self.buf else end
+            time.sleep(max(0.0, min(end, due) - now))
+            self.maybe_flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if not self.buf:
+            return
+        self.writer.writerows(self.buf)
+        self.fh.flush()
+        if self.columnar is not None:
+            self.columnar.append(pd.DataFrame(self.buf))
+            self.columnar.flush()
+        self.buf = []
+
+    def add_frame(self, df: pd.DataFrame):
+        """Yük modunun toplu satırları: tek to_csv çağrısıyla eklenir."""
+        self.flush()
+        if df.empty:
+            return
+        df.reindex(columns=self.header, fill_value="").to_csv(self.fh, header=False, index=False)
+        self.fh.flush()
+        if self.columnar is not None:
+            self.columnar.append(df)
+            self.columnar.flush()
+
+    def close(self):
+        self.flush()
+        self.fh.close()
+
 # =================== YOĞUNLUK (AYNEN SENİN KODUN) ===================
 def get_probability_by_hour(hour: int) -> float:
     if 8 <= hour < 12:    # 08:00 - 12:00 ~%90
@@ -76,7 +149,8 @@ def get_probability_by_hour(hour: int) -> float:
         return 0.10
 
 # =================== (Opsiyonel) Uçuşlardan doldurma ===================
-# Playwright varsa bugünkü uçuşlardan aktif bir hedef seçer; yoksa fallback listeler kullanılır.
+# Tarife yerel bir JSON anlık görüntüsünden okunur; Playwright varsa arka planda
+# TTL dolunca yenilenir. Tarife boşsa fallback listeler kullanılır.
 def _norm(s:str)->str:
     s = unicodedata.normalize("NFD", s)
     s = "".join(ch for ch in s if unicodedata.category(ch) != "Mn")
@@ -98,109 +172,360 @@ IATA_MAP = {
 }
 KNOWN_IATA = sorted(set(IATA_MAP.values()))
 
-def pull_active_flight():
-    """Bugünkü gelecekteki uçuşlardan rastgele birini döndür (iata, number, dest_iata). Hata olursa None."""
-    try:
-        from playwright.sync_api import sync_playwright
-        import re as _re
-        DATE_RE  = _re.compile(r"^\d{2}/\d{2}/\d{4}$")
-        TIME_RE  = _re.compile(r"^\d{2}:\d{2}$")
-        FLIGHT_RE= _re.compile(r"^([A-Z0-9]+?)(\d+)$")
-        URL = "https://www.dalamanairport.aero/tr/u%C3%A7u%C5%9Flar"
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page(locale="tr-TR")
-            page.goto(URL, wait_until="domcontentloaded")
-            try: page.wait_for_load_state("networkidle", timeout=12000)
-            except: pass
-            text = page.evaluate("document.body.innerText")
-            browser.close()
-
-        lines = [re.sub(r"\s+"," ",ln).strip() for ln in text.splitlines() if ln.strip()]
-        idxs = [i for i,ln in enumerate(lines) if DATE_RE.fullmatch(ln)]
-        today = datetime.now().strftime("%d/%m/%Y")
-        now = datetime.now()
-        cand = []
-        for k in range(len(idxs)):
-            s = idxs[k]; e = idxs[k+1] if k+1 < len(idxs) else len(lines)
-            g = lines[s:e]
-            if len(g)>=4 and g[0]==today and TIME_RE.fullmatch(g[3]):
-                # gelecekteki uçuş
-                hh, mm = map(int, g[3].split(":"))
-                sched = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
-                if (sched - now).total_seconds()/60.0 < 0:  # geçmişse atla
-                    continue
-                m = FLIGHT_RE.match(g[1])
-                if not m: continue
-                iata = m.group(1)
-                number = m.group(2)
-                dest = IATA_MAP.get(_norm(g[2])) or random.choice(KNOWN_IATA)
-                # yakın olana daha fazla ağırlık
-                weight = 1.0/(1.0 + (sched-now).total_seconds()/60.0)
-                cand.append((weight, iata, number, dest))
+def scrape_flights() -> list:
+    """Havalimanı sitesindeki dış hat/iç hat kalkışlarını oku (Playwright gerekir)."""
+    from playwright.sync_api import sync_playwright
+    DATE_RE  = re.compile(r"^\d{2}/\d{2}/\d{4}$")
+    TIME_RE  = re.compile(r"^\d{2}:\d{2}$")
+    FLIGHT_RE= re.compile(r"^([A-Z0-9]+?)(\d+)$")
+    URL = "https://www.dalamanairport.aero/tr/u%C3%A7u%C5%9Flar"
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page(locale="tr-TR")
+        page.goto(URL, wait_until="domcontentloaded")
+        try: page.wait_for_load_state("networkidle", timeout=12000)
+        except: pass
+        text = page.evaluate("document.body.innerText")
+        browser.close()
+
+    lines = [re.sub(r"\s+"," ",ln).strip() for ln in text.splitlines() if ln.strip()]
+    idxs = [i for i,ln in enumerate(lines) if DATE_RE.fullmatch(ln)]
+    flights = []
+    for k in range(len(idxs)):
+        s = idxs[k]; e = idxs[k+1] if k+1 < len(idxs) else len(lines)
+        g = lines[s:e]
+        if len(g)>=4 and TIME_RE.fullmatch(g[3]):
+            m = FLIGHT_RE.match(g[1])
+            if not m: continue
+            flights.append({"date": datetime.strptime(g[0], "%d/%m/%Y").strftime("%Y-%m-%d"), "time": g[3],
+                            "iata": m.group(1), "number": m.group(2),
+                            "dest": IATA_MAP.get(_norm(g[2])) or random.choice(KNOWN_IATA)})
+    return flights
+
+class FlightSchedule:
+    """
+    Uçuş tarifesi: JSON anlık görüntüsünden yüklenir, günün dakikasına göre
+    sıralı tutulur. pick() sıradaki uçuşlara yakınlıkla azalan ağırlıkla
+    (1 / (1 + kalan dk)) bellekten seçer; kümülatif ağırlıklar dakikada bir
+    hesaplanır. Tarife günlük tekrar eder varsayılır, böylece eski bir
+    görüntüyle (ağ yokken) de çalışır.
+    """
+
+    HORIZON = 6 * 60      # yalnızca önümüzdeki 6 saatin uçuşları aday
+
+    def __init__(self, path: Path, ttl: float = 900, scrape: bool = True):
+        self.path, self.ttl, self.scrape = path, ttl, scrape
+        self.minutes, self.items = [], []
+        self._cache = (None, [], [])             # (dakika, adaylar, kümülatif ağırlık)
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with self.path.open(encoding="utf-8") as f:
+                flights = json.load(f).get("flights", [])
+        except (FileNotFoundError, ValueError):
+            flights = []
+        seen, rows = set(), []
+        for fl in flights:
+            hh, mm = map(int, fl["time"].split(":"))
+            key = (hh * 60 + mm, fl["iata"], fl["number"], fl["dest"])
+            if key not in seen:                  # aynı uçuşun farklı günleri tek kayıt
+                seen.add(key)
+                rows.append(key)
+        rows.sort()
+        with self._lock:
+            self.minutes = [r[0] for r in rows]
+            self.items = [r[1:] for r in rows]
+            self._cache = (None, [], [])
+
+    def save(self, flights: list):
+        tmp = self.path.with_suffix(".tmp.json")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"fetched_at": datetime.now().isoformat(timespec="seconds"), "flights": flights},
+                      f, ensure_ascii=False)
+        tmp.replace(self.path)
+
+    def stale(self) -> bool:
+        try:
+            return time.time() - self.path.stat().st_mtime >= self.ttl
+        except FileNotFoundError:
+            return True
+
+    def refresh_loop(self):
+        """Arka plan thread'i: görüntü TTL'i aşınca siteden yenile."""
+        while True:
+            if self.stale():
+                try:
+                    flights = scrape_flights()
+                    if flights:
+                        self.save(flights)
+                        self.load()
+                        print(f"[{datetime.now().strftime('%H:%M:%S')}] Uçuş tarifesi yenilendi ({len(flights)} uçuş)")
+                except Exception as e:
+                    print("Uyarı: tarife yenilenemedi:", e)
+            time.sleep(max(self.ttl / 4, 30))
+
+    def start(self):
+        if self.scrape:
+            threading.Thread(target=self.refresh_loop, daemon=True).start()
+        return self
+
+    def _candidates(self, now_min: int):
+        with self._lock:
+            if self._cache[0] == now_min:
+                return self._cache[1], self._cache[2]
+            n = len(self.minutes)
+            i = bisect.bisect_left(self.minutes, now_min)
+            cand, cum, acc = [], [], 0.0
+            for k in range(n):                   # gece yarısını sararak ileri yürü
+                j = (i + k) % n
+                delta = (self.minutes[j] - now_min) % 1440
+                if delta > self.HORIZON:
+                    break
+                acc += 1.0 / (1.0 + delta)
+                cand.append(self.items[j])
+                cum.append(acc)
+            self._cache = (now_min, cand, cum)
+            return cand, cum
+
+    def pick(self, when: datetime = None):
+        """(iata, number, dest) ya da tarife boşsa None."""
+        when = when or datetime.now()
+        cand, cum = self._candidates(when.hour * 60 + when.minute)
         if not cand:
             return None
-        # ağırlığa göre seçim
-        weights = [w for w,_,_,_ in cand]
-        items   = [(i,n,d) for _,i,n,d in cand]
-        return random.choices(items, weights=weights, k=1)[0]
-    except Exception:
-        return None
+        return random.choices(cand, cum_weights=cum, k=1)[0]
 
-# =================== Başlat ===================
-ensure_files()
-
-while True:
-    current_hour = datetime.now().hour
-    produce_probability = get_probability_by_hour(current_hour)
-
-    if random.random() <= produce_probability:
-        # Başarı oranı ve hata mesajı (senin koddaki gibi)
-        if random.random() < 0.9:
-            is_success = 1
-            error_reason = None
-        else:
-            is_success = 0
-            error_reason = random.choice(error_reasons)
-
-        # Uçuş bilgilerini mümkünse siteden; yoksa fallback listelerden al
-        picked = pull_active_flight()
-        if picked:
-            iata, fno, dest = picked
-        else:
-            iata = random.choice(iata_codes)
-            fno  = random.choice(flight_numbers)
-            dest = random.choice(destination_airports)
-
-        new_data = {
-            # >>> ID: eski koddaki gibi rastgele aralıktan
-            "ID": random.randint(1_400_000, 1_500_000),
-            "Name": random_masked_name(),
-            "PNR": random.choice(pnr_list),
-            "OriginAirport": random.choice(origin_airports),   # DLM
-            "DestinationAirport": dest,
-            "IATA": iata,
-            "FlightNumber": fno,
-            "FlightDate": datetime.now().strftime("%j"),       # yılın günü (aynı mantık)
-            "CheckDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "IsSuccess": is_success,
-            "ErrorReason": error_reason,
-            "Type": random.choice(["DD","DI"])
-        }
-
-        # Excel'i güvenli oku + atomik yaz
-        df_existing = safe_read_xlsx()
-        df_existing = pd.concat([df_existing, pd.DataFrame([new_data])], ignore_index=True)
-        atomic_write_xlsx(df_existing, XLSX)
-
-        # CSV'ye ekle (append)
-        pd.DataFrame([new_data]).to_csv(CSV, mode='a', header=False, index=False)
-
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Üretildi → {new_data['IATA']}{new_data['FlightNumber']} / {new_data['DestinationAirport']}")
+    def sample(self, rng: np.random.Generator, n: int, when: datetime):
+        """Yük modu için n seçim; (iata, number, dest) dizileri ya da None."""
+        cand, cum = self._candidates(when.hour * 60 + when.minute)
+        if not cand:
+            return None
+        idx = np.searchsorted(cum, rng.random(n) * cum[-1], side="right")
+        arr = np.array(cand, dtype=object)[np.minimum(idx, len(cand) - 1)]
+        return arr[:, 0], arr[:, 1], arr[:, 2]
+
+# =================== Yük modu (benchmark) ===================
+BURST_ON, BURST_OFF = 10.0, 40.0         # ortalama patlama / sakin süreleri (sn)
+BURST_HI, BURST_LO = 4.0, 0.25           # hız çarpanları; zaman ortalaması = 1
+
+def local_now() -> float:
+    """Yerel saatin (CSV'deki naive CheckDate ile aynı) epoch saniyesi."""
+    return time.time() + time.localtime().tm_gmtoff
+
+class Arrivals:
+    """
+    Hedef `rate` (satır/sn) için varış zamanları üretir. poisson: sabit
+    hızlı Poisson süreci; bursty: patlama/sakin durumları arasında üstel
+    sürelerle geçen, ortalaması yine `rate` olan modüle Poisson.
+    """
+
+    def __init__(self, rng: np.random.Generator, rate: float, profile: str = "poisson"):
+        self.rng, self.rate, self.profile = rng, rate, profile
+        self.burst = False
+        self.switch_at = None
+
+    def _poisson(self, t0: float, t1: float, rate: float) -> np.ndarray:
+        n = self.rng.poisson(rate * (t1 - t0))
+        return np.sort(self.rng.uniform(t0, t1, n))
+
+    def times(self, t0: float, t1: float) -> np.ndarray:
+        if self.profile == "poisson":
+            return self._poisson(t0, t1, self.rate)
+        if self.switch_at is None:       # başlangıç durumu durağan dağılımdan
+            self.burst = self.rng.random() < BURST_ON / (BURST_ON + BURST_OFF)
+            self.switch_at = t0 + self.rng.exponential(BURST_ON if self.burst else BURST_OFF)
+        out, t = [], t0
+        while t < t1:
+            end = min(t1, self.switch_at)
+            out.append(self._poisson(t, end, self.rate * (BURST_HI if self.burst else BURST_LO)))
+            t = end
+            if t >= self.switch_at:
+                self.burst = not self.burst
+                self.switch_at += self.rng.exponential(BURST_ON if self.burst else BURST_OFF)
+        return np.concatenate(out) if out else np.empty(0)
+
+def synth_frame(rng: np.random.Generator, ts: np.ndarray, checkpoints: int = 0,
+                schedule: FlightSchedule = None) -> pd.DataFrame:
+    """ts (yerel epoch sn) zamanlı satırları vektörel üret; make_row ile aynı dağılımlar."""
+    n = len(ts)
+    when = np.floor(ts).astype("datetime64[s]")
+    letters = np.array(list(string.ascii_uppercase))
+    ok = rng.random(n) < 0.9
+    picked = schedule.sample(rng, n, when[0].astype(datetime)) if schedule is not None and n else None
+    if picked is None:
+        picked = (rng.choice(iata_codes, n), rng.choice(flight_numbers, n), rng.choice(destination_airports, n))
+    df = pd.DataFrame({
+        "ID": rng.integers(1_400_000, 1_500_001, n),
+        "Name": np.char.add(np.char.add(rng.choice(letters, n), "*** "), np.char.add(rng.choice(letters, n), "***")),
+        "PNR": rng.choice(pnr_list, n),
+        "OriginAirport": rng.choice(origin_airports, n),
+        "DestinationAirport": picked[2],
+        "IATA": picked[0],
+        "FlightNumber": picked[1],
+        "FlightDate": (when.astype("datetime64[D]") - when.astype("datetime64[Y]")).astype(np.int64) + 1,
+        "CheckDate": np.char.replace(np.datetime_as_string(when, unit="s"), "T", " "),
+        "IsSuccess": ok.astype(np.int8),
+        "ErrorReason": np.where(ok, "", rng.choice(error_reasons, n)),
+        "Type": rng.choice(["DD", "DI"], n),
+    })
+    if checkpoints:
+        df["checkpoint_id"] = np.char.add("CP", rng.integers(1, checkpoints + 1, n).astype(str))
+    return df
+
+def backfill(sink: RowSink, arrivals: Arrivals, rng: np.random.Generator, days: float, checkpoints: int,
+             schedule: FlightSchedule = None):
+    """Son `days` günü saatlik parçalar halinde beklemeden yaz."""
+    end = float(int(local_now()))     # tam saniye: aynı tohum -> aynı parça sınırları
+    t, total = end - days * 86400, 0
+    while t < end:
+        t1 = min(end, t + 3600)
+        df = synth_frame(rng, arrivals.times(t, t1), checkpoints, schedule)
+        sink.add_frame(df)
+        total += len(df)
+        t = t1
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Backfill: {days:g} gün, {total} satır")
+
+def run_load(sink: RowSink, arrivals: Arrivals, rng: np.random.Generator, checkpoints: int, tick: float,
+             schedule: FlightSchedule = None, xlsx: "XlsxSnapshots" = None):
+    """Hedef hızda gerçek zamanlı üretim; her tick'te o aralığın varışları yazılır."""
+    t_prev = local_now()
+    count, report = 0, time.monotonic() + 10
+    while True:
+        time.sleep(tick)
+        now = local_now()
+        df = synth_frame(rng, arrivals.times(t_prev, now), checkpoints, schedule)
+        t_prev = now
+        sink.add_frame(df)
+        count += len(df)
+        if xlsx is not None:
+            xlsx.maybe_export(sink)
+        if time.monotonic() >= report:
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Yük: {count / 10:.1f} satır/sn (hedef {arrivals.rate:g})")
+            count, report = 0, time.monotonic() + 10
+
+class XlsxSnapshots:
+    """--xlsx-every: her `every` saniyede bir CSV'nin XLSX anlık görüntüsü (0 = kapalı)."""
+
+    def __init__(self, csv_path: Path, xlsx_path: Path, every: float):
+        self.csv_path, self.xlsx_path, self.every = csv_path, xlsx_path, every
+        self.next = time.monotonic() + every if every > 0 else None
+
+    def maybe_export(self, sink: RowSink):
+        if self.next is not None and time.monotonic() >= self.next:
+            sink.flush()
+            export_xlsx(self.csv_path, self.xlsx_path)
+            self.next = time.monotonic() + self.every
+
+def make_row(iata: str, fno: str, dest: str, checkpoints: int = 0) -> dict:
+    # Başarı oranı ve hata mesajı (senin koddaki gibi)
+    if random.random() < 0.9:
+        is_success = 1
+        error_reason = None
     else:
-        print(f"[{datetime.now().strftime('%H:%M:%S')}] Yoğunluk düşük, üretim yok.")
+        is_success = 0
+        error_reason = random.choice(error_reasons)
+    return {
+        # >>> ID: eski koddaki gibi rastgele aralıktan
+        "ID": random.randint(1_400_000, 1_500_000),
+        "Name": random_masked_name(),
+        "PNR": random.choice(pnr_list),
+        "OriginAirport": random.choice(origin_airports),   # DLM
+        "DestinationAirport": dest,
+        "IATA": iata,
+        "FlightNumber": fno,
+        "FlightDate": datetime.now().strftime("%j"),       # yılın günü (aynı mantık)
+        "CheckDate": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "IsSuccess": is_success,
+        "ErrorReason": error_reason,
+        "Type": random.choice(["DD","DI"]),
+        **({"checkpoint_id": f"CP{random.randint(1, checkpoints)}"} if checkpoints else {}),
+    }
+
+def parse_args():
+    ap = argparse.ArgumentParser(description="PaxFlow örnek veri üreticisi (CSV'ye ekleme yapar)")
+    ap.add_argument("--out", type=Path, default=CSV, help="hedef CSV (append-only)")
+    ap.add_argument("--flush-interval", type=float, default=1.0, help="toplu yazma aralığı (sn)")
+    ap.add_argument("--columnar", default="", help="ayrıca bu klasöre Parquet/Arrow kopyası yaz (pyarrow gerekir)")
+    ap.add_argument("--columnar-format", default="parquet", choices=["parquet", "arrow"])
+    ap.add_argument("--xlsx", type=Path, default=XLSX, help="XLSX anlık görüntü yolu")
+    ap.add_argument("--xlsx-every", type=float, default=0, help="XLSX görüntüsünü her N saniyede bir al (0 = kapalı)")
+    ap.add_argument("--export-xlsx", action="store_true", help="yalnızca CSV'den XLSX üret ve çık")
+    # yük modu: --rate > 0 ise saatlik olasılık/uyku döngüsü yerine hedef hızda üretir
+    ap.add_argument("--rate", type=float, default=0, help="hedef satır/sn (0 = klasik mod)")
+    ap.add_argument("--profile", default="poisson", choices=["poisson", "bursty"], help="varış profili")
+    ap.add_argument("--checkpoints", type=int, default=0, help="N > 0 ise checkpoint_id kolonu (CP1..CPN) eklenir")
+    ap.add_argument("--seed", type=int, default=None, help="tekrarlanabilir üretim için tohum")
+    ap.add_argument("--backfill-days", type=float, default=0, help="önce son N günü beklemeden doldur")
+    ap.add_argument("--backfill-only", action="store_true", help="backfill sonrası çık")
+    ap.add_argument("--flights", type=Path, default=FLIGHTS, help="uçuş tarifesi JSON anlık görüntüsü")
+    ap.add_argument("--flights-ttl", type=float, default=900, help="tarife yenileme süresi (sn)")
+    ap.add_argument("--offline", action="store_true", help="tarifeyi yenileme, yalnızca görüntüyü kullan")
+    return ap.parse_args()
+
+# =================== Başlat ===================
+def main():
+    args = parse_args()
+    if args.export_xlsx:
+        export_xlsx(args.out, args.xlsx)
+        return
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    columns = COLUMNS + (["checkpoint_id"] if args.checkpoints else [])
+    sink = RowSink(args.out, args.flush_interval, args.columnar, args.columnar_format, columns)
+    arrivals = Arrivals(rng, args.rate or 1.0, args.profile)
+    schedule = FlightSchedule(args.flights, args.flights_ttl, scrape=not args.offline).start()
+    if args.backfill_days > 0:
+        backfill(sink, arrivals, rng, args.backfill_days, args.checkpoints, schedule)
+        if args.backfill_only:
+            sink.close()
+            return
+    xlsx = XlsxSnapshots(args.out, args.xlsx, args.xlsx_every)
+    if args.rate > 0:
+        try:
+            run_load(sink, arrivals, rng, args.checkpoints, max(args.flush_interval, 0.05), schedule, xlsx)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.close()
+        return
+
+    try:
+        while True:
+            current_hour = datetime.now().hour
+            produce_probability = get_probability_by_hour(current_hour)
+
+            if random.random() <= produce_probability:
+                # Uçuş bilgilerini mümkünse tarifeden; yoksa fallback listelerden al
+                picked = schedule.pick()
+                if picked:
+                    iata, fno, dest = picked
+                else:
+                    iata = random.choice(iata_codes)
+                    fno  = random.choice(flight_numbers)
+                    dest = random.choice(destination_airports)
+
+                new_data = make_row(iata, fno, dest, args.checkpoints)
+                sink.add(new_data)
+
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Üretildi → {new_data['IATA']}{new_data['FlightNumber']} / {new_data['DestinationAirport']}")
+            else:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] Yoğunluk düşük, üretim yok.")
+
+            xlsx.maybe_export(sink)
+
+            # Bekleme (AYNEN senin koddaki gibi)
+            wait_time = random.randint(1, 4) if random.random() < 0.7 else random.randint(5, 20)
+            sink.sleep(wait_time)      # tampon bekleme sırasında da flush_interval'da yazılır
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
 
-    # Bekleme (AYNEN senin koddaki gibi)
-    wait_time = random.randint(1, 4) if random.random() < 0.7 else random.randint(5, 20)
-    time.sleep(wait_time)
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,48 @@
 # plot_live.py
+import json
+import queue
+import threading
 import time
 import requests
 import matplotlib.pyplot as plt
 from datetime import datetime
 
-API = "http://127.0.0.1:8000/api/latest?minutes=60"  # son 60 dk
+BASE = "http://127.0.0.1:8000"
+API = BASE + "/api/latest?minutes=60"  # son 60 dk (ilk durum)
+STREAM = BASE + "/api/stream"          # SSE: yeni kayıt deltaları
+WINDOW = 60
 
 def fetch():
     r = requests.get(API, timeout=5)
     r.raise_for_status()
-    data = r.json()
+    return r.json()
+
+def listen(out: queue.Queue):
+    """SSE akışını dinle; her 'tick' olayının kayıtlarını kuyruğa koy. Kopunca yeniden bağlan."""
+    while True:
+        try:
+            with requests.get(STREAM, stream=True, timeout=(5, 60)) as r:
+                r.raise_for_status()
+                out.put(("reset", fetch()))  # bağlanınca kaçırılanlar için tam çek
+                event, data = None, []
+                for line in r.iter_lines(decode_unicode=True):
+                    if line is None:
+                        continue
+                    if line == "":
+                        if event == "tick" and data:
+                            out.put(("delta", json.loads("\n".join(data)).get("records", [])))
+                        event, data = None, []
+                    elif line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:"):
+                        data.append(line[5:].strip())
+        except Exception as e:
+            print("Stream hatası:", e)
+            time.sleep(2)
+
+def to_series(records):
     # veri kronolojik gelmiyorsa sırala
-    data = sorted(data, key=lambda d: d.get("ts_minute",""))
+    data = sorted(records.values(), key=lambda d: d.get("ts_minute",""))
     # x-ekseni: zaman
     t = [datetime.fromisoformat(d["ts_minute"]) for d in data]
     # seriler
@@ -24,8 +55,17 @@ def main():
     plt.ion()  # interaktif mod
     fig = plt.figure(figsize=(10,5))
 
+    # (checkpoint, dakika) -> kayıt; sunucudaki _dedupe_by_minute ile aynı
+    records = {}
+    def merge(items):
+        for d in items:
+            records[(d.get("checkpoint_id"), d.get("ts_minute"))] = d
+        for k in sorted(records)[:-WINDOW]:
+            del records[k]
+
     # ilk çizim
-    t, n_t, lam, rho = fetch()
+    merge(fetch())
+    t, n_t, lam, rho = to_series(records)
     ln1, = plt.plot(t, n_t, label="n_t (dakikadaki geçiş)")
     ln2, = plt.plot(t, lam, label="λ̂ (EWMA)")
     plt.legend()
@@ -35,21 +75,32 @@ def main():
     plt.tight_layout()
     plt.show()
 
+    updates = queue.Queue()
+    threading.Thread(target=listen, args=(updates,), daemon=True).start()
+
     while True:
         try:
-            t, n_t, lam, rho = fetch()
-            ln1.set_xdata(t); ln1.set_ydata(n_t)
-            ln2.set_xdata(t); ln2.set_ydata(lam)
-            # eksenleri yeni verilere göre ayarla
-            if t:
-                plt.gca().set_xlim(min(t), max(t))
-                ymin = min(min(n_t or [0]), min(lam or [0]))
-                ymax = max(max(n_t or [1]), max(lam or [1]))
-                if ymin == ymax:
-                    ymax = ymin + 1
-                plt.gca().set_ylim(ymin, ymax)
-            plt.draw()
-            plt.pause(2.0)  # 2 sn’de bir güncelle
+            changed = False
+            while not updates.empty():
+                kind, items = updates.get_nowait()
+                if kind == "reset":
+                    records.clear()
+                merge(items)
+                changed = True
+            if changed:
+                t, n_t, lam, rho = to_series(records)
+                ln1.set_xdata(t); ln1.set_ydata(n_t)
+                ln2.set_xdata(t); ln2.set_ydata(lam)
+                # eksenleri yeni verilere göre ayarla
+                if t:
+                    plt.gca().set_xlim(min(t), max(t))
+                    ymin = min(min(n_t or [0]), min(lam or [0]))
+                    ymax = max(max(n_t or [1]), max(lam or [1]))
+                    if ymin == ymax:
+                        ymax = ymin + 1
+                    plt.gca().set_ylim(ymin, ymax)
+                plt.draw()
+            plt.pause(0.2)  # yalnızca yeni delta gelince yeniden çiz
         except KeyboardInterrupt:
             break
         except Exception as e:
@@ -238,8 +238,11 @@ const UI=(()=> {
 })();
 
 /* ========== Scheduler (NO CSV here) ========== */
+/* /api/stream açıkken periyodik çekim durur; tam çekim yalnızca bağlanınca,
+   görevli değişince ve seyrek metrics24 için yapılır. */
 const Scheduler=(()=> {
-  let ctrl=null, nextTimer=null; const PERIOD=2000;
+  let ctrl=null, nextTimer=null, live=false, day24Timer=null; const PERIOD=2000, DAY24_PERIOD=60000;
+  const state={summary:[], latest:[], metrics:null, metrics24:null, destinations:null, currentRho:null};
   async function tick(){
     ctrl?.abort(); ctrl=new AbortController(); const signal=ctrl.signal;
     const [summary, latest, metrics, destinations, currentRho]=await Promise.all([
@@ -252,22 +255,57 @@ const Scheduler=(()=> {
     // metrics24'ü seyrek iste (yaklaşık 30 sn'de bir)
 Scheduler.__tickCount = (Scheduler.__tickCount|0) + 1;
 let metrics24 = null;
-if (Scheduler.__tickCount % 20 === 1) {
+if (!live && Scheduler.__tickCount % 20 === 1) {
   metrics24 = await apiMetricsLast(60 * 24, signal).catch(() => null);
 }
 
     //const metrics24=await apiMetricsLast(60*24, signal).catch(()=>null);
     if(signal.aborted) return;
-    requestAnimationFrame(()=>UI.paint({summary, latest, metrics, metrics24, destinations, currentRho}));
-    nextTimer=setTimeout(tick, PERIOD);
+    Object.assign(state,{summary, latest, metrics, destinations, currentRho});
+    if(metrics24) state.metrics24=metrics24;
+    requestAnimationFrame(()=>UI.paint(state));
+    if(!live) nextTimer=setTimeout(tick, PERIOD);
+  }
+  async function refreshDay24(){ const m=await apiMetricsLast(60*24).catch(()=>null); if(m){ state.metrics24=m; requestAnimationFrame(()=>UI.paint(state)); } }
+  function applyDelta(d){
+    if(d.records?.length) state.latest=state.latest.concat(d.records).slice(-600);
+    if(d.summary?.length){ const byCp=new Map(state.summary.map(s=>[s.checkpoint_id,s])); d.summary.forEach(s=>byCp.set(s.checkpoint_id,s)); state.summary=[...byCp.values()]; }
+    if(d.metrics) state.metrics=d.metrics;
+    if(d.destinations) state.destinations=d.destinations;
+    if(d.current_rho) state.currentRho=d.current_rho;
+    requestAnimationFrame(()=>UI.paint(state));
+  }
+  function setLive(on){
+    if(on===live) return; live=on;
+    if(on){ if(nextTimer){ clearTimeout(nextTimer); nextTimer=null; } refreshDay24(); day24Timer=setInterval(refreshDay24, DAY24_PERIOD); }
+    else{ clearInterval(day24Timer); day24Timer=null; if(!nextTimer) tick(); }
   }
   function start(){ if(!nextTimer) tick(); }
   function stop(){ if(nextTimer){ clearTimeout(nextTimer); nextTimer=null; } ctrl?.abort(); }
   function requestTickSoon(){ if(nextTimer){ clearTimeout(nextTimer); nextTimer=null; } tick(); }
-  return { start, stop, requestTickSoon };
+  return { start, stop, requestTickSoon, applyDelta, setLive };
 })();
 Scheduler.start();
 
+/* ========== Live stream (SSE) ==========
+   - Tek bağlantı: /api/stream 'tick' deltaları
+   - Bağlanınca bir kez tam çekim (aradaki kaçırılanlar için)
+   - Bağlantı koparsa polling'e geri dön; EventSource kendisi yeniden bağlanır
+========================================= */
+const Live=(()=> {
+  let es=null;
+  function emit(name,detail){ window.dispatchEvent(new CustomEvent(name,{detail})); }
+  function connect(){
+    if(!('EventSource' in window)) return;
+    es=new EventSource('/api/stream');
+    es.addEventListener('open',()=>{ Scheduler.setLive(true); Scheduler.requestTickSoon(); emit('paxflow:live',true); });
+    es.addEventListener('tick',e=>{ let d; try{ d=JSON.parse(e.data); }catch{ return; } Scheduler.applyDelta(d); if(d.rows?.length) emit('paxflow:rows',d.rows); });
+    es.addEventListener('error',()=>{ Scheduler.setLive(false); emit('paxflow:live',false); if(es.readyState===EventSource.CLOSED) setTimeout(connect,5000); });
+  }
+  connect();
+  return { get connected(){ return !!es && es.readyState===EventSource.OPEN; } };
+})();
+
 /* === CSV LIVE (güvenilir) ====================================
    - Tek instans, overlap yok (AbortController)
    - 1 sn’de bir çek; veri JSON'u değiştiyse tabloyu güncelle
@@ -276,8 +314,8 @@ Scheduler.start();
 /* === CSV LIVE (basit & sağlam) =================================
    - Tek instans
    - Overlap yok (busy kilidi)
-   - 1 sn'de bir çek ve tabloyu komple yeniden yaz
-   - JSON/İmza karşılaştırması YOK -> değişimi asla kaçırmaz
+   - /api/stream açıksa yeni satırları deltadan ekle
+   - Stream yoksa 1 sn'de bir çek ve tabloyu komple yeniden yaz
 ================================================================= */
 (function csvLiveMinimal(){
   // başka bir sürüm kuruluysa tekrar kurma
@@ -330,8 +368,15 @@ Scheduler.start();
     return html;
   }
 
+  let rowsCache = [], live = false, timer = null;
+
+  function render(){
+    const tbl = document.getElementById('csvTable');
+    if (tbl) tbl.innerHTML = buildTableHTML(rowsCache);
+  }
+
   async function tick(){
-    if (busy) { setTimeout(tick, 150); return; }
+    if (busy) { timer = setTimeout(tick, 150); return; }
     busy = true;
 
     try {
@@ -340,18 +385,29 @@ Scheduler.start();
       const payload = await r.json();
       const rows = Array.isArray(payload) ? payload : (payload.rows ?? payload.data ?? []);
 
-      const tbl = document.getElementById('csvTable');
-      if (tbl && Array.isArray(rows)) {
-        tbl.innerHTML = buildTableHTML(rows);
+      if (Array.isArray(rows)) {
+        rowsCache = rows;
+        render();
       }
     } catch {
       /* sessizce geç */
     } finally {
       busy = false;
-      setTimeout(tick, TICK_MS);
+      // stream açıkken polling yok; yeni satırlar 'paxflow:rows' ile gelir
+      timer = live ? null : setTimeout(tick, TICK_MS);
     }
   }
 
+  window.addEventListener('paxflow:rows', e => {
+    rowsCache = e.detail.concat(rowsCache).slice(0, 50);
+    render();
+  });
+  window.addEventListener('paxflow:live', e => {
+    live = !!e.detail;
+    if (timer) { clearTimeout(timer); timer = null; }
+    tick();   // bağlanınca/kopunca bir kez tam çek
+  });
+
   function boot(){
     if (!document.getElementById('csvTable')) { setTimeout(boot, 250); return; }
     tick();